@@ -0,0 +1,189 @@
+"""
+Public JSON read API.
+
+    /api/videos        latest videos (?limit=, ?category=, ?source=)
+    /api/blogs  /api/events  /api/galleries  /api/objectives  /api/navbar
+
+The payloads are built here once and served two ways: the Flask app
+registers them as ordinary views (gunicorn app:app), and api_app is an ASGI
+application that asgi.py puts in front of the Flask app for event-loop
+workers. There a request only costs a coroutine: data already in the memory
+cache is served without I/O, reloads (file or Cloudinary reads) are awaited
+in a thread, and a slow client never holds a thread while its response
+trickles out.
+
+Collections are encoded once per content version and their ETag is derived
+from that version, so revalidation is a 304 without touching the data.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from urllib.parse import parse_qs
+
+from flask import Response, request
+from werkzeug.http import parse_accept_header, parse_etags
+
+from compression import choose_encoding, compress_bytes, compressed_cache
+from config import Config
+from data_manager import (
+    get_all_blogs, get_all_events, get_all_galleries, get_all_objectives,
+    get_navbar_dropdowns_data, get_content_version, is_cached
+)
+from metrics import inc, observe
+from youtube_feed import CACHE_FILE, get_latest_youtube_videos
+
+API_PREFIX = '/api/'
+CACHE_CONTROL = 'public, max-age=300, must-revalidate'
+DEFAULT_VIDEO_LIMIT = 50
+
+# Collection name -> (data file, getter)
+COLLECTIONS = {
+    'blogs': (Config.BLOGS_DATA_FILE, get_all_blogs),
+    'events': (Config.EVENTS_DATA_FILE, get_all_events),
+    'galleries': (Config.PHOTOS_DATA_FILE, get_all_galleries),
+    'objectives': (Config.OBJECTIVES_DATA_FILE, get_all_objectives),
+    'navbar': (Config.NAVBAR_DROPDOWNS_DATA_FILE, get_navbar_dropdowns_data),
+}
+
+# Collection name -> (content version, encoded JSON)
+_encoded = {}
+
+
+def _encode(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def collection_json(name):
+    """
+    ETag and JSON body of a collection (encoded once per content version).
+    Args:
+        name: A COLLECTIONS key
+    Returns:
+        (etag, body bytes)
+    """
+    file_path, getter = COLLECTIONS[name]
+    version = get_content_version(file_path)
+    cached = _encoded.get(name)
+    if cached is None or cached[0] != version:
+        cached = _encoded[name] = (version, _encode(getter()))
+    etag = hashlib.sha1(f"{name}|{version}".encode('utf-8')).hexdigest()[:20]
+    return etag, cached[1]
+
+
+def videos_json(limit=DEFAULT_VIDEO_LIMIT, category=None, source=None):
+    """ETag (body hash: video dates are relative to now) and JSON body of the latest videos"""
+    body = _encode(get_latest_youtube_videos(limit=limit, category=category, source=source))
+    return hashlib.sha1(body).hexdigest()[:20], body
+
+
+def json_response(etag, body):
+    """Flask response for an API payload, answered with 304 if the client has it"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def _int_arg(values, default):
+    try:
+        return int(values[0])
+    except (IndexError, ValueError):
+        return default
+
+
+def route(path):
+    """(endpoint, payload function taking the parsed query string) for an API path, or None"""
+    name = path[len(API_PREFIX):] if path.startswith(API_PREFIX) else None
+    if name == 'videos':
+        return 'api_videos', lambda query: videos_json(
+            limit=_int_arg(query.get('limit', []), DEFAULT_VIDEO_LIMIT),
+            category=(query.get('category') or [None])[0] or None,
+            source=(query.get('source') or [None])[0] or None,
+        )
+    if name in COLLECTIONS:
+        return 'api_collection', lambda query: collection_json(name)
+    return None
+
+
+def _files_read(path):
+    if path == API_PREFIX + 'videos':
+        return (CACHE_FILE,)
+    return (COLLECTIONS[path[len(API_PREFIX):]][0],)
+
+
+async def api_app(scope, receive, send):
+    """ASGI application serving the API routes (GET/HEAD; anything else is a 404)"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    start = time.perf_counter()
+    matched = route(scope['path']) if scope['method'] in ('GET', 'HEAD') else None
+    if matched is None:
+        await _send(send, scope, 404, [(b'content-type', b'text/plain')], b'Not Found')
+        return
+    endpoint, payload = matched
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+
+    if all(is_cached(file_path) for file_path in _files_read(scope['path'])):
+        etag, body = payload(query)
+    else:
+        # Reading the file (or Cloudinary) would block the loop
+        etag, body = await asyncio.get_running_loop().run_in_executor(None, payload, query)
+
+    request_headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    headers = _common_headers(scope, request_headers)
+    if parse_etags(request_headers.get('if-none-match')).contains_weak(etag):
+        status, body = 304, b''
+        headers.append((b'etag', f'"{etag}"'.encode()))
+    else:
+        status = 200
+        headers.append((b'content-type', b'application/json'))
+        body, etag_header = _compress(body, etag, request_headers.get('accept-encoding'), headers)
+        headers.append((b'etag', etag_header.encode()))
+
+    await _send(send, scope, status, headers, body)
+    if Config.METRICS_ENABLED:
+        inc('http_requests_total', endpoint=endpoint, method=scope['method'], status=str(status))
+        observe('http_request_duration_seconds', time.perf_counter() - start, endpoint=endpoint)
+
+
+def _common_headers(scope, request_headers):
+    """The headers set_security_headers() adds to every Flask response"""
+    headers = [
+        (b'x-content-type-options', b'nosniff'),
+        (b'x-frame-options', b'DENY'),
+        (b'x-xss-protection', b'1; mode=block'),
+        (b'cache-control', CACHE_CONTROL.encode()),
+        (b'vary', b'Accept-Encoding'),
+    ]
+    if scope.get('scheme') == 'https' or os.environ.get('FORCE_HTTPS', '').lower() == 'true':
+        headers.append((b'strict-transport-security', b'max-age=31536000; includeSubDomains'))
+    return headers
+
+
+def _compress(body, etag, accept_encoding, headers):
+    """Compressed body (cached by ETag, as compress_response() does) and the ETag header value"""
+    if not Config.COMPRESSION_ENABLED or len(body) < Config.COMPRESSION_MIN_SIZE:
+        return body, f'"{etag}"'
+    encoding = choose_encoding(accept=parse_accept_header(accept_encoding))
+    if encoding is None:
+        return body, f'"{etag}"'
+    compressed = compressed_cache.get((etag, encoding))
+    if compressed is None:
+        compressed = compress_bytes(body, encoding)
+        compressed_cache.set((etag, encoding), compressed)
+    headers.append((b'content-encoding', encoding.encode()))
+    return compressed, f'W/"{etag}"'
+
+
+async def _send(send, scope, status, headers, body):
+    headers = headers + [(b'content-length', str(len(body)).encode())]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
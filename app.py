@@ -1,11 +1,12 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, abort
 from datetime import datetime
+import hmac
 import json
 import os
 import uuid
+from werkzeug.exceptions import NotFound
 from werkzeug.utils import secure_filename
 
-from data.events_data import EVENTS_DATA
 from config import Config
 from auth import (
     login_required, verify_password, init_session, logout_session, 
@@ -27,14 +28,36 @@ from data_manager import (
     add_dropdown_item, update_dropdown_item, delete_dropdown_item,
     update_dropdown_column_order, update_dropdown_item_order, update_global_social_media,
     get_all_objectives, get_objective_by_id, add_objective, update_objective, delete_objective,
-    update_objective_order, get_latest_youtube_videos
+    update_objective_order, load_many, apply_operations, BulkOperationError
 )
 from storage import storage_manager
+from page_cache import BASE_DATA_FILES, cached_page
+from assets import get_asset_manifest, BUNDLES
+from compression import compress_response, send_precompressed
+from i18n import LanguagePrefixMiddleware, get_page_language
+from preload import readiness, start_serving
+from scheduler import scheduler
+from api import COLLECTIONS as API_COLLECTIONS, DEFAULT_VIDEO_LIMIT, collection_json, json_response, videos_json
+from thumbnail_cache import URL_PREFIX as THUMBNAIL_URL_PREFIX, VIDEO_ID_PATTERN, youtube_thumbnail_url
 from image_utils import generate_responsive_image_attrs, get_responsive_image_url, generate_srcset
+from timing import init_timing
+from metrics import init_metrics, render_metrics
+from profiler import init_profiler, list_profiles, PROFILE_EXTENSIONS
+from slow_requests import init_slow_requests
 
 app = Flask(__name__)
 app.config.from_object(Config)
 app.secret_key = Config.SECRET_KEY
+# Server-Timing header and per-request timing log (registered first so its total covers the other hooks)
+init_timing(app)
+# Stack dumps of requests that run past SLOW_REQUEST_THRESHOLD
+init_slow_requests(app)
+# Prometheus request metrics, aggregated across workers at /metrics
+init_metrics(app)
+# Admin-triggered cProfile/stack-sampler profiles of single requests
+init_profiler(app)
+# /hi/... and /en/... serve the same routes rendered in that language
+app.wsgi_app = LanguagePrefixMiddleware(app.wsgi_app)
 ALLOWED_ADMIN_IPS = [ip.strip() for ip in Config.ADMIN_ALLOWED_IPS.split(',') if ip.strip()]
 
 # Add Jinja2 filters for responsive images
@@ -61,11 +84,31 @@ def dated_url_for(endpoint, **values):
     if endpoint == 'static':
         filename = values.get('filename', None)
         if filename:
-            file_path = os.path.join(app.root_path, endpoint, filename)
-            if os.path.isfile(file_path):
-                values['v'] = int(os.stat(file_path).st_mtime)
+            if app.debug:
+                get_asset_manifest().refresh_file(filename)
+            # Content-hashed filename from the in-memory manifest (no filesystem access)
+            values['filename'] = get_asset_manifest().url_path(filename)
     return url_for(endpoint, **values)
 
+def fingerprinted_static(filename):
+    """Serve static files, mapping content-hashed names back to their source file"""
+    manifest = get_asset_manifest()
+    source = manifest.resolve(filename) or filename
+    encodings = manifest.compressed_encodings(source)
+    if encodings:
+        return send_precompressed(app.static_folder, source, encodings)
+    return app.send_static_file(source)
+
+app.view_functions['static'] = fingerprinted_static
+
+@app.template_global()
+def bundle_urls(name):
+    """URLs for a CSS/JS bundle: the built bundle if available, otherwise its source files"""
+    bundle = None if app.debug else get_asset_manifest().bundle_path(name)
+    if bundle:
+        return [url_for('static', filename=bundle)]
+    return [dated_url_for('static', filename=source) for source in BUNDLES[name]]
+
 # Configure secure session cookies
 app.config['SESSION_COOKIE_HTTPONLY'] = Config.SESSION_COOKIE_HTTPONLY
 app.config['SESSION_COOKIE_SECURE'] = Config.SESSION_COOKIE_SECURE
@@ -84,16 +127,38 @@ def set_security_headers(response):
         response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
     
     # Add caching headers for static assets
-    if request.endpoint == 'static' or request.path.startswith('/static/'):
+    immutable = request.endpoint == 'static' or request.path.startswith('/static/') or (
+        request.endpoint == 'youtube_thumbnail' and response.status_code == 200)
+    if immutable:
         # Cache static assets for 1 year (browsers will revalidate)
         response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
         response.headers['Expires'] = 'Thu, 31 Dec 2025 23:59:59 GMT'
+    elif request.endpoint == 'healthz_ready':
+        # Readiness changes once warm-up finishes; never serve it from a cache
+        response.headers['Cache-Control'] = 'no-store'
     else:
         # For HTML pages, cache for 5 minutes
         response.headers['Cache-Control'] = 'public, max-age=300, must-revalidate'
+        
+        # Pages from cached_page() already carry a version ETag; hash the body of
+        # anything else (JSON APIs included) so revalidation can return 304
+        if (request.method == 'GET' and response.status_code == 200
+                and not response.direct_passthrough and 'ETag' not in response.headers):
+            response.add_etag()
+            response.make_conditional(request)
+        
+        compress_response(response)
     
     return response
 
+def admin_ip_allowed():
+    """Check the optional ADMIN_ALLOWED_IPS allow-list"""
+    if not ALLOWED_ADMIN_IPS:
+        return True
+    forwarded_for = request.headers.get('X-Forwarded-For', '')
+    candidate_ip = forwarded_for.split(',')[0].strip() if forwarded_for else (request.remote_addr or '')
+    return candidate_ip in ALLOWED_ADMIN_IPS
+
 @app.before_request
 def enforce_admin_security():
     """Enforce admin security: IP restriction, session validation, and inactivity timeout"""
@@ -102,11 +167,8 @@ def enforce_admin_security():
         return
     
     # Optional IP allow-list for /admin routes
-    if ALLOWED_ADMIN_IPS:
-        forwarded_for = request.headers.get('X-Forwarded-For', '')
-        candidate_ip = forwarded_for.split(',')[0].strip() if forwarded_for else (request.remote_addr or '')
-        if candidate_ip not in ALLOWED_ADMIN_IPS:
-            abort(403)
+    if not admin_ip_allowed():
+        abort(403)
     
     # Skip security checks for login and logout routes
     if request.path in ['/admin/login', '/admin/logout']:
@@ -143,8 +205,8 @@ def enforce_admin_security():
 @app.context_processor
 def inject_current_year():
     """Inject variables into all templates"""
-    videos_dropdown_data = get_videos_dropdown_data()
-    navbar_dropdowns_data = get_navbar_dropdowns_data()
+    videos_dropdown_data, navbar_dropdowns_data = load_many(
+        Config.VIDEOS_DROPDOWN_DATA_FILE, Config.NAVBAR_DROPDOWNS_DATA_FILE)
     
     # Inject CSRF token for admin templates
     csrf_token = session.get('csrf_token', '') if 'admin_logged_in' in session else ''
@@ -153,21 +215,29 @@ def inject_current_year():
         current_year=datetime.now().year,
         videos_dropdown_data=videos_dropdown_data,
         navbar_dropdowns_data=navbar_dropdowns_data,
-        csrf_token=csrf_token
+        csrf_token=csrf_token,
+        page_language=get_page_language()
     )
 
+def default_events():
+    """Built-in events used before events_data.json exists (imported on first use, not at startup)"""
+    from data.events_data import EVENTS_DATA
+    return EVENTS_DATA
+
 @app.route('/')
+@cached_page(Config.BLOGS_DATA_FILE, Config.SLIDER_DATA_FILE, Config.OBJECTIVES_DATA_FILE, Config.EVENTS_DATA_FILE)
 def home():
-    migrate_blog_ids_to_slugs()
-    blogs = get_all_blogs()
+    if not Config.SCHEDULER_ENABLED:
+        migrate_blog_ids_to_slugs()
+    # One concurrent batch for the four collections and the ones the context processor reads
+    blogs, slider_images, objectives, events_data = load_many(
+        Config.BLOGS_DATA_FILE, Config.SLIDER_DATA_FILE, Config.OBJECTIVES_DATA_FILE, Config.EVENTS_DATA_FILE,
+        prefetch=BASE_DATA_FILES)
     home_blogs = blogs[:10]
-    slider_images = get_all_slider_images()
-    objectives = get_all_objectives()
     
     # Get events for the calendar section
-    events_data = get_all_events()
     if not events_data:
-        events_data = EVENTS_DATA
+        events_data = default_events()
         
     
     # Filter for upcoming events (date >= today) for the sidebar
@@ -177,12 +247,8 @@ def home():
         key=lambda x: x['date']
     )
 
-    # Add month abbreviation for display
-    for event in upcoming_events:
-        try:
-            event['month_abbr'] = datetime.strptime(event['date'], '%Y-%m-%d').strftime('%b').upper()
-        except ValueError:
-            event['month_abbr'] = ''
+    # Add month abbreviation for display (on copies: the cached events are shared)
+    upcoming_events = [with_month_abbr(event) for event in upcoming_events]
     
     return render_template(
         'home.html', 
@@ -194,14 +260,25 @@ def home():
         events_json=json.dumps(events_data, ensure_ascii=False)
     )
 
+def with_month_abbr(event):
+    """Copy of an event with the month abbreviation shown in the sidebar"""
+    try:
+        month_abbr = datetime.strptime(event['date'], '%Y-%m-%d').strftime('%b').upper()
+    except ValueError:
+        month_abbr = ''
+    return {**event, 'month_abbr': month_abbr}
+
 @app.route('/blog')
+@cached_page(Config.BLOGS_DATA_FILE)
 def blog():
     blogs = get_all_blogs()
-    # Migrate old numeric IDs to slugs on first access
-    migrate_blog_ids_to_slugs()
+    # Migrate old numeric IDs to slugs on first access (a scheduled job when the scheduler runs)
+    if not Config.SCHEDULER_ENABLED:
+        migrate_blog_ids_to_slugs()
     return render_template('blog.html', blogs=blogs)
 
 @app.route('/blog/<blog_id>')
+@cached_page(Config.BLOGS_DATA_FILE)
 def blog_detail(blog_id):
     blog = get_blog_by_id(blog_id)
     if not blog:
@@ -213,12 +290,14 @@ def blog_detail(blog_id):
     return render_template('blog_detail.html', blog=blog, all_blogs=all_blogs)
 
 @app.route('/projects')
+@cached_page()
 def projects():
     return render_template('projects.html')
 
 
 @app.route('/photos')
 @app.route('/photos/<gallery_id>')
+@cached_page(Config.PHOTOS_DATA_FILE)
 def photos(gallery_id=None):
     galleries = get_all_galleries()
     return render_template(
@@ -229,27 +308,49 @@ def photos(gallery_id=None):
     )
 
 @app.route('/videos')
+@cached_page()
 def videos():
     return render_template('videos.html')
 
 @app.route('/api/videos')
 def api_videos():
-    limit = request.args.get('limit', default=50, type=int)
-    youtube_videos = get_latest_youtube_videos(limit=limit)
-    return jsonify(youtube_videos)
+    limit = request.args.get('limit', default=DEFAULT_VIDEO_LIMIT, type=int)
+    category = request.args.get('category') or None
+    source = request.args.get('source') or None
+    return json_response(*videos_json(limit=limit, category=category, source=source))
+
+@app.route('/api/<collection>')
+def api_collection(collection):
+    """JSON of a content collection (blogs, events, galleries, objectives, navbar)"""
+    if collection not in API_COLLECTIONS:
+        abort(404)
+    return json_response(*collection_json(collection))
+
+@app.route(f'{THUMBNAIL_URL_PREFIX}/<video_id>/<filename>')
+def youtube_thumbnail(video_id, filename):
+    """Locally cached video thumbnail (content-hashed file names, cached immutably)"""
+    if not VIDEO_ID_PATTERN.match(video_id):
+        abort(404)
+    try:
+        return send_from_directory(os.path.join(Config.THUMBNAIL_CACHE_DIR, video_id), filename)
+    except NotFound:
+        # Evicted, or not cached on this node yet
+        return redirect(youtube_thumbnail_url(video_id))
 
 @app.route('/donate')
+@cached_page(Config.OBJECTIVES_DATA_FILE)
 def donate():
     objectives = get_all_objectives()
     return render_template('donate.html', objectives=objectives)
 
 @app.route('/events')
+@cached_page(Config.EVENTS_DATA_FILE)
 def events():
     # Try to load from JSON, fallback to Python file
     events_data = get_all_events()
     if not events_data:
         # Migrate existing events to JSON on first run
-        events_data = EVENTS_DATA
+        events_data = default_events()
         save_json_data(Config.EVENTS_DATA_FILE, events_data)
     
     # Sort events by date (descending for general list if needed, or keeping as is)
@@ -260,12 +361,8 @@ def events():
         key=lambda x: x['date']
     )
 
-    # Add month abbreviation for display
-    for event in upcoming_events:
-        try:
-            event['month_abbr'] = datetime.strptime(event['date'], '%Y-%m-%d').strftime('%b').upper()
-        except ValueError:
-            event['month_abbr'] = ''
+    # Add month abbreviation for display (on copies: the cached events are shared)
+    upcoming_events = [with_month_abbr(event) for event in upcoming_events]
     
     return render_template(
         'events.html',
@@ -337,6 +434,22 @@ def build_gallery_payload(existing_gallery=None):
     return gallery
 
 # Admin Routes
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics for all workers on this node (METRICS_TOKEN bearer token or an admin session)"""
+    if not Config.METRICS_ENABLED:
+        abort(404)
+    if not admin_ip_allowed():
+        abort(403)
+    authorization = request.headers.get('Authorization', '')
+    authorized = bool(Config.METRICS_TOKEN) and hmac.compare_digest(authorization, f"Bearer {Config.METRICS_TOKEN}")
+    if not authorized:
+        from auth import validate_session_security
+        authorized, _ = validate_session_security()
+    if not authorized:
+        abort(403)
+    return render_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 @app.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     if request.method == 'POST':
@@ -398,16 +511,71 @@ def get_csrf_token():
 @app.route('/admin')
 @login_required
 def admin_dashboard():
-    blogs = get_all_blogs()
-    events = get_all_events()
-    galleries = get_all_galleries()
-    objectives = get_all_objectives()
+    blogs, events, galleries, objectives = load_many(
+        Config.BLOGS_DATA_FILE, Config.EVENTS_DATA_FILE, Config.PHOTOS_DATA_FILE, Config.OBJECTIVES_DATA_FILE,
+        prefetch=BASE_DATA_FILES)
     return render_template('admin/dashboard.html', 
                          blog_count=len(blogs), 
                          event_count=len(events),
                          gallery_count=len(galleries),
                          objective_count=len(objectives))
 
+# Request profiles written by the profiler (?_profile=1 on any URL while logged in)
+@app.route('/admin/profiles')
+@login_required
+def admin_profiles():
+    if not Config.PROFILER_ENABLED:
+        abort(404)
+    return render_template('admin/profiles.html', profiles=list_profiles(),
+                           sample_rate=Config.PROFILE_SAMPLE_RATE, max_files=Config.PROFILE_MAX_FILES)
+
+@app.route('/admin/profiles/<filename>')
+@login_required
+def admin_download_profile(filename):
+    if not Config.PROFILER_ENABLED or not filename.endswith(PROFILE_EXTENSIONS):
+        abort(404)
+    return send_from_directory(Config.PROFILE_DIR, filename, as_attachment=True)
+
+# Many content changes in one request, saved once per data file. A failing operation saves
+# nothing; the files themselves are saved one by one, so a failed save is reported per file:
+# {"operations": [{"op": "add_event", "args": [{...}]}, {"op": "update_gallery", "args": ["3", {...}]}]}
+@app.route('/admin/bulk', methods=['POST'])
+@login_required
+def admin_bulk():
+    payload = request.get_json(silent=True)
+    operations = payload.get('operations') if isinstance(payload, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'success': False, 'message': 'Expected {"operations": [{"op": ..., "args": [...]}, ...]}'}), 400
+    try:
+        results, batch = apply_operations(operations)
+    except BulkOperationError as e:
+        return jsonify({'success': False, 'message': f'Nothing was saved: {e}', 'failed': e.index}), 400
+    if not batch.ok:
+        # Files are saved one by one: report which ones were written before the failure
+        return jsonify({'success': False, 'message': 'Error saving data; the files listed in saved were written',
+                        'saved': sorted(name for name, ok in batch.saved.items() if ok),
+                        'not_saved': sorted(name for name, ok in batch.saved.items() if not ok)}), 500
+    return jsonify({'success': True, 'results': results, 'saved': sorted(batch.saved)})
+
+# Background maintenance jobs (jobs.py) and their last runs
+@app.route('/admin/jobs')
+@login_required
+def admin_jobs():
+    if not Config.SCHEDULER_ENABLED:
+        abort(404)
+    status = scheduler.status()
+    return render_template('admin/jobs.html', jobs=status['jobs'], leader=status['leader'],
+                           poll=Config.SCHEDULER_POLL)
+
+@app.route('/admin/jobs/<name>/run', methods=['POST'])
+@login_required
+def admin_run_job(name):
+    if not Config.SCHEDULER_ENABLED or name not in scheduler.jobs:
+        abort(404)
+    scheduler.request_run(name)
+    flash(f'Job "{name}" will run within {Config.SCHEDULER_POLL:g} seconds.', 'success')
+    return redirect(url_for('admin_jobs'))
+
 # Blog Management Routes
 @app.route('/admin/blogs')
 @login_required
@@ -726,6 +894,8 @@ def admin_delete_photo(gallery_id, photo_id):
         gallery = get_gallery_by_id(gallery_id)
         if not gallery:
             return jsonify({'success': False, 'error': 'Gallery not found'}), 404
+        # Edit a copy: the cached gallery is shared with other requests
+        gallery = dict(gallery)
         
         # Find and remove the photo
         photos = gallery.get('photos', [])
@@ -1244,8 +1414,17 @@ def admin_edit_global_social_media():
     
     return render_template('admin/global_social_media_form.html', social_media=social_media)
 
+# Readiness probe: 503 until this worker has loaded content and rendered the top pages (preload.py)
+@app.route('/healthz/ready')
+def healthz_ready():
+    state = readiness()
+    return jsonify(state), 200 if state['ready'] else 503
+
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 10000))
     # Enable debug mode in development (disabled in production via environment variable)
     debug_mode = os.environ.get("FLASK_DEBUG", "True").lower() == "true"
+    # Background jobs and warm-up run in the serving process, not the reloader's watcher
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_serving(app)
     app.run(host="0.0.0.0", port=port, debug=debug_mode, use_reloader=True)
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+ASGI entry point: the JSON API (api.py) on the event loop, every other URL
+through the Flask app on a thread pool.
+
+    pip install uvicorn uvicorn-worker
+    gunicorn -k uvicorn_worker.UvicornWorker -w 4 asgi:application
+    uvicorn asgi:application --workers 4           # without gunicorn
+
+gunicorn.conf.py (preloading) applies as with the sync workers; the job
+scheduler and warm-up start at lifespan startup (or gunicorn's
+post_worker_init, whichever comes first). Flask
+requests run on ASGI_THREADS threads per process; asgiref's WsgiToAsgi is not
+used because it runs every WSGI call on one shared thread.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from api import api_app, route
+from app import app
+from config import Config
+from preload import start_serving
+
+
+class WsgiBridge:
+    """Runs a WSGI app for ASGI HTTP requests, the WSGI calls on a thread pool"""
+
+    def __init__(self, wsgi_app, threads):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi')
+
+    async def __call__(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        environ = build_environ(scope, await read_body(receive))
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                  for name, value in headers]
+
+        iterable = await loop.run_in_executor(self.executor, self.wsgi_app, environ, start_response)
+        try:
+            # Pull the body chunk by chunk in the pool: streamed and file responses read lazily
+            chunks = iter(iterable)
+            chunk = await loop.run_in_executor(self.executor, next, chunks, None)
+            await send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+            while chunk is not None:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await loop.run_in_executor(self.executor, next, chunks, None)
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                await loop.run_in_executor(self.executor, iterable.close)
+
+
+async def read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body.extend(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return bytes(body)
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope (PEP 3333)"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(body)),
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f"HTTP_{name}"
+            # Repeated headers are joined, as a WSGI server would
+            separator = '; ' if key == 'HTTP_COOKIE' else ','
+            environ[key] = f"{environ[key]}{separator}{value}" if key in environ else value
+    return environ
+
+
+flask_app = WsgiBridge(app, Config.ASGI_THREADS)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        # The server is starting: the scheduler and warm-up threads (importing app starts none)
+        start_serving(app)
+        await api_app(scope, receive, send)
+    elif scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD') and route(scope['path']):
+        await api_app(scope, receive, send)
+    elif scope['type'] == 'http':
+        await flask_app(scope, receive, send)
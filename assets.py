@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Static asset manifest and bundler.
+Maps each file under static/ to a content-hashed filename
+(css/home.css -> css/home.1a2b3c4d5e.css) so templates can emit long-cached
+URLs without touching the filesystem on every render. Hashes depend only on
+file contents, so every node produces the same URLs.
+
+The build step also concatenates and minifies each page's CSS/JS into
+fingerprinted bundles under static/dist/, which templates pick up through
+bundle_urls(). Without a build the individual source files are used.
+
+The manifest is built on first use (get_asset_manifest()), or read from
+static/manifest.json when the build step has written it:
+    python assets.py
+"""
+import hashlib
+import json
+import os
+import threading
+
+from compression import COMPRESSIBLE_EXTENSIONS, ENCODING_SUFFIXES, precompress_file
+from minify import minify_css, minify_js
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+MANIFEST_FILE = os.path.join(STATIC_FOLDER, 'manifest.json')
+DIST_DIR = 'dist'
+BUNDLES_FILE = os.path.join(STATIC_FOLDER, DIST_DIR, 'bundles.json')
+
+# Uploads appear at runtime and are referenced by their stored URLs, not via url_for.
+# Bundles in dist/ are already fingerprinted by the bundler.
+EXCLUDED_DIRS = ('uploads', DIST_DIR)
+HASH_LENGTH = 10
+
+# Bundle name -> source files (relative to static/), concatenated in order
+BUNDLES = {
+    'base.css': ['css/header.css', 'css/footer.css', 'css/language.css', 'css/mobile-nav.css', 'css/banner.css'],
+    'base.js': ['js/language.js', 'js/mobile-nav.js'],
+    # Pages rendered server-side in a single language only need the toggle
+    'base-localized.js': ['js/language-switch.js', 'js/mobile-nav.js'],
+    'home.css': ['css/home.css', 'css/slider.css', 'css/events.css'],
+    'home.js': ['js/events.js', 'js/slider.js', 'js/objectives.js', 'js/scroller.js'],
+    'blog.css': ['css/blog.css'],
+    'events.css': ['css/events.css'],
+    'events.js': ['js/events.js'],
+    'photos.css': ['css/photos.css', 'css/masonry.css'],
+    'photos.js': ['js/masonry.js', 'js/photos.js'],
+    'donate.css': ['css/donate.css'],
+    'donate.js': ['js/donate.js'],
+    'projects.css': ['css/projects.css'],
+    'videos.css': ['css/videos.css'],
+}
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def fingerprint_name(relpath, file_hash):
+    """css/home.css + hash -> css/home.<hash>.css"""
+    root, ext = os.path.splitext(relpath)
+    return f"{root}.{file_hash}{ext}"
+
+
+def build_manifest(static_folder=STATIC_FOLDER):
+    """Hash every static file and return {relative path: fingerprinted path}"""
+    manifest = {}
+    for dirpath, dirnames, filenames in os.walk(static_folder):
+        rel_dir = os.path.relpath(dirpath, static_folder)
+        if rel_dir.split(os.sep)[0] in EXCLUDED_DIRS:
+            dirnames[:] = []
+            continue
+        dirnames.sort()
+        for filename in sorted(filenames):
+            relpath = os.path.normpath(os.path.join(rel_dir, filename)).replace(os.sep, '/')
+            if relpath == os.path.basename(MANIFEST_FILE) or filename.endswith(tuple(ENCODING_SUFFIXES.values())):
+                continue
+            manifest[relpath] = fingerprint_name(relpath, _hash_file(os.path.join(dirpath, filename)))
+    return manifest
+
+
+def build_bundles(static_folder=STATIC_FOLDER, bundles=BUNDLES):
+    """Concatenate, minify and fingerprint every bundle; return {name: dist path}"""
+    dist_folder = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist_folder, exist_ok=True)
+    built = {}
+    for name, sources in bundles.items():
+        contents = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), 'r', encoding='utf-8') as f:
+                contents.append(f.read())
+        if name.endswith('.css'):
+            output = minify_css('\n'.join(contents))
+        else:
+            # Separate scripts with ';' so a file without a trailing semicolon can't merge with the next
+            output = ';\n'.join(minify_js(content) for content in contents)
+        data = output.encode('utf-8')
+        relpath = fingerprint_name(f"{DIST_DIR}/{name}", hashlib.sha256(data).hexdigest()[:HASH_LENGTH])
+        with open(os.path.join(static_folder, relpath), 'wb') as f:
+            f.write(data)
+        built[name] = relpath
+
+    # Remove bundles from previous builds
+    current = {os.path.basename(path) for path in built.values()}
+    for filename in os.listdir(dist_folder):
+        if filename not in current and filename != os.path.basename(BUNDLES_FILE):
+            os.remove(os.path.join(dist_folder, filename))
+
+    with open(os.path.join(static_folder, DIST_DIR, os.path.basename(BUNDLES_FILE)), 'w', encoding='utf-8') as f:
+        json.dump(built, f, indent=2, sort_keys=True)
+    return built
+
+
+def precompress_assets(static_folder, paths):
+    """Write .gz/.br siblings for the compressible files among paths (relative to static_folder)"""
+    count = 0
+    for relpath in paths:
+        if relpath.endswith(COMPRESSIBLE_EXTENSIONS):
+            if precompress_file(os.path.join(static_folder, relpath)):
+                count += 1
+    return count
+
+
+class AssetManifest:
+    """In-memory lookup between source and fingerprinted static paths"""
+
+    def __init__(self, static_folder=STATIC_FOLDER, manifest_file=MANIFEST_FILE):
+        self.static_folder = static_folder
+        self.manifest_file = manifest_file
+        self.assets = {}
+        self.sources = {}
+        self.bundles = {}
+        self.compressed = {}
+        self.digest = ''
+
+    def load(self):
+        """Read the prebuilt manifest if one exists, otherwise hash static/ now"""
+        manifest = None
+        if os.path.exists(self.manifest_file):
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ Could not read asset manifest ({e}), rebuilding")
+        if manifest is None:
+            manifest = build_manifest(self.static_folder)
+
+        bundles = {}
+        bundles_file = os.path.join(self.static_folder, DIST_DIR, os.path.basename(BUNDLES_FILE))
+        if os.path.exists(bundles_file):
+            try:
+                with open(bundles_file, 'r', encoding='utf-8') as f:
+                    bundles = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ Could not read asset bundles ({e}), serving source files")
+        self._set(manifest, bundles)
+        return self
+
+    def _set(self, manifest, bundles=None):
+        self.assets = manifest
+        self.sources = {fingerprinted: source for source, fingerprinted in manifest.items()}
+        self.bundles = bundles or {}
+        payload = json.dumps([manifest, self.bundles], sort_keys=True)
+        self.digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+        # Precompressed siblings written by the build step, checked once here
+        self.compressed = {}
+        for relpath in list(manifest) + list(self.bundles.values()):
+            if relpath.endswith(COMPRESSIBLE_EXTENSIONS):
+                path = os.path.join(self.static_folder, relpath)
+                encodings = {encoding for encoding, suffix in ENCODING_SUFFIXES.items()
+                             if os.path.exists(path + suffix)}
+                if encodings:
+                    self.compressed[relpath] = encodings
+
+    def compressed_encodings(self, filename):
+        """Encodings with a precompressed sibling for a static file"""
+        return self.compressed.get(filename, ())
+
+    def bundle_path(self, name):
+        """Built bundle path for a bundle name, or None if the build step hasn't run"""
+        return self.bundles.get(name)
+
+    def url_path(self, filename):
+        """Fingerprinted path for a static file (the filename itself if unknown)"""
+        return self.assets.get(filename, filename)
+
+    def resolve(self, filename):
+        """Source path for a fingerprinted request path, or None"""
+        return self.sources.get(filename)
+
+    def refresh_file(self, filename):
+        """Re-hash a single file (used in debug mode so edits show up without a restart)"""
+        path = os.path.join(self.static_folder, filename)
+        if not os.path.isfile(path):
+            return
+        fingerprinted = fingerprint_name(filename, _hash_file(path))
+        if self.assets.get(filename) != fingerprinted:
+            self.sources.pop(self.assets.get(filename), None)
+            self.assets[filename] = fingerprinted
+            self.sources[fingerprinted] = filename
+
+    def write(self):
+        """Write the current manifest to disk for later startups"""
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(self.assets, f, indent=2, sort_keys=True)
+
+
+_asset_manifest = None
+_asset_manifest_lock = threading.Lock()
+
+
+def get_asset_manifest():
+    """The app's asset manifest, loaded on first use (hashing static/ is kept off the import path)"""
+    global _asset_manifest
+    if _asset_manifest is None:
+        with _asset_manifest_lock:
+            if _asset_manifest is None:
+                _asset_manifest = AssetManifest().load()
+    return _asset_manifest
+
+
+if __name__ == '__main__':
+    builder = AssetManifest()
+    built = build_bundles(builder.static_folder)
+    for name, path in sorted(built.items()):
+        sources = BUNDLES[name]
+        source_size = sum(os.path.getsize(os.path.join(builder.static_folder, src)) for src in sources)
+        bundle_size = os.path.getsize(os.path.join(builder.static_folder, path))
+        print(f"  {name}: {len(sources)} file(s), {source_size} → {bundle_size} bytes ({path})")
+    manifest = build_manifest(builder.static_folder)
+    compressed = precompress_assets(builder.static_folder, list(manifest) + list(built.values()))
+    builder._set(manifest, built)
+    builder.write()
+    print(f"✓ Wrote {len(built)} bundles and {len(builder.assets)} assets to {builder.manifest_file}")
+    print(f"✓ Precompressed {compressed} files")
@@ -0,0 +1,709 @@
+#!/usr/bin/env python3
+"""
+Load test of the app under gunicorn with a realistic traffic mix.
+Starts local stubs for the Cloudinary API (uploads, resource lookups, raw
+file delivery) and the YouTube RSS feed/thumbnails, seeds them with the
+synthetic content from suite.py, starts gunicorn against them and drives
+it with asyncio virtual users. Nothing leaves the machine and the real
+data/ files are never touched.
+
+    python benchmarks/loadtest.py                                   # 4 sync workers, 50 users, 30 s
+    python benchmarks/loadtest.py -w 2 -k gthread --threads 8 --users 200 --duration 60
+    python benchmarks/loadtest.py --mix home=50,api_videos=50,admin_edit=0
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000       # an already running server
+    python benchmarks/loadtest.py --output run.json
+
+Each virtual user keeps one keep-alive connection and loops: pick an
+operation by weight, send it, wait --think ms. The default mix is mostly
+public pages (both languages), /api/videos and cached thumbnails, with an
+occasional admin event edit through a logged-in session (which saves JSON
+through the Cloudinary stub and invalidates the caches). Throughput,
+latency percentiles and errors are reported per operation; requests in the
+first --warmup seconds are not counted.
+
+Needs gunicorn and the cloudinary package (storage would otherwise fall
+back to the local data/ directory). With --url the stubs are not started
+and only the public operations are used unless --admin-password is given.
+"""
+import argparse
+import asyncio
+import email.parser
+import email.policy
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import re
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from suite import ROOT, generate_data, git_commit
+
+try:
+    from PIL import Image
+except ImportError:  # the app stores thumbnails as-is without Pillow, so any bytes will do
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIX = {
+    'home': 25, 'blog': 10, 'blog_detail': 15, 'events': 8, 'photos': 6, 'gallery': 8,
+    'videos': 5, 'projects': 2, 'donate': 2, 'api_videos': 10, 'thumbnail': 8, 'admin_edit': 1,
+}
+LANGUAGE_PREFIXES = ('', '', '/en', '/hi')  # half without a prefix (cookie-less visitors)
+USER_AGENT = 'loadtest/1.0'
+ACCEPT_ENCODING = 'gzip, br' if brotli is not None else 'gzip'
+CLOUD_NAME = 'loadtest'
+FEED_VIDEOS = 30
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def decode(headers, body):
+    encoding = headers.get('content-encoding', '')
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'br':
+        return brotli.decompress(body)
+    return body
+
+
+def thumbnail_bytes():
+    if Image is None:
+        return b'\xff\xd8\xff\xe0loadtest-thumbnail\xff\xd9'
+    buffer = io.BytesIO()
+    Image.new('RGB', (480, 360), (200, 120, 40)).save(buffer, 'JPEG', quality=80)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------- stubs
+
+class StubServer(ThreadingHTTPServer):
+    """Cloudinary API + delivery and YouTube feed + thumbnails, in one threaded server"""
+    daemon_threads = True
+
+    def __init__(self, latency_ms, seed_files):
+        super().__init__(('127.0.0.1', free_port()), StubHandler)
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.latency = latency_ms / 1000
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.files = {('raw', f"data/{name}"): content for name, content in seed_files.items()}
+        # No cached feed yet, so the workers fetch it from the stub instead of using data/youtube_cache.json
+        self.files[('raw', 'data/youtube_cache')] = b'{}'
+        self.thumbnail = thumbnail_bytes()
+        self.feed = self._build_feed()
+        self.feed_etag = '"' + hashlib.md5(self.feed).hexdigest() + '"'
+
+    def _build_feed(self):
+        now = datetime.now(timezone.utc)
+        entries = []
+        for k in range(FEED_VIDEOS):
+            video_id = f"loadtest{k:03d}"
+            published = (now - timedelta(days=k)).isoformat()
+            entries.append(
+                f"<entry><id>yt:video:{video_id}</id><yt:videoId>{video_id}</yt:videoId>"
+                f"<title>Video {k}</title><published>{published}</published><updated>{published}</updated>"
+                f"<media:group><media:title>Video {k}</media:title>"
+                f"<media:thumbnail url=\"{self.base_url}/vi/{video_id}/hqdefault.jpg\" width=\"480\" height=\"360\"/>"
+                f"<media:description>Description {k}</media:description></media:group></entry>")
+        return ('<?xml version="1.0" encoding="UTF-8"?><feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" '
+                'xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">'
+                f"<title>loadtest</title>{''.join(entries)}</feed>").encode()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', content_type='application/json', headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, name):
+        with self.server.lock:
+            self.server.calls[name] += 1
+
+    def _form(self):
+        """Fields of a multipart or urlencoded POST body (file fields as bytes)"""
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        content_type = self.headers.get('Content-Type', '')
+        if not content_type.startswith('multipart/form-data'):
+            return dict(urllib.parse.parse_qsl(body.decode()))
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        fields = {}
+        for part in message.iter_parts():
+            payload = part.get_payload(decode=True)
+            name = part.get_param('name', header='content-disposition')
+            fields[name] = payload if part.get_filename() else payload.decode()
+            if part.get_filename():
+                fields[f"{name}.filename"] = part.get_filename()
+        return fields
+
+    def _delivery_url(self, resource_type, public_id):
+        return f"{self.server.base_url}/{CLOUD_NAME}/{resource_type}/upload/v1/{public_id}"
+
+    def do_GET(self):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        if path == '/feeds/videos.xml':
+            self._count('youtube feed')
+            time.sleep(self.server.latency)
+            if self.headers.get('If-None-Match') == self.server.feed_etag:
+                self._send(304, headers={'ETag': self.server.feed_etag})
+            else:
+                self._send(200, self.server.feed, 'application/atom+xml', {'ETag': self.server.feed_etag})
+            return
+        if path.startswith('/vi/'):
+            self._count('youtube thumbnail')
+            self._send(200, self.server.thumbnail, 'image/jpeg')
+            return
+
+        match = re.match(rf'^/v1_1/{CLOUD_NAME}/resources/(\w+)/upload/(.+)$', path)
+        if match:
+            self._count('cloudinary resource')
+            time.sleep(self.server.latency)
+            resource_type, public_id = match.groups()
+            with self.server.lock:
+                found = (resource_type, public_id) in self.server.files
+            if not found:
+                self._send(404, {'error': {'message': f"Resource not found - {public_id}"}})
+                return
+            self._send(200, {'public_id': public_id, 'resource_type': resource_type, 'type': 'upload',
+                             'secure_url': self._delivery_url(resource_type, public_id)})
+            return
+
+        match = re.match(rf'^/{CLOUD_NAME}/(\w+)/upload/v\d+/(.+)$', path)
+        if match:
+            self._count('cloudinary delivery')
+            with self.server.lock:
+                content = self.server.files.get(tuple(match.groups()))
+            if content is None:
+                self._send(404, b'not found', 'text/plain')
+            else:
+                self._send(200, content, 'application/octet-stream')
+            return
+        self._send(404, b'not found', 'text/plain')
+
+    def do_POST(self):
+        path = urllib.parse.urlsplit(self.path).path
+        match = re.match(rf'^/v1_1/{CLOUD_NAME}/(\w+)/(upload|destroy)$', path)
+        if not match:
+            self._send(404, {'error': {'message': 'unknown endpoint'}})
+            return
+        resource_type, action = match.groups()
+        self._count(f"cloudinary {action}")
+        time.sleep(self.server.latency)
+        fields = self._form()
+
+        if action == 'destroy':
+            with self.server.lock:
+                removed = self.server.files.pop((resource_type, fields.get('public_id', '')), None)
+            self._send(200, {'result': 'ok' if removed is not None else 'not found'})
+            return
+
+        content = fields.get('file', b'')
+        if isinstance(content, str):
+            content = content.encode()
+        if resource_type == 'auto':
+            resource_type = 'raw' if fields.get('file.filename', '').endswith('.json') else 'image'
+        public_id = fields.get('public_id') or (
+            os.path.splitext(fields.get('file.filename') or 'file')[0] + '_' + secrets.token_hex(3))
+        if fields.get('folder'):
+            public_id = f"{fields['folder']}/{public_id}"
+        with self.server.lock:
+            self.server.files[(resource_type, public_id)] = content
+        url = self._delivery_url(resource_type, public_id)
+        self._send(200, {'public_id': public_id, 'resource_type': resource_type, 'type': 'upload',
+                         'bytes': len(content), 'version': 1, 'url': url, 'secure_url': url})
+
+
+# ---------------------------------------------------------------- client
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client on asyncio streams (Content-Length and chunked bodies)"""
+
+    def __init__(self, host, port, timeout):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.reader = self.writer = None
+        self.cookies = {}
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b'', headers=None):
+        """
+        Send one request, reconnecting once if a reused connection was closed by the server.
+        Returns:
+            (status, headers dict with lower-case names, body bytes)
+        """
+        for attempt in (1, 2):
+            reused = self.writer is not None
+            try:
+                if not reused:
+                    self.reader, self.writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout)
+                return await asyncio.wait_for(self._exchange(method, path, body, headers or {}), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if not reused or attempt == 2:
+                    raise
+            except BaseException:
+                await self.close()
+                raise
+
+    async def _exchange(self, method, path, body, headers):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"User-Agent: {USER_AGENT}",
+                 f"Accept-Encoding: {ACCEPT_ENCODING}", 'Connection: keep-alive']
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(f"{name}={value}" for name, value in self.cookies.items()))
+        if body or method == 'POST':
+            lines.append(f"Content-Length: {len(body)}")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = (await self.reader.readuntil(b'\r\n')).decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                cookie_name, _, rest = value.partition('=')
+                self.cookies[cookie_name] = rest.split(';', 1)[0]
+            response_headers[name] = value
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    while (await self.reader.readuntil(b'\r\n')) != b'\r\n':
+                        pass
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            content = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            content = await self.reader.readexactly(int(response_headers['content-length']))
+        elif method == 'HEAD' or status in (204, 304):
+            content = b''
+        else:
+            content = await self.reader.read()
+            response_headers['connection'] = 'close'
+
+        # gunicorn sync workers close the connection after every response
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, response_headers, content
+
+
+# ---------------------------------------------------------------- traffic
+
+class Admin:
+    """The one admin session shared by all virtual users (a new login would invalidate it)"""
+
+    def __init__(self, host, port, timeout, username, password):
+        self.connection = Connection(host, port, timeout)
+        self.username, self.password = username, password
+        self.lock = asyncio.Lock()
+        self.csrf_token = None
+
+    async def login(self):
+        form = urllib.parse.urlencode({'username': self.username, 'password': self.password}).encode()
+        status, headers, _ = await self.connection.request(
+            'POST', '/admin/login', form, {'Content-Type': 'application/x-www-form-urlencoded'})
+        if status != 302 or '/admin/login' in headers.get('location', ''):
+            raise RuntimeError(f"admin login failed (HTTP {status})")
+        status, _, body = await self.connection.request('GET', '/admin/csrf-token')
+        self.csrf_token = json.loads(body)['csrf_token']
+
+    async def edit_event(self, event):
+        """Fetch the edit form and submit it with a changed description; returns (status, bytes, ok)"""
+        async with self.lock:
+            if self.csrf_token is None:
+                await self.login()
+            path = f"/admin/events/edit/{event['id']}"
+            status, _, page = await self.connection.request('GET', path)
+            if status != 200:
+                self.csrf_token = None
+                return status, len(page), False
+            fields = {name: event.get(name, '') for name in ('title', 'titleEn', 'date', 'time', 'location',
+                                                             'locationEn', 'descriptionEn')}
+            fields['description'] = f"{event.get('description', '')} [{secrets.token_hex(4)}]"
+            fields['csrf_token'] = self.csrf_token
+            status, headers, body = await self.connection.request(
+                'POST', path, urllib.parse.urlencode(fields).encode(),
+                {'Content-Type': 'application/x-www-form-urlencoded', 'X-CSRF-Token': self.csrf_token})
+            ok = status == 302 and headers.get('location', '').endswith('/admin/events')
+            if not ok:
+                self.csrf_token = None  # logged out (timeout, token mismatch): log in again next time
+            return status, len(page) + len(body), ok
+
+
+class Traffic:
+    """Weighted operations against the app; results are (operation, status, seconds, bytes, ok)"""
+
+    def __init__(self, args, data, admin):
+        self.args, self.admin = args, admin
+        self.blog_ids = [blog['id'] for blog in data['BLOGS_DATA_FILE']]
+        self.gallery_ids = [gallery['id'] for gallery in data['PHOTOS_DATA_FILE']]
+        self.events = data['EVENTS_DATA_FILE']
+        self.thumbnails = []
+        mix = dict(args.mix)
+        if admin is None:
+            mix.pop('admin_edit', None)
+        self.operations = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.operations]
+        self.results = []
+        self.measure_from = 0.0
+
+    def page(self, rng, path):
+        return rng.choice(LANGUAGE_PREFIXES) + path
+
+    async def run(self, name, connection, rng):
+        paths = {
+            'home': lambda: self.page(rng, '/'),
+            'blog': lambda: self.page(rng, '/blog'),
+            'blog_detail': lambda: self.page(rng, f"/blog/{rng.choice(self.blog_ids)}"),
+            'events': lambda: self.page(rng, '/events'),
+            'photos': lambda: self.page(rng, '/photos'),
+            'gallery': lambda: self.page(rng, f"/photos/{rng.choice(self.gallery_ids)}"),
+            'videos': lambda: self.page(rng, '/videos'),
+            'projects': lambda: self.page(rng, '/projects'),
+            'donate': lambda: self.page(rng, '/donate'),
+            'api_videos': lambda: '/api/videos',
+        }
+        if name == 'thumbnail' and not self.thumbnails:
+            name = 'api_videos'  # nothing to fetch until a video list has been seen
+
+        start = time.perf_counter()
+        try:
+            if name == 'admin_edit':
+                status, size, ok = await self.admin.edit_event(rng.choice(self.events))
+            else:
+                path = rng.choice(self.thumbnails) if name == 'thumbnail' else paths[name]()
+                status, headers, body = await connection.request('GET', path)
+                size, ok = len(body), status < 400
+                if name == 'api_videos' and status == 200 and not self.thumbnails:
+                    videos = json.loads(decode(headers, body))
+                    self.thumbnails = [video['thumbnail'] for video in videos
+                                       if video.get('thumbnail', '').startswith('/')]
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, RuntimeError, ValueError, KeyError) as e:
+            status, size, ok = type(e).__name__, 0, False
+        elapsed = time.perf_counter() - start
+        if start >= self.measure_from:
+            self.results.append((name, status, elapsed, size, ok))
+
+    async def user(self, index, host, port, deadline):
+        rng = random.Random(self.args.seed * 100_003 + index)
+        connection = Connection(host, port, self.args.timeout)
+        # Spread arrivals over the ramp-up instead of connecting everyone at once
+        await asyncio.sleep(rng.uniform(0, self.args.ramp))
+        try:
+            while time.perf_counter() < deadline:
+                name = rng.choices(self.operations, self.weights)[0]
+                await self.run(name, connection, rng)
+                if self.args.think:
+                    await asyncio.sleep(rng.expovariate(1000 / self.args.think))
+        finally:
+            await connection.close()
+
+    async def drive(self, host, port):
+        start = time.perf_counter()
+        self.measure_from = start + self.args.warmup
+        deadline = self.measure_from + self.args.duration
+        await asyncio.gather(*(self.user(i, host, port, deadline) for i in range(self.args.users)))
+        return time.perf_counter() - self.measure_from
+
+
+# ---------------------------------------------------------------- report
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+def summarize(results, elapsed):
+    """Per-operation and overall throughput, latency percentiles (ms) and errors"""
+    groups = defaultdict(list)
+    for result in results:
+        groups[result[0]].append(result)
+        groups['TOTAL'].append(result)
+    summary = {}
+    for name, rows in groups.items():
+        latencies = sorted(row[2] * 1000 for row in rows)
+        errors = sum(1 for row in rows if not row[4])
+        summary[name] = {
+            'requests': len(rows),
+            'rps': round(len(rows) / elapsed, 2),
+            'errors': errors,
+            'error_rate': round(errors / len(rows), 4),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p90_ms': round(percentile(latencies, 0.90), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'max_ms': round(latencies[-1], 2),
+            'mean_kb': round(sum(row[3] for row in rows) / len(rows) / 1024, 1),
+            'statuses': dict(Counter(str(row[1]) for row in rows)),
+        }
+    return summary
+
+
+def print_summary(summary):
+    print(f"  {'operation':<14}{'requests':>9}{'req/s':>9}{'errors':>8}{'p50 ms':>9}{'p90 ms':>9}"
+          f"{'p99 ms':>9}{'max ms':>9}{'KB':>8}")
+    for name in sorted(summary, key=lambda name: (name == 'TOTAL', -summary[name]['requests'])):
+        row = summary[name]
+        print(f"  {name:<14}{row['requests']:>9}{row['rps']:>9.1f}{row['errors']:>8}{row['p50_ms']:>9.1f}"
+              f"{row['p90_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}{row['mean_kb']:>8.1f}")
+    failing = {name: row['statuses'] for name, row in summary.items() if row['errors'] and name != 'TOTAL'}
+    for name, statuses in failing.items():
+        print(f"⚠ {name}: {statuses}")
+
+
+def scrape_metrics(base_url, token):
+    """Page/data cache hit ratios and external calls from /metrics (all workers)"""
+    request = urllib.request.Request(f"{base_url}/metrics", headers={'Authorization': f"Bearer {token}"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            text = response.read().decode()
+    except OSError as e:
+        print(f"⚠ Could not read /metrics: {e}")
+        return {}
+    totals = defaultdict(float)
+    for line in text.splitlines():
+        match = re.match(r'^(page_cache_requests_total|data_cache_requests_total|external_requests_total)'
+                         r'\{([^}]*)\} ([0-9.e+-]+)$', line)
+        if match:
+            labels = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2)))
+            key = '/'.join([match.group(1)] + [labels[name] for name in sorted(labels)])
+            totals[key] += float(match.group(3))
+    return dict(totals)
+
+
+# ---------------------------------------------------------------- gunicorn
+
+def start_gunicorn(args, stub, run_dir, password_hash):
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        'USE_CLOUDINARY': 'true',
+        'CLOUDINARY_CLOUD_NAME': CLOUD_NAME,
+        'CLOUDINARY_API_KEY': '123456789012345',
+        'CLOUDINARY_API_SECRET': 'loadtest-secret',
+        'CLOUDINARY_UPLOAD_PREFIX': stub.base_url,
+        'YOUTUBE_FEED_URL': f"{stub.base_url}/feeds/videos.xml?channel_id=loadtest",
+        'YOUTUBE_FEEDS': '',
+        'YOUTUBE_REFRESH_ENABLED': 'true',
+        'THUMBNAIL_CACHE_DIR': os.path.join(run_dir, 'youtube_thumbnails'),
+        'PAGE_CACHE_DIR': '',
+        'METRICS_ENABLED': 'true',
+        'METRICS_TOKEN': args.metrics_token,
+        'METRICS_DIR': os.path.join(run_dir, 'metrics'),
+        'METRICS_FLUSH_SECONDS': '1',
+        'SINGLEFLIGHT_LOCK_DIR': os.path.join(run_dir, 'singleflight'),
+        'SCHEDULER_DIR': os.path.join(run_dir, 'scheduler'),
+        'SERVER_TIMING_ENABLED': 'false',
+        'SECRET_KEY': secrets.token_hex(16),
+        'ADMIN_USERNAME': args.admin_username,
+        'ADMIN_PASSWORD_HASH': password_hash,
+        'ADMIN_ALLOWED_IPS': '',
+    })
+    command = [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--worker-class', args.worker_class,
+               '--threads', str(args.threads), '--bind', f"127.0.0.1:{port}", '--chdir', ROOT,
+               '--timeout', '60'] + (['--access-logfile', '-'] if args.access_log else []) + ['app:app']
+    log_path = os.path.join(run_dir, 'gunicorn.log')
+    log = open(log_path, 'w')
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process, port, log_path
+
+
+def wait_until_ready(process, port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            # 503 (an HTTPError) until the worker answering has finished its warm-up
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz/ready", timeout=10) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def parse_mix(text):
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        name, _, weight = item.partition('=')
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r} (one of {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-w', '--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('-k', '--worker-class', default='sync', help='gunicorn worker class (sync, gthread, gevent...)')
+    parser.add_argument('--threads', type=int, default=1, help='threads per worker (gthread)')
+    parser.add_argument('--users', type=int, default=50, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='seconds of traffic before measuring')
+    parser.add_argument('--ramp', type=float, default=2, help='seconds over which users start')
+    parser.add_argument('--think', type=float, default=0, help='mean think time between requests in ms')
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout in seconds')
+    parser.add_argument('--mix', type=parse_mix, default=dict(DEFAULT_MIX),
+                        help='operation weights, e.g. home=50,admin_edit=0 (others keep their defaults)')
+    parser.add_argument('--stub-latency', type=float, default=30, help='ms added to each Cloudinary/YouTube API call')
+    parser.add_argument('--scale', type=float, default=0.1, help='dataset size relative to suite.py full scale')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--url', help='test this running server instead of starting gunicorn and the stubs')
+    parser.add_argument('--admin-username', default='loadtest')
+    parser.add_argument('--admin-password', help='admin password (generated when gunicorn is started here)')
+    parser.add_argument('--access-log', action='store_true', help='keep the gunicorn access log')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+    args.blogs, args.events, args.galleries = (max(1, int(count * args.scale)) for count in (10_000, 2_000, 500))
+    args.photos_per_gallery, args.nav_columns, args.nav_items = 200, 6, 25
+    args.metrics_token = secrets.token_hex(16)
+
+    data = generate_data(random.Random(args.seed), args)
+    run_dir = tempfile.mkdtemp(prefix='loadtest-')
+    process = stub = None
+    session_file = saved_session = None
+    try:
+        if args.url:
+            target = urllib.parse.urlsplit(args.url)
+            host, port = target.hostname, target.port or 80
+            base_url = f"http://{host}:{port}"
+            admin = Admin(host, port, args.timeout, args.admin_username, args.admin_password) \
+                if args.admin_password else None
+            print(f"ℹ Testing {base_url} (its own data; ids from the synthetic set may 404)")
+        else:
+            if importlib.util.find_spec('gunicorn') is None or importlib.util.find_spec('cloudinary') is None:
+                print("⚠ gunicorn and cloudinary must be installed: pip install gunicorn cloudinary")
+                sys.exit(2)
+            from config import Config
+            from werkzeug.security import generate_password_hash
+            # auth keeps the active admin session token in a local file; put it back afterwards
+            session_file = Config.ADMIN_SESSION_DATA_FILE
+            if os.path.exists(session_file):
+                with open(session_file, 'rb') as f:
+                    saved_session = f.read()
+            seed_files = {os.path.basename(getattr(Config, attribute)).replace('.json', ''):
+                          json.dumps(content, ensure_ascii=False).encode() for attribute, content in data.items()}
+            stub = StubServer(args.stub_latency, seed_files).start()
+            args.admin_password = args.admin_password or secrets.token_urlsafe(12)
+            process, port, log_path = start_gunicorn(args, stub, run_dir, generate_password_hash(args.admin_password))
+            host, base_url = '127.0.0.1', f"http://127.0.0.1:{port}"
+            print(f"ℹ gunicorn {args.workers} x {args.worker_class} (threads {args.threads}) on {base_url}, "
+                  f"stubs on {stub.base_url}, log {log_path}")
+            if not wait_until_ready(process, port):
+                print("⚠ gunicorn did not become ready; last log lines:")
+                with open(log_path, encoding='utf-8', errors='replace') as f:
+                    print(''.join(f.readlines()[-20:]))
+                sys.exit(1)
+            admin = Admin(host, port, args.timeout, args.admin_username, args.admin_password)
+
+        print(f"ℹ {args.users} users for {args.warmup:g}s warm-up + {args.duration:g}s, "
+              f"{args.blogs} blogs, {args.events} events, {args.galleries} galleries")
+        traffic = Traffic(args, data, admin)
+        elapsed = asyncio.run(traffic.drive(host, port))
+        summary = summarize(traffic.results, elapsed)
+        if not summary:
+            print("⚠ No requests completed")
+            sys.exit(1)
+        print_summary(summary)
+
+        server = {}
+        if stub is not None:
+            time.sleep(1.5)  # let every worker flush its metrics snapshot
+            server = {'metrics': scrape_metrics(base_url, args.metrics_token), 'stub_calls': dict(stub.calls)}
+            for key, value in sorted(server['metrics'].items()):
+                print(f"  {key:<60}{value:>10.0f}")
+            print(f"  stub calls: {', '.join(f'{name} {count}' for name, count in sorted(stub.calls.items()))}")
+    finally:
+        if process is not None and process.poll() is None:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if stub is not None:
+            stub.shutdown()
+        if session_file is not None:
+            if saved_session is not None:
+                with open(session_file, 'wb') as f:
+                    f.write(saved_session)
+            elif os.path.exists(session_file):
+                os.remove(session_file)
+
+    if args.output:
+        report = {
+            'meta': {
+                'commit': git_commit(),
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'params': {key: value for key, value in vars(args).items()
+                           if key not in ('output', 'admin_password', 'metrics_token')},
+                'elapsed_seconds': round(elapsed, 2),
+            },
+            'results': summary,
+            'server': server,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Contention benchmark for singleflight.SingleFlight.
+Many callers miss the same key at once and each would run a slow loader
+(simulating a Cloudinary JSON download). Compares how many loads run and
+how long callers wait, with and without coalescing:
+
+    python benchmarks/singleflight_contention.py [--threads 32] [--workers 4] [--load-ms 50]
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from singleflight import SingleFlight  # noqa: E402
+
+
+def slow_load(load_ms, counter_file):
+    """The expensive miss: sleep, and record that a load happened"""
+    with open(counter_file, 'a') as f:
+        f.write('x')
+    time.sleep(load_ms / 1000)
+    return {'items': list(range(100))}
+
+
+def run_threads(call, threads):
+    """Start all callers together; return their latencies in ms"""
+    barrier = threading.Barrier(threads)
+    latencies = []
+    lock = threading.Lock()
+
+    def caller():
+        barrier.wait()
+        start = time.perf_counter()
+        call()
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+
+    workers = [threading.Thread(target=caller) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies
+
+
+def worker_process(mode, threads, load_ms, counter_file, lock_dir, start_at, results):
+    flight = SingleFlight('bench', lock_dir=lock_dir)
+    load = lambda: slow_load(load_ms, counter_file)
+    if mode == 'none':
+        call = load
+    elif mode == 'threads':
+        call = lambda: flight.do('key', load)
+    else:
+        call = lambda: flight.do_shared('key', load, share_for=5)
+    time.sleep(max(0, start_at - time.time()))
+    results.extend(run_threads(call, threads))
+
+
+def scenario(mode, workers, threads, load_ms):
+    with tempfile.TemporaryDirectory() as tmp:
+        counter_file = os.path.join(tmp, 'loads')
+        open(counter_file, 'w').close()
+        with multiprocessing.Manager() as manager:
+            results = manager.list()
+            start_at = time.time() + 0.5
+            processes = [
+                multiprocessing.Process(target=worker_process,
+                                        args=(mode, threads, load_ms, counter_file, tmp, start_at, results))
+                for _ in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            latencies = sorted(results)
+        with open(counter_file) as f:
+            loads = len(f.read())
+    return loads, latencies
+
+
+def stale_scenario(threads, load_ms):
+    """Callers holding a stale copy return immediately while one thread reloads"""
+    with tempfile.TemporaryDirectory() as tmp:
+        counter_file = os.path.join(tmp, 'loads')
+        open(counter_file, 'w').close()
+        flight = SingleFlight('bench', lock_dir=tmp)
+        stale = {'items': []}
+        latencies = sorted(run_threads(lambda: flight.do('key', lambda: slow_load(load_ms, counter_file), stale=stale), threads))
+        with open(counter_file) as f:
+            return len(f.read()), latencies
+
+
+def report(label, loads, latencies):
+    p50 = statistics.median(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  {label:<42} loads={loads:<4} p50={p50:7.1f}ms  p95={p95:7.1f}ms  max={latencies[-1]:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32, help='concurrent callers per worker')
+    parser.add_argument('--workers', type=int, default=4, help='worker processes')
+    parser.add_argument('--load-ms', type=int, default=50, help='duration of one load')
+    args = parser.parse_args()
+
+    print(f"{args.workers} worker(s) x {args.threads} thread(s), {args.load_ms}ms per load")
+    report('no coalescing', *scenario('none', args.workers, args.threads, args.load_ms))
+    report('single-flight (threads)', *scenario('threads', args.workers, args.threads, args.load_ms))
+    report('single-flight (threads + workers)', *scenario('shared', args.workers, args.threads, args.load_ms))
+    report('single-flight, stale allowed (1 worker)', *stale_scenario(args.threads, args.load_ms))
+
+
+if __name__ == '__main__':
+    main()
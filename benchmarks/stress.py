@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for the data layer (what gthread/gevent workers do to it).
+Reader threads hammer the data_manager getters and full page renders while
+writer threads add blogs, edit events, reorder blogs and add navbar items,
+all in one process, against synthetic content in a temporary directory:
+
+    python benchmarks/stress.py                              # 16 readers, 4 writers
+    python benchmarks/stress.py --readers 64 --writers 8 --writes 50 --ttl 0.01
+
+Readers check every snapshot they get (non-empty, sorted by order, no
+duplicate ids) and that every page renders; at the end every write must be
+present both in memory and in the saved files (no lost updates). Any failure
+is listed and the exit status is 1. A short --ttl makes cache reloads race
+with the writes; the thread switch interval is lowered to interleave more.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suite import generate_data, point_config_at  # noqa: E402  (also sets up a local-only environment)
+
+os.environ.update({'PAGE_CACHE_ENABLED': 'false', 'SLOW_REQUEST_THRESHOLD': '0'})
+
+PAGES = ('/', '/blog', '/events', '/photos', '/donate', '/hi/blog', '/en/events')
+
+
+class Failures:
+    """Thread-safe collection of check failures (first few kept in full)"""
+
+    def __init__(self, keep=10):
+        self.counts = Counter()
+        self.examples = []
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def add(self, kind, detail):
+        with self._lock:
+            self.counts[kind] += 1
+            if len(self.examples) < self.keep:
+                self.examples.append(f"{kind}: {detail}")
+
+
+def check_collection(items, what, failures):
+    if not items:
+        failures.add('empty snapshot', what)
+        return
+    orders = [item.get('order', 0) for item in items]
+    if orders != sorted(orders):
+        failures.add('unsorted snapshot', what)
+    ids = [str(item.get('id')) for item in items]
+    if len(ids) != len(set(ids)):
+        failures.add('duplicate ids', what)
+
+
+def reader(dm, app, stop, failures, counts):
+    client = app.test_client()
+    rng = random.Random(threading.get_ident())
+    checks = (
+        ('get_all_blogs', lambda: check_collection(dm.get_all_blogs(), 'blogs', failures)),
+        ('get_all_events', lambda: check_collection(dm.get_all_events(), 'events', failures)),
+        ('get_all_galleries', lambda: check_collection(dm.get_all_galleries(), 'galleries', failures)),
+        ('navbar', lambda: [check_collection(column['items'], 'navbar items', failures)
+                            for dropdown in dm.get_navbar_dropdowns_data()['dropdowns'].values()
+                            for column in dropdown['columns']]),
+        ('page', lambda: render(client, rng.choice(PAGES), failures)),
+    )
+    while not stop.is_set():
+        name, check = rng.choice(checks)
+        try:
+            check()
+        except Exception:
+            failures.add(f"{name} raised", traceback.format_exc(limit=3))
+        counts[name] += 1
+
+
+def render(client, path, failures):
+    response = client.get(path)
+    if response.status_code != 200:
+        failures.add('page error', f"{path} -> {response.status_code}")
+
+
+def writer(dm, number, writes, failures, written):
+    rng = random.Random(number)
+    nav_item = 'projects'
+    for k in range(writes):
+        action = k % 4
+        try:
+            if action == 0:
+                blog_id = f"stress-{number}-{k}"
+                ok = dm.add_blog({'id': blog_id, 'title': blog_id, 'titleEn': blog_id})
+                written['blogs'].append(blog_id)
+            elif action == 1:
+                event = rng.choice(dm.get_all_events())
+                ok = dm.update_event(event['id'], {**event, 'titleEn': f"edited by {number}-{k}"})
+            elif action == 2:
+                ids = [blog['id'] for blog in dm.get_all_blogs()]
+                subset = rng.sample(ids, min(20, len(ids)))
+                ok = dm.update_blog_order(subset)
+            else:
+                column = dm.get_navbar_dropdowns_data()['dropdowns'][nav_item]['columns'][0]
+                title = f"stress-{number}-{k}"
+                ok, _ = dm.add_dropdown_item(nav_item, column['id'], {'title': title, 'link': '#'})
+                written['nav'].append(title)
+            if not ok:
+                failures.add('write failed', f"writer {number} action {action}")
+        except Exception:
+            failures.add('write raised', traceback.format_exc(limit=3))
+
+
+def verify_writes(dm, Config, written, failures):
+    """Every added blog and navbar item must be in memory and on disk"""
+    with open(Config.BLOGS_DATA_FILE, encoding='utf-8') as f:
+        saved_blogs = {str(blog.get('id')) for blog in json.load(f)}
+    cached_blogs = {str(blog.get('id')) for blog in dm.get_all_blogs()}
+    for blog_id in written['blogs']:
+        if blog_id not in saved_blogs or blog_id not in cached_blogs:
+            failures.add('lost blog', blog_id)
+
+    with open(Config.NAVBAR_DROPDOWNS_DATA_FILE, encoding='utf-8') as f:
+        saved_nav = json.load(f)
+    titles = {item.get('title') for column in saved_nav['dropdowns']['projects']['columns']
+              for item in column.get('items', [])}
+    for title in written['nav']:
+        if title not in titles:
+            failures.add('lost navbar item', title)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=16)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--writes', type=int, default=20, help='writes per writer thread')
+    parser.add_argument('--ttl', type=float, default=0.05, help='data cache TTL in seconds')
+    parser.add_argument('--blogs', type=int, default=500)
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--galleries', type=int, default=20)
+    parser.add_argument('--photos-per-gallery', type=int, default=20)
+    parser.add_argument('--nav-columns', type=int, default=3)
+    parser.add_argument('--nav-items', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    sys.setswitchinterval(1e-5)
+    with tempfile.TemporaryDirectory(prefix='stress-data-') as data_dir:
+        Config = point_config_at(data_dir)
+        for attribute, content in generate_data(random.Random(args.seed), args).items():
+            with open(getattr(Config, attribute), 'w', encoding='utf-8') as f:
+                json.dump(content, f, ensure_ascii=False)
+
+        import data_manager as dm
+        from app import app
+        dm._cache_ttl = args.ttl
+
+        failures = Failures()
+        stop = threading.Event()
+        read_counts = [Counter() for _ in range(args.readers)]
+        written = {'blogs': [], 'nav': []}
+        readers = [threading.Thread(target=reader, args=(dm, app, stop, failures, read_counts[i]), daemon=True)
+                   for i in range(args.readers)]
+        writers = [threading.Thread(target=writer, args=(dm, i, args.writes, failures, written))
+                   for i in range(args.writers)]
+
+        print(f"{args.readers} readers, {args.writers} writers x {args.writes} writes, cache TTL {args.ttl:g} s")
+        start = time.perf_counter()
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        verify_writes(dm, Config, written, failures)
+
+    reads = sum(read_counts, Counter())
+    print(f"  {sum(reads.values())} reads in {elapsed:.1f} s ({sum(reads.values()) / elapsed:.0f}/s): "
+          + ', '.join(f"{name} {count}" for name, count in sorted(reads.items())))
+    print(f"  {args.writers * args.writes} writes ({len(written['blogs'])} blogs, {len(written['nav'])} navbar items added)")
+    if failures.counts:
+        print(f"⚠ {sum(failures.counts.values())} failure(s): "
+              + ', '.join(f"{kind} {count}" for kind, count in failures.counts.most_common()))
+        for example in failures.examples:
+            print(f"    {example}")
+        sys.exit(1)
+    print("✓ No errors, inconsistent snapshots or lost updates")
+
+
+if __name__ == '__main__':
+    main()
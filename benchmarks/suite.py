@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the data layer and the public pages.
+Generates synthetic content in a temporary data directory (the real data/
+files are never touched), then times load_json_data/save_json_data, the
+data_manager get_*/add_*/update_*/update_*_order functions, and full renders
+of the public routes through the Flask test client.
+
+    python benchmarks/suite.py                          # full scale, results to stdout
+    python benchmarks/suite.py --scale 0.1 --repeat 3   # quick run
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --output after.json --compare before.json
+
+Full scale is 10k blogs, 2k events, 500 galleries x 200 photos and navbar
+dropdowns of 5 menus x 6 columns x 25 items. With --compare, operations more
+than --threshold percent slower than the baseline are reported and the exit
+status is 1.
+
+The "startup: import app" case times `python -X importtime -c "import app"`
+in a fresh interpreter (the cold-boot cost of every worker), lists the
+slowest modules and fails the run (exit status 1) if the median is over
+--import-budget milliseconds.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Local storage only, no background threads or per-request instrumentation
+os.environ.update({
+    'USE_CLOUDINARY': 'false',
+    'YOUTUBE_REFRESH_ENABLED': 'false',
+    'SCHEDULER_ENABLED': 'false',
+    'WARMUP_ENABLED': 'false',
+    'SERVER_TIMING_ENABLED': 'false',
+    'METRICS_ENABLED': 'false',
+    'PAGE_CACHE_DIR': '',
+})
+
+NAV_ITEMS = ('projects', 'videos', 'blog', 'photos', 'events')
+CLOUDINARY_BASE = 'https://res.cloudinary.com/demo/image/upload/v1700000000'
+HINDI_WORDS = ('सत्संग', 'भजन', 'सेवा', 'प्रवचन', 'आश्रम', 'कथा', 'ध्यान', 'संत', 'धर्म', 'गुरु')
+ENGLISH_WORDS = ('satsang', 'bhajan', 'service', 'discourse', 'ashram', 'katha', 'meditation', 'saint', 'dharma', 'guru')
+
+
+def words(rng, vocabulary, count):
+    return ' '.join(rng.choice(vocabulary) for _ in range(count))
+
+
+def image_url(rng, folder, index):
+    # Half Cloudinary URLs (responsive srcset generation), half local uploads
+    if index % 2:
+        return f"{CLOUDINARY_BASE}/{folder}/{index}.jpg"
+    return f"/static/uploads/{rng.randrange(16 ** 8):08x}_{index}.jpeg"
+
+
+def generate_data(rng, args):
+    """Synthetic content for every data file, keyed by Config attribute name"""
+    today = datetime.now()
+    stamp = today.isoformat()
+
+    blogs = []
+    for i in range(args.blogs):
+        date = (today - timedelta(days=i)).strftime('%Y-%m-%d')
+        blogs.append({
+            'id': f"blog-post-{i}", 'order': i + 1,
+            'title': words(rng, HINDI_WORDS, 6), 'titleEn': f"Blog post {i} {words(rng, ENGLISH_WORDS, 4)}",
+            'excerpt': words(rng, HINDI_WORDS, 25), 'excerptEn': words(rng, ENGLISH_WORDS, 25),
+            'content': '\n\n'.join(words(rng, HINDI_WORDS, 60) for _ in range(3)),
+            'contentEn': '\n\n'.join(words(rng, ENGLISH_WORDS, 60) for _ in range(3)),
+            'category': rng.choice(HINDI_WORDS), 'categoryEn': rng.choice(ENGLISH_WORDS),
+            'date': date, 'dateEn': date, 'image': image_url(rng, 'blogs', i),
+            'created_at': stamp, 'updated_at': stamp,
+        })
+
+    events = []
+    for i in range(args.events):
+        # Spread over a year either side of today, so the upcoming list is half of them
+        date = (today + timedelta(days=rng.randint(-365, 365))).strftime('%Y-%m-%d')
+        events.append({
+            'id': str(i + 1), 'order': i + 1,
+            'title': words(rng, HINDI_WORDS, 5), 'titleEn': words(rng, ENGLISH_WORDS, 5),
+            'date': date, 'time': f"{rng.randint(6, 21):02d}:00",
+            'location': words(rng, HINDI_WORDS, 3), 'locationEn': words(rng, ENGLISH_WORDS, 3),
+            'description': words(rng, HINDI_WORDS, 30), 'descriptionEn': words(rng, ENGLISH_WORDS, 30),
+            'image': image_url(rng, 'events', i), 'created_at': stamp, 'updated_at': stamp,
+        })
+
+    galleries = []
+    for i in range(args.galleries):
+        photos = [{
+            'id': uuid.UUID(int=rng.getrandbits(128)).hex, 'url': image_url(rng, f"galleries/{i}", j),
+            'caption': words(rng, HINDI_WORDS, 4), 'captionEn': words(rng, ENGLISH_WORDS, 4),
+        } for j in range(args.photos_per_gallery)]
+        galleries.append({
+            'id': f"gallery-{i}", 'order': i + 1,
+            'title': words(rng, HINDI_WORDS, 3), 'titleEn': f"Gallery {i}",
+            'date': '', 'dateEn': '', 'description': words(rng, HINDI_WORDS, 12),
+            'descriptionEn': words(rng, ENGLISH_WORDS, 12),
+            'photos': photos, 'photoCount': len(photos), 'coverImage': photos[0]['url'] if photos else '',
+            'created_at': stamp, 'updated_at': stamp,
+        })
+
+    social_media = {'youtube': 'https://www.youtube.com/@example/', 'instagram': 'https://www.instagram.com/example/'}
+    navbar = {'social_media': social_media, 'dropdowns': {
+        nav_item: {'enabled': True, 'columns': [{
+            'id': f"{nav_item}-col-{c}", 'order': c + 1, 'title': f"Column {c}", 'heading': '',
+            'items': [{'id': f"{nav_item}-{c}-{k}", 'order': k + 1, 'title': words(rng, ENGLISH_WORDS, 2),
+                       'link': f"https://example.org/{nav_item}/{c}/{k}", 'font_size': 'small'}
+                      for k in range(args.nav_items)],
+        } for c in range(args.nav_columns)]}
+        for nav_item in NAV_ITEMS
+    }}
+
+    videos_dropdown = {
+        'categories': [{'id': f"cat-{i}", 'order': i + 1, 'title': f"Category {i}", 'font_size': 'large',
+                        'created_at': stamp} for i in range(50)],
+        'links': [{'id': f"link-{i}", 'order': i + 1, 'title': words(rng, ENGLISH_WORDS, 3),
+                   'url': f"https://www.youtube.com/watch?v={i:011d}", 'font_size': 'small',
+                   'created_at': stamp} for i in range(200)],
+        'social_media': social_media,
+    }
+
+    slider = [{'id': f"slide-{i}", 'order': i + 1, 'imageUrl': image_url(rng, 'slider', i), 'alt': 'Slider Image',
+               'created_at': stamp, 'updated_at': stamp} for i in range(20)]
+    objectives = [{'id': f"obj-{i}", 'order': i + 1, 'title': words(rng, HINDI_WORDS, 20),
+                   'titleEn': words(rng, ENGLISH_WORDS, 20), 'description': words(rng, HINDI_WORDS, 30),
+                   'descriptionEn': words(rng, ENGLISH_WORDS, 30), 'icon': '',
+                   'created_at': stamp, 'updated_at': stamp} for i in range(20)]
+
+    return {
+        'BLOGS_DATA_FILE': blogs,
+        'EVENTS_DATA_FILE': events,
+        'PHOTOS_DATA_FILE': galleries,
+        'SLIDER_DATA_FILE': slider,
+        'OBJECTIVES_DATA_FILE': objectives,
+        'NAVBAR_DROPDOWNS_DATA_FILE': navbar,
+        'VIDEOS_DROPDOWN_DATA_FILE': videos_dropdown,
+    }
+
+
+def point_config_at(data_dir):
+    """Redirect every data file to data_dir (before data_manager/app are imported)"""
+    from config import Config
+    for attribute in ('BLOGS_DATA_FILE', 'EVENTS_DATA_FILE', 'PHOTOS_DATA_FILE', 'SLIDER_DATA_FILE',
+                      'VIDEOS_DROPDOWN_DATA_FILE', 'NAVBAR_DROPDOWNS_DATA_FILE', 'ADMIN_SESSION_DATA_FILE',
+                      'OBJECTIVES_DATA_FILE'):
+        setattr(Config, attribute, os.path.join(data_dir, os.path.basename(getattr(Config, attribute))))
+    Config.THUMBNAIL_CACHE_DIR = os.path.join(data_dir, 'youtube_thumbnails')
+    Config.METRICS_DIR = os.path.join(data_dir, 'metrics')
+    Config.SINGLEFLIGHT_LOCK_DIR = os.path.join(data_dir, 'singleflight')
+    return Config
+
+
+def measure(fn, repeat, warmup=1):
+    """Run fn warmup + repeat times; return timing stats of the measured runs in ms"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'min_ms': round(samples[0], 3),
+        'p95_ms': round(samples[max(0, int(len(samples) * 0.95 + 0.5) - 1)], 3),
+        'runs': len(samples),
+    }
+
+
+class Counter:
+    """Unique suffixes for records added during the run"""
+
+    def __init__(self):
+        self.value = 0
+
+    def __call__(self):
+        self.value += 1
+        return self.value
+
+
+def data_cases(Config, dm, data):
+    """(name, callable) for the data layer operations"""
+    nxt = Counter()
+    blog_ids = [blog['id'] for blog in data['BLOGS_DATA_FILE']]
+    event_ids = [event['id'] for event in data['EVENTS_DATA_FILE']]
+    gallery_ids = [gallery['id'] for gallery in data['PHOTOS_DATA_FILE']]
+    slide_ids = [slide['id'] for slide in data['SLIDER_DATA_FILE']]
+    objective_ids = [objective['id'] for objective in data['OBJECTIVES_DATA_FILE']]
+    category_ids = [category['id'] for category in data['VIDEOS_DROPDOWN_DATA_FILE']['categories']]
+    link_ids = [link['id'] for link in data['VIDEOS_DROPDOWN_DATA_FILE']['links']]
+    columns = data['NAVBAR_DROPDOWNS_DATA_FILE']['dropdowns']['photos']['columns']
+    column_ids = [column['id'] for column in columns]
+    item_ids = [item['id'] for item in columns[0]['items']] if columns else []
+    last_blog = blog_ids[-1] if blog_ids else ''
+    mid_gallery = gallery_ids[len(gallery_ids) // 2] if gallery_ids else ''
+
+    def blog(title):
+        return {'title': title, 'titleEn': title, 'excerpt': 'x', 'excerptEn': 'x', 'content': 'x' * 500,
+                'contentEn': 'x' * 500, 'category': '', 'categoryEn': '', 'date': '2026-01-01', 'dateEn': '2026-01-01'}
+
+    def alternating(ids):
+        # Reverse the order on every other call so each call really changes it
+        state = {'reverse': False}
+
+        def next_order():
+            state['reverse'] = not state['reverse']
+            return list(reversed(ids)) if state['reverse'] else list(ids)
+        return next_order
+
+    blog_order, event_order, gallery_order = alternating(blog_ids), alternating(event_ids), alternating(gallery_ids)
+    slide_order, objective_order = alternating(slide_ids), alternating(objective_ids)
+    category_order, column_order, item_order = alternating(category_ids), alternating(column_ids), alternating(item_ids)
+
+    cases = []
+    for attribute, collection in (('BLOGS_DATA_FILE', 'blogs'), ('EVENTS_DATA_FILE', 'events'),
+                                  ('PHOTOS_DATA_FILE', 'photos'), ('NAVBAR_DROPDOWNS_DATA_FILE', 'navbar')):
+        path = getattr(Config, attribute)
+        cases += [
+            (f"load_json_data[{collection}, uncached]", lambda path=path: dm.load_json_data(path, use_cache=False)),
+            (f"load_json_data[{collection}, cached]", lambda path=path: dm.load_json_data(path)),
+            (f"save_json_data[{collection}]", lambda path=path: dm.save_json_data(path, dm.load_json_data(path))),
+        ]
+
+    cases += [
+        ('get_all_blogs', dm.get_all_blogs),
+        ('get_blog_by_id[last]', lambda: dm.get_blog_by_id(last_blog)),
+        ('add_blog', lambda: dm.add_blog(blog(f"Benchmark post {nxt()}"))),
+        ('update_blog', lambda: dm.update_blog(last_blog, blog(dm.get_blog_by_id(last_blog)['titleEn']))),
+        ('update_blog_order', lambda: dm.update_blog_order(blog_order())),
+
+        ('get_all_events', dm.get_all_events),
+        ('get_event_by_id[last]', lambda: dm.get_event_by_id(event_ids[-1])),
+        ('add_event', lambda: dm.add_event({'title': f"Event {nxt()}", 'titleEn': 'Event', 'date': '2030-01-01'})),
+        ('update_event', lambda: dm.update_event(event_ids[-1], {'title': 'Updated', 'date': '2030-01-02'})),
+        ('update_event_order', lambda: dm.update_event_order(event_order())),
+
+        ('get_all_galleries', dm.get_all_galleries),
+        ('get_gallery_by_id[middle]', lambda: dm.get_gallery_by_id(mid_gallery)),
+        ('add_gallery', lambda: dm.add_gallery({'title': 'g', 'titleEn': f"Benchmark gallery {nxt()}"})),
+        ('update_gallery', lambda: dm.update_gallery(mid_gallery, dict(dm.get_gallery_by_id(mid_gallery)))),
+        ('update_gallery_order', lambda: dm.update_gallery_order(gallery_order())),
+
+        ('get_all_slider_images', dm.get_all_slider_images),
+        ('get_slider_image_by_id', lambda: dm.get_slider_image_by_id(slide_ids[-1])),
+        ('add_slider_image', lambda: dm.add_slider_image({'imageUrl': '/static/uploads/x.webp', 'alt': 'Slider Image'})),
+        ('update_slider_image', lambda: dm.update_slider_image(slide_ids[-1], {'imageUrl': '/static/uploads/y.webp'})),
+        ('update_slider_order', lambda: dm.update_slider_order(slide_order())),
+
+        ('get_all_objectives', dm.get_all_objectives),
+        ('get_objective_by_id', lambda: dm.get_objective_by_id(objective_ids[-1])),
+        ('add_objective', lambda: dm.add_objective({'title': f"Objective {nxt()}", 'titleEn': 'Objective'})),
+        ('update_objective', lambda: dm.update_objective(objective_ids[-1], {'title': 'Updated', 'titleEn': 'Updated'})),
+        ('update_objective_order', lambda: dm.update_objective_order(objective_order())),
+
+        ('get_videos_dropdown_data', dm.get_videos_dropdown_data),
+        ('add_video_category', lambda: dm.add_video_category({'title': f"Category {nxt()}"})),
+        ('update_video_category', lambda: dm.update_video_category(category_ids[-1], {'title': 'Updated'})),
+        ('add_video_link', lambda: dm.add_video_link({'title': f"Link {nxt()}", 'url': 'https://youtu.be/x'})),
+        ('update_video_link', lambda: dm.update_video_link(link_ids[-1], {'title': 'Updated', 'url': 'https://youtu.be/y'})),
+        ('update_video_order[category]', lambda: dm.update_video_order('category', category_order())),
+        ('update_social_media', lambda: dm.update_social_media(data['VIDEOS_DROPDOWN_DATA_FILE']['social_media'])),
+
+        ('get_navbar_dropdowns_data', dm.get_navbar_dropdowns_data),
+        ('get_dropdown_for_nav_item', lambda: dm.get_dropdown_for_nav_item('photos')),
+        ('update_dropdown_for_nav_item', lambda: dm.update_dropdown_for_nav_item('photos', dm.get_dropdown_for_nav_item('photos'))),
+        ('add_dropdown_column', lambda: dm.add_dropdown_column('blog', {'title': f"Column {nxt()}"})),
+        ('update_dropdown_column', lambda: dm.update_dropdown_column('photos', column_ids[-1], {'title': 'Updated'})),
+        ('add_dropdown_item', lambda: dm.add_dropdown_item('photos', column_ids[0], {'title': f"Item {nxt()}", 'link': '#'})),
+        ('update_dropdown_item', lambda: dm.update_dropdown_item('photos', column_ids[0], item_ids[-1], {'title': 'Updated', 'link': '#'})),
+        ('update_dropdown_column_order', lambda: dm.update_dropdown_column_order('photos', column_order())),
+        ('update_dropdown_item_order', lambda: dm.update_dropdown_item_order('photos', column_ids[0], item_order())),
+    ]
+    return cases
+
+
+def render_cases(Config, client, data):
+    """(name, callable) for full renders of the public pages"""
+    blog_id = data['BLOGS_DATA_FILE'][len(data['BLOGS_DATA_FILE']) // 2]['id'] if data['BLOGS_DATA_FILE'] else 'missing'
+
+    def get(path, page_cache):
+        def run():
+            Config.PAGE_CACHE_ENABLED = page_cache
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+        return run
+
+    cases = []
+    for name, path in (('home', '/'), ('blog', '/blog'), ('blog_detail', f"/blog/{blog_id}"),
+                       ('events', '/events'), ('photos', '/photos')):
+        cases.append((f"GET {name}", get(path, False)))
+        cases.append((f"GET {name}[page cache]", get(path, True)))
+    return cases
+
+
+def import_time(module='app'):
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+    Returns:
+        (cumulative ms of the module's import, {imported module: self ms})
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    total_ms = 0.0
+    modules = {}
+    # "import time:  self [us] | cumulative | <indent>name", one line per module
+    for line in result.stderr.splitlines():
+        match = re.match(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$', line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = int(self_us) / 1000
+        if name == module and not indent:
+            total_ms = int(cumulative_us) / 1000
+    return total_ms, modules
+
+
+def startup_case(repeat, budget_ms):
+    """Import time of the app in fresh interpreters, checked against the budget"""
+    import_time()  # the first run may compile .pyc files
+    runs = sorted((import_time() for _ in range(repeat)), key=lambda run: run[0])
+    samples = [total for total, _ in runs]
+    _, modules = runs[len(runs) // 2]
+    result = {
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'min_ms': round(samples[0], 3),
+        'p95_ms': round(samples[max(0, int(len(samples) * 0.95 + 0.5) - 1)], 3),
+        'runs': len(samples),
+        'budget_ms': budget_ms,
+        'slowest_modules': dict(sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]),
+    }
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(results, baseline_path, threshold):
+    """Print the change against a previous results file; return the names that regressed"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('commit') or 'unknown commit'}):")
+    regressions = []
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if not before or not before['median_ms']:
+            continue
+        change = (result['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+        flag = ''
+        if change > threshold:
+            flag = '  ⚠ slower'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = '  ✓ faster'
+        print(f"  {name:<44} {before['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  {change:+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply every dataset size')
+    parser.add_argument('--blogs', type=int, default=10_000)
+    parser.add_argument('--events', type=int, default=2_000)
+    parser.add_argument('--galleries', type=int, default=500)
+    parser.add_argument('--photos-per-gallery', type=int, default=200)
+    parser.add_argument('--nav-columns', type=int, default=6, help='columns per navbar dropdown')
+    parser.add_argument('--nav-items', type=int, default=25, help='items per navbar dropdown column')
+    parser.add_argument('--repeat', type=int, default=5, help='measured runs per operation')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', default='', help='run only operations whose name contains this text')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    parser.add_argument('--import-budget', type=float, default=300.0, help='limit for the app import time in ms')
+    args = parser.parse_args()
+    for field in ('blogs', 'events', 'galleries'):
+        setattr(args, field, max(1, int(getattr(args, field) * args.scale)))
+
+    results = {}
+    over_budget = False
+    startup_name = 'startup: import app'
+    if not args.only or args.only in startup_name:
+        result = results[startup_name] = startup_case(args.repeat, args.import_budget)
+        print(f"  {startup_name:<44} median {result['median_ms']:10.2f} ms   p95 {result['p95_ms']:10.2f} ms"
+              f"   (budget {args.import_budget:g} ms)")
+        print('    slowest imports (self): ' + ', '.join(
+            f"{name} {ms:.1f}" for name, ms in list(result['slowest_modules'].items())[:6]))
+        over_budget = result['median_ms'] > args.import_budget
+
+    with tempfile.TemporaryDirectory(prefix='bench-data-') as data_dir:
+        Config = point_config_at(data_dir)
+        data = generate_data(random.Random(args.seed), args)
+        for attribute, content in data.items():
+            with open(getattr(Config, attribute), 'w', encoding='utf-8') as f:
+                json.dump(content, f, ensure_ascii=False)
+        sizes = {os.path.basename(getattr(Config, attribute)): os.path.getsize(getattr(Config, attribute))
+                 for attribute in data}
+
+        import data_manager as dm
+        from app import app
+        client = app.test_client()
+
+        print(f"{args.blogs} blogs, {args.events} events, {args.galleries} galleries x {args.photos_per_gallery} photos, "
+              f"navbar {len(NAV_ITEMS)} x {args.nav_columns} x {args.nav_items}; {args.repeat} runs each")
+        cases = data_cases(Config, dm, data) + render_cases(Config, client, data)
+        for name, fn in cases:
+            if args.only and args.only not in name:
+                continue
+            results[name] = measure(fn, args.repeat)
+            result = results[name]
+            print(f"  {name:<44} median {result['median_ms']:10.2f} ms   p95 {result['p95_ms']:10.2f} ms")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+            'file_sizes': sizes,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+    failed = False
+    if over_budget:
+        print(f"⚠ Importing the app took longer than the {args.import_budget:g} ms budget")
+        failed = True
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"⚠ {len(regressions)} operation(s) more than {args.threshold:g}% slower")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Response compression.
+Static assets are served from precompressed .br/.gz siblings written by the
+build step (python assets.py). Dynamic HTML and JSON responses above a size
+threshold are compressed on the way out; the compressed body is cached by
+ETag, so a page rendered at a given content version is compressed only once.
+Brotli is used when the optional brotli package is installed, gzip otherwise.
+"""
+import gzip
+import mimetypes
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request, send_from_directory
+
+from config import Config
+from timing import timer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript',
+    'application/json', 'image/svg+xml',
+}
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.svg', '.html', '.txt')
+
+# Content-Encoding -> file suffix of the precompressed sibling
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def available_encodings():
+    """Encodings this process can produce, best first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(offered=None, accept=None):
+    """Pick the best encoding the client accepts (the current request's Accept-Encoding by default)"""
+    if accept is None:
+        accept = request.accept_encodings
+    for encoding in offered or available_encodings():
+        if accept[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress_bytes(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=Config.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _stream_compressor(encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=Config.COMPRESSION_BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    # wbits=31 writes a gzip header and trailer
+    compressor = zlib.compressobj(Config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of byte chunks incrementally"""
+    process, finish = _stream_compressor(encoding)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressedBodyCache:
+    """Byte-bounded LRU of compressed bodies keyed by (ETag, encoding)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+compressed_cache = CompressedBodyCache(Config.COMPRESSION_CACHE_BYTES)
+
+
+def compress_response(response):
+    """Compress an HTML/JSON response in place if the client accepts it"""
+    if (not Config.COMPRESSION_ENABLED or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.direct_passthrough:
+        # Files sent with send_file are handled by send_precompressed
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < Config.COMPRESSION_MIN_SIZE:
+            return response
+        etag, _ = response.get_etag()
+        compressed = compressed_cache.get((etag, encoding)) if etag else None
+        if compressed is None:
+            with timer('compress'):
+                compressed = compress_bytes(data, encoding)
+            if etag:
+                compressed_cache.set((etag, encoding), compressed)
+        response.set_data(compressed)
+
+    response.headers['Content-Encoding'] = encoding
+    # The compressed bytes are a different representation: weaken the validator.
+    # If-None-Match uses weak comparison, so revalidation still yields 304.
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def precompress_file(path):
+    """Write .gz (and .br when available) siblings for a static file; return encodings written"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = []
+    for encoding in available_encodings():
+        # Build time, so use maximum compression
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=11)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) < len(data):
+            with open(path + ENCODING_SUFFIXES[encoding], 'wb') as f:
+                f.write(compressed)
+            written.append(encoding)
+    return written
+
+
+def send_precompressed(static_folder, filename, encodings):
+    """
+    Send a static file, preferring a precompressed sibling the client accepts.
+    Args:
+        static_folder: Static root directory
+        filename: Source path relative to static_folder
+        encodings: Encodings with a sibling file on disk (from the asset manifest)
+    """
+    encoding = choose_encoding([e for e in ('br', 'gzip') if e in encodings]) if encodings else None
+    if encoding is None:
+        response = send_from_directory(static_folder, filename)
+    else:
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(static_folder, filename + ENCODING_SUFFIXES[encoding], mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    return response
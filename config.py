@@ -3,6 +3,7 @@ Configuration file for the application.
 Use environment variables for sensitive data in production.
 """
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -47,7 +48,92 @@ class Config:
     ADMIN_SESSION_DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'admin_session_data.json')
     OBJECTIVES_DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'objectives_data.json')
 
-# Ensure upload directory exists
-os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(os.path.join(os.path.dirname(__file__), 'data'), exist_ok=True)
+    # Rendered page cache for public routes
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', '512'))
+    PAGE_CACHE_MAX_BYTES = int(os.environ.get('PAGE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    # Optional directory to persist rendered pages across restarts (empty = memory only)
+    PAGE_CACHE_DIR = os.environ.get('PAGE_CACHE_DIR', '')
+
+    # Render public pages in one language when it is known (/hi/..., /en/... or the 'lang' cookie)
+    SERVER_LANGUAGE_ENABLED = os.environ.get('SERVER_LANGUAGE_ENABLED', 'true').lower() == 'true'
+
+    # Response compression (brotli is used when the optional package is installed)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+    COMPRESSION_CACHE_BYTES = int(os.environ.get('COMPRESSION_CACHE_BYTES', str(16 * 1024 * 1024)))
+
+    # YouTube feeds: refreshed by a background thread, requests only read the cached copy
+    YOUTUBE_CHANNEL_ID = os.environ.get('YOUTUBE_CHANNEL_ID', 'UC6xKFvHyM3KRmaq9grhYz3g')
+    # Channels/playlists to aggregate: name=channel:<id>,name=playlist:<id>,name=url:<rss url>
+    # (empty = YOUTUBE_CHANNEL_ID only)
+    YOUTUBE_FEEDS = os.environ.get('YOUTUBE_FEEDS', '')
+    YOUTUBE_FETCH_WORKERS = int(os.environ.get('YOUTUBE_FETCH_WORKERS', '4'))
+    # Override the RSS URL (e.g. point it at a local stub when testing)
+    YOUTUBE_FEED_URL = os.environ.get('YOUTUBE_FEED_URL', '')
+    YOUTUBE_REFRESH_ENABLED = os.environ.get('YOUTUBE_REFRESH_ENABLED', 'true').lower() == 'true'
+    YOUTUBE_CACHE_TTL = int(os.environ.get('YOUTUBE_CACHE_TTL', '3600'))  # seconds
+    YOUTUBE_REFRESH_AHEAD = int(os.environ.get('YOUTUBE_REFRESH_AHEAD', '300'))  # refresh this long before expiry
+    YOUTUBE_FETCH_TIMEOUT = 5
+    YOUTUBE_MAX_VIDEOS = 50  # cached videos kept per feed, including those older than the feed lists
+    YOUTUBE_RETRY_MIN = 30  # backoff after a failed fetch, doubled per failure up to YOUTUBE_RETRY_MAX
+    YOUTUBE_RETRY_MAX = 1800
+
+    # YouTube thumbnails downloaded once and served from our origin (WebP variants need Pillow)
+    THUMBNAIL_CACHE_ENABLED = os.environ.get('THUMBNAIL_CACHE_ENABLED', 'true').lower() == 'true'
+    THUMBNAIL_CACHE_DIR = os.environ.get('THUMBNAIL_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'data', 'youtube_thumbnails'))
+    THUMBNAIL_WIDTHS = [int(w) for w in os.environ.get('THUMBNAIL_WIDTHS', '240,320,480').split(',') if w.strip()]
+    THUMBNAIL_CARD_WIDTH = 320  # default src: the smallest variant at least this wide
+    THUMBNAIL_QUALITY = 75
+
+    # Per-request phase timings in a Server-Timing header and a log line (off by default: exposes internals)
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+
+    # Prometheus metrics at /metrics; each worker writes snapshots to METRICS_DIR every METRICS_FLUSH_SECONDS
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # scrape with "Authorization: Bearer <token>"
+    METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'app-metrics'))
+    METRICS_FLUSH_SECONDS = int(os.environ.get('METRICS_FLUSH_SECONDS', '5'))
+
+    # Log the Python stack of requests running longer than SLOW_REQUEST_THRESHOLD seconds (0 = off),
+    # again every SLOW_REQUEST_INTERVAL seconds while they run
+    SLOW_REQUEST_THRESHOLD = float(os.environ.get('SLOW_REQUEST_THRESHOLD', '5'))
+    SLOW_REQUEST_INTERVAL = float(os.environ.get('SLOW_REQUEST_INTERVAL', '10'))
+    SLOW_REQUEST_MAX_DUMPS = int(os.environ.get('SLOW_REQUEST_MAX_DUMPS', '5'))
+
+    # Admin-triggered request profiles (?_profile=1 or =sample); PROFILE_SAMPLE_RATE=N also samples 1 in N requests
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'true').lower() == 'true'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'app-profiles')
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '50'))
+    PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE', '0'))  # 0 = admin requests only
+
+    # Connections kept per host by the storage HTTP client (size it to the worker's thread count)
+    STORAGE_HTTP_POOL_SIZE = int(os.environ.get('STORAGE_HTTP_POOL_SIZE', '10'))
+
+    # Threads per process running Flask requests under the ASGI entry point (asgi.py)
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', '16'))
+
+    # gunicorn preload: the master loads content and templates once and workers share them (gunicorn.conf.py)
+    PRELOAD_APP = os.environ.get('PRELOAD_APP', 'false').lower() == 'true'
+
+    # Boot-time warm-up: load content, fetch a missing video feed and render these pages before /healthz/ready reports ready
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'true').lower() == 'true'
+    WARMUP_PAGES = [path.strip() for path in
+                    os.environ.get('WARMUP_PAGES', '/,/blog,/events,/photos,/videos,/projects,/donate').split(',')
+                    if path.strip()]
+
+    # In-process job scheduler (jobs.py): one worker per node runs maintenance jobs, state and leader lock in SCHEDULER_DIR
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() == 'true'
+    SCHEDULER_DIR = os.environ.get('SCHEDULER_DIR') or os.path.join(tempfile.gettempdir(), 'app-scheduler')
+    SCHEDULER_POLL = float(os.environ.get('SCHEDULER_POLL', '30'))  # seconds; also how soon "Run now" is picked up
+    SCHEDULER_NICE = int(os.environ.get('SCHEDULER_NICE', '10'))  # nice value of the job thread (Linux)
+    SCHEDULER_MAX_DUTY = float(os.environ.get('SCHEDULER_MAX_DUTY', '0.25'))  # max share of wall time spent in jobs
+    ORPHAN_UPLOAD_GRACE_HOURS = float(os.environ.get('ORPHAN_UPLOAD_GRACE_HOURS', '24'))
+    ORPHAN_CLEANUP_DELETE = os.environ.get('ORPHAN_CLEANUP_DELETE', 'false').lower() == 'true'  # false = report only
+
+    # Single-flight coalescing of cache misses (per-node file locks shared by gunicorn workers)
+    SINGLEFLIGHT_LOCK_DIR = os.environ.get('SINGLEFLIGHT_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'app-singleflight'))
+    SINGLEFLIGHT_SHARE_SECONDS = int(os.environ.get('SINGLEFLIGHT_SHARE_SECONDS', '5'))
 
@@ -2,17 +2,30 @@
 Data management utilities for blogs, events, and photo galleries.
 Handles reading/writing JSON data files.
 Uses Cloudinary for persistent storage if configured, otherwise uses local filesystem.
+
+Thread safety: a cached collection is an immutable snapshot shared by every
+thread - it is sorted/normalised once when loaded and never changed in place.
+Functions that modify a file are decorated with @_writes(file): they hold that
+file's write lock and see a private deep copy, which save_json_data() then
+writes out before invalidating the snapshot. Inside a batch() block they share
+one copy per file, written once when the block ends.
 """
+import copy
+import hashlib
 import json
 import os
 import re
+import threading
 import uuid
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from config import Config
-import requests
-import xml.etree.ElementTree as ET
-from functools import lru_cache
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 import time
+from singleflight import MISSING, SingleFlight
+from timing import timed
+from metrics import inc
 
 # Import storage manager for Cloudinary support
 try:
@@ -26,24 +39,190 @@ except ImportError:
 _data_cache = {}
 _cache_ttl = 300  # 5 minutes in seconds
 
+# Content fingerprint of each loaded data file, used to version rendered pages
+_content_versions = {}
+
+# Coalesces concurrent reloads of the same file after its cache entry expires
+_load_flight = SingleFlight('data')
+
+# Guards cache replacement; a save bumps the file's generation so that a reload
+# which started before it does not cache what it read
+_cache_lock = threading.Lock()
+_generations = {}
+
+# One lock per data file, held for a whole read-modify-write (see _writes)
+_write_locks = {}
+_write_locks_guard = threading.Lock()
+
+# Files the current thread (or greenlet under gevent) is modifying, and its open batch()
+_editing = threading.local()
+
 def _get_filename_from_path(file_path):
     """Extract filename from full path"""
     return os.path.basename(file_path)
 
+def _fingerprint(data):
+    """Stable short hash of a JSON-serialisable value"""
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+def _editing_files():
+    """Data files the current thread is modifying inside a @_writes function"""
+    files = getattr(_editing, 'files', None)
+    if files is None:
+        files = _editing.files = set()
+    return files
+
+def _write_lock(filename):
+    with _write_locks_guard:
+        return _write_locks.setdefault(filename, threading.RLock())
+
+def _writes(file_path):
+    """
+    Decorator for functions that load, modify and save a data file.
+    Concurrent writers of the same file in this process run one at a time, and
+    loads of the file inside the function return a private deep copy, so the
+    shared cached snapshot is never modified in place.
+    """
+    filename = _get_filename_from_path(file_path)
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            editing = _editing_files()
+            with _write_lock(filename):
+                if filename in editing:
+                    return func(*args, **kwargs)
+                editing.add(filename)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    editing.discard(filename)
+        wrapper.data_file = file_path
+        return wrapper
+    return decorator
+
+class Batch:
+    """Working copies of the data files of a batch() block"""
+    
+    def __init__(self, file_paths):
+        self.file_paths = {_get_filename_from_path(file_path): file_path for file_path in file_paths}
+        self.data = {}
+        self.changed = set()
+        self.saved = {}  # filename -> save result, filled when the block ends
+    
+    @property
+    def ok(self):
+        """True if every changed file was saved"""
+        return all(self.saved.values())
+
+def _current_batch(filename):
+    current = getattr(_editing, 'batch', None)
+    if current is not None and filename in current.file_paths:
+        return current
+    return None
+
+@contextmanager
+def batch(*file_paths):
+    """
+    Apply many changes to the given data files with one save (and one cache
+    invalidation) per file. Inside the block the mutation helpers (add_blog,
+    update_event, ...) work on a single in-memory copy of each file; changed
+    files are written when the block ends, and nothing is written if it raises.
+    Changed files are saved one after another, not atomically: if one save
+    fails, the files already written stay written (batch.ok is then False).
+    Other files are saved as usual.
+    Yields:
+        Batch (batch.saved maps each written file to its save result afterwards)
+    """
+    if getattr(_editing, 'batch', None) is not None:
+        raise RuntimeError("batch() blocks cannot be nested")
+    current = Batch(file_paths)
+    # Always locked in the same order, so two batches never wait on each other
+    locks = [_write_lock(filename) for filename in sorted(current.file_paths)]
+    for lock in locks:
+        lock.acquire()
+    editing = _editing_files()
+    added = set(current.file_paths) - editing
+    editing.update(added)
+    _editing.batch = current
+    try:
+        yield current
+        _editing.batch = None
+        for filename in sorted(current.changed):
+            current.saved[filename] = save_json_data(current.file_paths[filename], current.data[filename])
+    finally:
+        _editing.batch = None
+        editing.difference_update(added)
+        for lock in reversed(locks):
+            lock.release()
+
+@contextmanager
+def read_only():
+    """
+    Skip this thread's saves inside the block: save_json_data() writes nothing
+    and returns False. Warm-up renders pages this way, so a view's first-run
+    migration is left for the first real request.
+    Yields:
+        List of the files whose save was skipped
+    """
+    skipped = []
+    _editing.read_only = skipped
+    try:
+        yield skipped
+    finally:
+        _editing.read_only = None
+
+def saves_skipped():
+    """True if a save was skipped in the current read_only() block"""
+    return bool(getattr(_editing, 'read_only', None))
+
+@timed('data-load')
 def load_json_data(file_path, default=[], use_cache=True):
-    """Load data from JSON file (Cloudinary or local) with caching"""
+    """
+    Load data from JSON file (Cloudinary or local) with caching.
+    The result is the shared cached snapshot: treat it as read-only. Inside a
+    @_writes function for this file a private deep copy is returned instead.
+    """
     filename = _get_filename_from_path(file_path)
+    current = _current_batch(filename)
+    if current is not None:
+        if filename not in current.data:
+            current.data[filename] = copy.deepcopy(
+                _load_cached_json_data(file_path, filename, default, use_cache, coalesce=False))
+        return current.data[filename]
+    if filename in _editing_files():
+        return copy.deepcopy(_load_cached_json_data(file_path, filename, default, use_cache, coalesce=False))
+    return _load_cached_json_data(file_path, filename, default, use_cache)
+
+def _load_cached_json_data(file_path, filename, default, use_cache, coalesce=True):
+    collection = filename.replace('.json', '')
     
     # Check cache first
-    if use_cache and filename in _data_cache:
-        cached_data, cached_time = _data_cache[filename]
+    stale = MISSING
+    # One read: a save on another thread may pop the entry between a check and a lookup
+    cached = _data_cache.get(filename)
+    if use_cache and cached is not None:
+        cached_data, cached_time = cached
         if time.time() - cached_time < _cache_ttl:
+            inc('data_cache_requests_total', collection=collection, result='hit')
             return cached_data
-    
-    # Load fresh data
+        stale = cached_data
+    result = 'bypass' if not use_cache else ('miss' if stale is MISSING else 'expired')
+    inc('data_cache_requests_total', collection=collection, result=result)
+    
+    load = lambda: _load_fresh_json_data(file_path, filename, default, use_cache, coalesce)
+    if not coalesce:
+        # A writer must not share a reload that may have started before the file's last save
+        return load()
+    # Only one thread reloads an expired file; the others keep the stale copy meanwhile
+    return _load_flight.do(filename, load, stale=stale)
+
+def _load_fresh_json_data(file_path, filename, default, use_cache, coalesce=True):
+    """Read a data file from storage and cache it"""
+    generation = _generations.get(filename, 0)
     if USE_STORAGE_MANAGER and storage_manager:
         # Use storage manager (supports Cloudinary)
-        data = storage_manager.load_json_data(filename, default=default)
+        data = storage_manager.load_json_data(filename, default=default, coalesce=coalesce)
     else:
         # Fallback to local filesystem
         try:
@@ -56,15 +235,36 @@ def load_json_data(file_path, default=[], use_cache=True):
             print(f"Error loading {file_path}: {e}")
             data = default
     
-    # Cache the data
-    if use_cache:
-        _data_cache[filename] = (data, time.time())
+    inc('data_cache_reloads_total', collection=filename.replace('.json', ''))
+    
+    prepare = _DATA_PREPARERS.get(file_path)
+    if prepare is not None and data is not None:
+        data = prepare(data)
+    version = _fingerprint(data)
+    
+    # Cache the data, unless it was saved while we were reading it
+    with _cache_lock:
+        if _generations.get(filename, 0) == generation:
+            if use_cache:
+                _data_cache[filename] = (data, time.time())
+            _content_versions[filename] = version
     
     return data
 
+@timed('data-save')
 def save_json_data(file_path, data):
     """Save data to JSON file (Cloudinary or local) and invalidate cache"""
     filename = _get_filename_from_path(file_path)
+    skipped = getattr(_editing, 'read_only', None)
+    if skipped is not None:
+        skipped.append(filename)
+        return False
+    current = _current_batch(filename)
+    if current is not None:
+        # Written once when the batch ends
+        current.data[filename] = data
+        current.changed.add(filename)
+        return True
     
     result = False
     if USE_STORAGE_MANAGER and storage_manager:
@@ -82,11 +282,90 @@ def save_json_data(file_path, data):
             result = False
     
     # Invalidate cache after saving
-    if filename in _data_cache:
-        del _data_cache[filename]
+    with _cache_lock:
+        _generations[filename] = _generations.get(filename, 0) + 1
+        _data_cache.pop(filename, None)
+        _content_versions.pop(filename, None)
     
     return result
 
+def get_content_version(*file_paths):
+    """
+    Combined content version of the given data files.
+    Served from the in-memory cache; files that are not cached (or expired)
+    are reloaded (concurrently) so the version always reflects what the getters would return.
+    """
+    _load_missing(file_paths)
+    versions = []
+    for file_path in file_paths:
+        filename = _get_filename_from_path(file_path)
+        if not is_cached(file_path):
+            load_json_data(file_path, default=_default_for(file_path))
+        versions.append(_content_versions.get(filename, ''))
+    return '.'.join(versions)
+
+@timed('data-load')
+def load_many(*file_paths, prefetch=()):
+    """
+    Load several data files, reading the ones not fresh in the cache concurrently
+    (each cold Cloudinary load is two round trips; a page needs up to six files).
+    Args:
+        file_paths: Data files to return, e.g. Config.BLOGS_DATA_FILE
+        prefetch: Further files to load in the same batch without returning them
+                  (e.g. the ones the context processor reads next)
+    Returns:
+        List of the data, in argument order, as the getters would return it
+    """
+    _load_missing(file_paths + tuple(prefetch))
+    return [load_json_data(file_path, default=_default_for(file_path)) for file_path in file_paths]
+
+def _load_missing(file_paths):
+    """Load the files that are not fresh in the cache, in parallel when there are several"""
+    editing = _editing_files()
+    missing = [file_path for file_path in dict.fromkeys(file_paths)
+               if not is_cached(file_path) and _get_filename_from_path(file_path) not in editing]
+    if len(missing) < 2:
+        return
+    # A pool per call: cold loads are rare, and a pool would not survive a gunicorn fork
+    with ThreadPoolExecutor(max_workers=len(missing), thread_name_prefix='load-many') as pool:
+        for future in [pool.submit(load_json_data, file_path, _default_for(file_path)) for file_path in missing]:
+            future.result()
+
+def _default_for(file_path):
+    """Fresh default a getter would pass for this file"""
+    return copy.deepcopy(_DATA_DEFAULTS.get(file_path, []))
+
+def get_cache_ttl():
+    """Seconds a loaded data file is served from the cache before it is reloaded"""
+    return _cache_ttl
+
+def is_cached(file_path):
+    """True if the file is cached and fresh, i.e. loading it (or its content version) does no I/O"""
+    filename = _get_filename_from_path(file_path)
+    cached = _data_cache.get(filename)
+    return (cached is not None and time.time() - cached[1] < _cache_ttl
+            and filename in _content_versions)
+
+def refresh_cached_data(max_age):
+    """
+    Reload the cached content files loaded more than max_age seconds ago, so
+    they are renewed before their TTL runs out rather than on a request.
+    Returns:
+        Names of the files reloaded
+    """
+    now = time.time()
+    reloaded = []
+    for file_path in CONTENT_FILES:
+        filename = _get_filename_from_path(file_path)
+        cached = _data_cache.get(filename)
+        if cached is None or now - cached[1] < max_age:
+            continue
+        default = _default_for(file_path)
+        _load_flight.do(filename, lambda: _load_fresh_json_data(file_path, filename, default, True),
+                        stale=cached[0])
+        reloaded.append(filename)
+    return reloaded
+
 # Blog Management
 def generate_slug(title):
     """Generate a URL-friendly slug from a title"""
@@ -135,11 +414,8 @@ def get_unique_slug(base_slug, existing_blogs, exclude_id=None):
         counter += 1
 
 def get_all_blogs():
-    """Get all blogs, sorted by order"""
-    blogs = load_json_data(Config.BLOGS_DATA_FILE, default=[])
-    # Sort by order field (default to 0 if not set)
-    blogs.sort(key=lambda x: x.get('order', 0))
-    return blogs
+    """Get all blogs, sorted by order (sorted when loaded)"""
+    return load_json_data(Config.BLOGS_DATA_FILE, default=[])
 
 def get_blog_by_id(blog_id):
     """Get a specific blog by ID (works with both numeric IDs and slugs)"""
@@ -149,6 +425,7 @@ def get_blog_by_id(blog_id):
             return blog
     return None
 
+@_writes(Config.BLOGS_DATA_FILE)
 def add_blog(blog_data):
     """Add a new blog"""
     blogs = get_all_blogs()
@@ -171,6 +448,7 @@ def add_blog(blog_data):
     blogs.append(blog_data)
     return save_json_data(Config.BLOGS_DATA_FILE, blogs)
 
+@_writes(Config.BLOGS_DATA_FILE)
 def update_blog(blog_id, blog_data):
     """Update an existing blog"""
     blogs = get_all_blogs()
@@ -194,6 +472,7 @@ def update_blog(blog_id, blog_data):
             return save_json_data(Config.BLOGS_DATA_FILE, blogs)
     return False
 
+@_writes(Config.BLOGS_DATA_FILE)
 def delete_blog(blog_id):
     """Delete a blog"""
     blogs = get_all_blogs()
@@ -202,11 +481,8 @@ def delete_blog(blog_id):
 
 # Event Management
 def get_all_events():
-    """Get all events, sorted by order"""
-    events = load_json_data(Config.EVENTS_DATA_FILE, default=[])
-    # Sort by order field (default to 0 if not set)
-    events.sort(key=lambda x: x.get('order', 0))
-    return events
+    """Get all events, sorted by order (sorted when loaded)"""
+    return load_json_data(Config.EVENTS_DATA_FILE, default=[])
 
 def get_event_by_id(event_id):
     """Get a specific event by ID"""
@@ -216,6 +492,7 @@ def get_event_by_id(event_id):
             return event
     return None
 
+@_writes(Config.EVENTS_DATA_FILE)
 def add_event(event_data):
     """Add a new event"""
     events = get_all_events()
@@ -232,6 +509,7 @@ def add_event(event_data):
     events.append(event_data)
     return save_json_data(Config.EVENTS_DATA_FILE, events)
 
+@_writes(Config.EVENTS_DATA_FILE)
 def update_event(event_id, event_data):
     """Update an existing event"""
     events = get_all_events()
@@ -244,12 +522,14 @@ def update_event(event_id, event_data):
             return save_json_data(Config.EVENTS_DATA_FILE, events)
     return False
 
+@_writes(Config.EVENTS_DATA_FILE)
 def delete_event(event_id):
     """Delete an event"""
     events = get_all_events()
     events = [event for event in events if str(event.get('id')) != str(event_id)]
     return save_json_data(Config.EVENTS_DATA_FILE, events)
 
+@_writes(Config.BLOGS_DATA_FILE)
 def update_blog_order(blog_ids):
     """Update the order of blogs based on provided list of IDs"""
     blogs = load_json_data(Config.BLOGS_DATA_FILE, default=[])
@@ -263,6 +543,7 @@ def update_blog_order(blog_ids):
     
     return save_json_data(Config.BLOGS_DATA_FILE, blogs)
 
+@_writes(Config.EVENTS_DATA_FILE)
 def update_event_order(event_ids):
     """Update the order of events based on provided list of IDs"""
     events = load_json_data(Config.EVENTS_DATA_FILE, default=[])
@@ -276,8 +557,19 @@ def update_event_order(event_ids):
     
     return save_json_data(Config.EVENTS_DATA_FILE, events)
 
+def _blog_needs_migration(blog):
+    title_en = blog.get('titleEn', blog.get('title', ''))
+    return 'order' not in blog or (str(blog.get('id', '')).isdigit() and bool(title_en))
+
 def migrate_blog_ids_to_slugs():
     """Migrate existing numeric blog IDs to slug-based IDs"""
+    # Runs on every home/blog page view: check the shared snapshot before copying it
+    if not any(_blog_needs_migration(blog) for blog in get_all_blogs()):
+        return True
+    return _migrate_blog_ids_to_slugs()
+
+@_writes(Config.BLOGS_DATA_FILE)
+def _migrate_blog_ids_to_slugs():
     blogs = load_json_data(Config.BLOGS_DATA_FILE, default=[])
     updated = False
     
@@ -307,6 +599,12 @@ def migrate_blog_ids_to_slugs():
 
 def migrate_event_orders():
     """Set order for existing events that don't have it"""
+    if all('order' in event for event in get_all_events()):
+        return True
+    return _migrate_event_orders()
+
+@_writes(Config.EVENTS_DATA_FILE)
+def _migrate_event_orders():
     events = load_json_data(Config.EVENTS_DATA_FILE, default=[])
     updated = False
     
@@ -331,10 +629,8 @@ def _ensure_gallery_defaults(gallery):
     return gallery
 
 def get_all_galleries():
-    """Get all photo galleries, sorted by order"""
-    galleries = load_json_data(Config.PHOTOS_DATA_FILE, default=[])
-    galleries.sort(key=lambda x: x.get('order', 0))
-    return galleries
+    """Get all photo galleries, sorted by order (sorted when loaded)"""
+    return load_json_data(Config.PHOTOS_DATA_FILE, default=[])
 
 def get_gallery_by_id(gallery_id):
     """Fetch a gallery category by ID"""
@@ -344,6 +640,7 @@ def get_gallery_by_id(gallery_id):
             return gallery
     return None
 
+@_writes(Config.PHOTOS_DATA_FILE)
 def add_gallery(gallery_data):
     """Add a new gallery/category"""
     galleries = get_all_galleries()
@@ -365,6 +662,7 @@ def add_gallery(gallery_data):
     galleries.append(gallery_data)
     return save_json_data(Config.PHOTOS_DATA_FILE, galleries)
 
+@_writes(Config.PHOTOS_DATA_FILE)
 def update_gallery(gallery_id, gallery_data):
     """Update an existing gallery/category"""
     galleries = get_all_galleries()
@@ -387,12 +685,14 @@ def update_gallery(gallery_id, gallery_data):
             return save_json_data(Config.PHOTOS_DATA_FILE, galleries)
     return False
 
+@_writes(Config.PHOTOS_DATA_FILE)
 def delete_gallery(gallery_id):
     """Delete a gallery"""
     galleries = get_all_galleries()
     galleries = [gallery for gallery in galleries if str(gallery.get('id')) != str(gallery_id)]
     return save_json_data(Config.PHOTOS_DATA_FILE, galleries)
 
+@_writes(Config.PHOTOS_DATA_FILE)
 def update_gallery_order(gallery_ids):
     """Update gallery ordering"""
     galleries = load_json_data(Config.PHOTOS_DATA_FILE, default=[])
@@ -407,10 +707,8 @@ def update_gallery_order(gallery_ids):
 
 # Slider Management
 def get_all_slider_images():
-    """Get all slider images, sorted by order"""
-    images = load_json_data(Config.SLIDER_DATA_FILE, default=[])
-    images.sort(key=lambda x: x.get('order', 0))
-    return images
+    """Get all slider images, sorted by order (sorted when loaded)"""
+    return load_json_data(Config.SLIDER_DATA_FILE, default=[])
 
 def get_slider_image_by_id(image_id):
     """Fetch a slider image by ID"""
@@ -420,6 +718,7 @@ def get_slider_image_by_id(image_id):
             return image
     return None
 
+@_writes(Config.SLIDER_DATA_FILE)
 def add_slider_image(image_data):
     """Add a new slider image"""
     images = get_all_slider_images()
@@ -437,6 +736,7 @@ def add_slider_image(image_data):
     images.append(image_data)
     return save_json_data(Config.SLIDER_DATA_FILE, images)
 
+@_writes(Config.SLIDER_DATA_FILE)
 def update_slider_image(image_id, image_data):
     """Update an existing slider image"""
     images = get_all_slider_images()
@@ -450,12 +750,14 @@ def update_slider_image(image_id, image_data):
             return save_json_data(Config.SLIDER_DATA_FILE, images)
     return False
 
+@_writes(Config.SLIDER_DATA_FILE)
 def delete_slider_image(image_id):
     """Delete a slider image"""
     images = get_all_slider_images()
     images = [img for img in images if str(img.get('id')) != str(image_id)]
     return save_json_data(Config.SLIDER_DATA_FILE, images)
 
+@_writes(Config.SLIDER_DATA_FILE)
 def update_slider_order(image_ids):
     """Update slider image ordering"""
     images = load_json_data(Config.SLIDER_DATA_FILE, default=[])
@@ -469,27 +771,29 @@ def update_slider_order(image_ids):
     return save_json_data(Config.SLIDER_DATA_FILE, images)
 
 # Videos Dropdown Management
-def get_videos_dropdown_data():
-    """Get videos dropdown data"""
-    default_data = {
-        'categories': [],
-        'links': [],
-        'social_media': {
-            'youtube': 'https://www.youtube.com/@Santdigvijayramji/',
-            'instagram': 'https://www.instagram.com/santdigvijayramji/?hl=en'
-        }
+DEFAULT_VIDEOS_DROPDOWN_DATA = {
+    'categories': [],
+    'links': [],
+    'social_media': {
+        'youtube': 'https://www.youtube.com/@Santdigvijayramji/',
+        'instagram': 'https://www.instagram.com/santdigvijayramji/?hl=en'
     }
-    data = load_json_data(Config.VIDEOS_DROPDOWN_DATA_FILE, default=default_data)
-    
+}
+
+def get_videos_dropdown_data():
+    """Get videos dropdown data (categories and links sorted by order when loaded)"""
+    return load_json_data(Config.VIDEOS_DROPDOWN_DATA_FILE, default=copy.deepcopy(DEFAULT_VIDEOS_DROPDOWN_DATA))
+
+def _prepare_videos_dropdown_data(data):
     # Ensure social_media exists
     if 'social_media' not in data:
-        data['social_media'] = default_data['social_media']
+        data['social_media'] = copy.deepcopy(DEFAULT_VIDEOS_DROPDOWN_DATA['social_media'])
     
     # Sort categories and links by order
     if 'categories' in data:
-        data['categories'].sort(key=lambda x: x.get('order', 0))
+        data['categories'] = _sorted_by_order(data['categories'])
     if 'links' in data:
-        data['links'].sort(key=lambda x: x.get('order', 0))
+        data['links'] = _sorted_by_order(data['links'])
     
     return data
 
@@ -497,6 +801,7 @@ def save_videos_dropdown_data(data):
     """Save videos dropdown data"""
     return save_json_data(Config.VIDEOS_DROPDOWN_DATA_FILE, data)
 
+@_writes(Config.VIDEOS_DROPDOWN_DATA_FILE)
 def add_video_category(category_data):
     """Add a new video category"""
     data = get_videos_dropdown_data()
@@ -512,6 +817,7 @@ def add_video_category(category_data):
     data['categories'].append(category_data)
     return save_videos_dropdown_data(data), category_id
 
+@_writes(Config.VIDEOS_DROPDOWN_DATA_FILE)
 def update_video_category(category_id, category_data):
     """Update a video category"""
     data = get_videos_dropdown_data()
@@ -530,6 +836,7 @@ def update_video_category(category_id, category_data):
             return save_videos_dropdown_data(data)
     return False
 
+@_writes(Config.VIDEOS_DROPDOWN_DATA_FILE)
 def delete_video_category(category_id):
     """Delete a video category"""
     data = get_videos_dropdown_data()
@@ -539,6 +846,7 @@ def delete_video_category(category_id):
     data['categories'] = [cat for cat in data['categories'] if str(cat.get('id')) != str(category_id)]
     return save_videos_dropdown_data(data)
 
+@_writes(Config.VIDEOS_DROPDOWN_DATA_FILE)
 def add_video_link(link_data):
     """Add a new video link"""
     data = get_videos_dropdown_data()
@@ -554,6 +862,7 @@ def add_video_link(link_data):
     data['links'].append(link_data)
     return save_videos_dropdown_data(data), link_id
 
+@_writes(Config.VIDEOS_DROPDOWN_DATA_FILE)
 def update_video_link(link_id, link_data):
     """Update a video link"""
     data = get_videos_dropdown_data()
@@ -572,6 +881,7 @@ def update_video_link(link_id, link_data):
             return save_videos_dropdown_data(data)
     return False
 
+@_writes(Config.VIDEOS_DROPDOWN_DATA_FILE)
 def delete_video_link(link_id):
     """Delete a video link"""
     data = get_videos_dropdown_data()
@@ -581,6 +891,7 @@ def delete_video_link(link_id):
     data['links'] = [link for link in data['links'] if str(link.get('id')) != str(link_id)]
     return save_videos_dropdown_data(data)
 
+@_writes(Config.VIDEOS_DROPDOWN_DATA_FILE)
 def update_video_order(item_type, item_ids):
     """Update video dropdown item ordering (categories or links)"""
     data = get_videos_dropdown_data()
@@ -599,6 +910,7 @@ def update_video_order(item_type, item_ids):
     data[key] = list(item_dict.values())
     return save_videos_dropdown_data(data)
 
+@_writes(Config.VIDEOS_DROPDOWN_DATA_FILE)
 def update_social_media(social_data):
     """Update social media links"""
     data = get_videos_dropdown_data()
@@ -606,38 +918,40 @@ def update_social_media(social_data):
     return save_videos_dropdown_data(data)
 
 # Generic Navbar Dropdowns Management
-def get_navbar_dropdowns_data():
-    """Get all navbar dropdowns data"""
-    default_data = {
-        'social_media': {
-            'youtube': 'https://www.youtube.com/@Santdigvijayramji/',
-            'instagram': 'https://www.instagram.com/santdigvijayramji/?hl=en'
-        },
-        'dropdowns': {
-            'projects': {'enabled': True, 'columns': []},
-            'videos': {'enabled': True, 'columns': []},
-            'blog': {'enabled': False, 'columns': []},
-            'photos': {'enabled': False, 'columns': []},
-            'events': {'enabled': False, 'columns': []}
-        }
+DEFAULT_NAVBAR_DROPDOWNS_DATA = {
+    'social_media': {
+        'youtube': 'https://www.youtube.com/@Santdigvijayramji/',
+        'instagram': 'https://www.instagram.com/santdigvijayramji/?hl=en'
+    },
+    'dropdowns': {
+        'projects': {'enabled': True, 'columns': []},
+        'videos': {'enabled': True, 'columns': []},
+        'blog': {'enabled': False, 'columns': []},
+        'photos': {'enabled': False, 'columns': []},
+        'events': {'enabled': False, 'columns': []}
     }
-    data = load_json_data(Config.NAVBAR_DROPDOWNS_DATA_FILE, default=default_data)
-    
+}
+
+def get_navbar_dropdowns_data():
+    """Get all navbar dropdowns data (columns and items sorted by order when loaded)"""
+    return load_json_data(Config.NAVBAR_DROPDOWNS_DATA_FILE, default=copy.deepcopy(DEFAULT_NAVBAR_DROPDOWNS_DATA))
+
+def _prepare_navbar_dropdowns_data(data):
     # Ensure structure exists
     if 'social_media' not in data:
-        data['social_media'] = default_data['social_media']
+        data['social_media'] = copy.deepcopy(DEFAULT_NAVBAR_DROPDOWNS_DATA['social_media'])
     if 'dropdowns' not in data:
-        data['dropdowns'] = default_data['dropdowns']
+        data['dropdowns'] = copy.deepcopy(DEFAULT_NAVBAR_DROPDOWNS_DATA['dropdowns'])
     
     # Sort columns by order and items within each column by order
     for nav_item, dropdown_data in data.get('dropdowns', {}).items():
         if 'columns' in dropdown_data:
             # Sort columns by order
-            dropdown_data['columns'].sort(key=lambda x: x.get('order', 0))
+            dropdown_data['columns'] = _sorted_by_order(dropdown_data['columns'])
             # Sort items in each column by order
             for column in dropdown_data['columns']:
                 if 'items' in column:
-                    column['items'].sort(key=lambda x: x.get('order', 0))
+                    column['items'] = _sorted_by_order(column['items'])
     
     return data
 
@@ -650,6 +964,7 @@ def get_dropdown_for_nav_item(nav_item):
     data = get_navbar_dropdowns_data()
     return data.get('dropdowns', {}).get(nav_item, {'enabled': False, 'columns': []})
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def update_dropdown_for_nav_item(nav_item, dropdown_data):
     """Update dropdown data for a specific navbar item"""
     data = get_navbar_dropdowns_data()
@@ -658,6 +973,7 @@ def update_dropdown_for_nav_item(nav_item, dropdown_data):
     data['dropdowns'][nav_item] = dropdown_data
     return save_navbar_dropdowns_data(data)
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def toggle_dropdown_enabled(nav_item, enabled):
     """Enable or disable dropdown for a navbar item"""
     data = get_navbar_dropdowns_data()
@@ -668,6 +984,7 @@ def toggle_dropdown_enabled(nav_item, enabled):
     data['dropdowns'][nav_item]['enabled'] = enabled
     return save_navbar_dropdowns_data(data)
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def add_dropdown_column(nav_item, column_data):
     """Add a column to a dropdown"""
     data = get_navbar_dropdowns_data()
@@ -685,6 +1002,7 @@ def add_dropdown_column(nav_item, column_data):
     data['dropdowns'][nav_item]['columns'].append(column_data)
     return save_navbar_dropdowns_data(data), column_id
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def update_dropdown_column(nav_item, column_id, column_data):
     """Update a dropdown column"""
     data = get_navbar_dropdowns_data()
@@ -701,6 +1019,7 @@ def update_dropdown_column(nav_item, column_id, column_data):
             return save_navbar_dropdowns_data(data)
     return False
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def delete_dropdown_column(nav_item, column_id):
     """Delete a dropdown column"""
     data = get_navbar_dropdowns_data()
@@ -713,6 +1032,7 @@ def delete_dropdown_column(nav_item, column_id):
     ]
     return save_navbar_dropdowns_data(data)
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def add_dropdown_item(nav_item, column_id, item_data):
     """Add an item to a dropdown column"""
     data = get_navbar_dropdowns_data()
@@ -733,6 +1053,7 @@ def add_dropdown_item(nav_item, column_id, item_data):
             return save_navbar_dropdowns_data(data), item_id
     return False, None
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def update_dropdown_item(nav_item, column_id, item_id, item_data):
     """Update an item in a dropdown column"""
     data = get_navbar_dropdowns_data()
@@ -753,6 +1074,7 @@ def update_dropdown_item(nav_item, column_id, item_id, item_data):
                     return save_navbar_dropdowns_data(data)
     return False
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def delete_dropdown_item(nav_item, column_id, item_id):
     """Delete an item from a dropdown column"""
     data = get_navbar_dropdowns_data()
@@ -770,6 +1092,7 @@ def delete_dropdown_item(nav_item, column_id, item_id):
             return save_navbar_dropdowns_data(data)
     return False
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def update_dropdown_column_order(nav_item, column_ids):
     """Update column order for a dropdown"""
     data = get_navbar_dropdowns_data()
@@ -785,6 +1108,7 @@ def update_dropdown_column_order(nav_item, column_ids):
     data['dropdowns'][nav_item]['columns'] = list(column_dict.values())
     return save_navbar_dropdowns_data(data)
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def update_dropdown_item_order(nav_item, column_id, item_ids):
     """Update item order within a column"""
     data = get_navbar_dropdowns_data()
@@ -806,19 +1130,41 @@ def update_dropdown_item_order(nav_item, column_id, item_ids):
             return save_navbar_dropdowns_data(data)
     return False
 
+@_writes(Config.NAVBAR_DROPDOWNS_DATA_FILE)
 def update_global_social_media(social_data):
     """Update global social media links (used in all dropdowns)"""
     data = get_navbar_dropdowns_data()
     data['social_media'] = social_data
     return save_navbar_dropdowns_data(data)
 
+# Defaults for data files whose getters expect a dict rather than a list
+_DATA_DEFAULTS = {
+    Config.VIDEOS_DROPDOWN_DATA_FILE: DEFAULT_VIDEOS_DROPDOWN_DATA,
+    Config.NAVBAR_DROPDOWNS_DATA_FILE: DEFAULT_NAVBAR_DROPDOWNS_DATA,
+}
+
+def _sorted_by_order(items):
+    """New list sorted by the order field (default to 0 if not set)"""
+    return sorted(items, key=lambda x: x.get('order', 0))
+
+# Applied once to freshly loaded data before it is cached and shared
+_DATA_PREPARERS = {
+    Config.BLOGS_DATA_FILE: _sorted_by_order,
+    Config.EVENTS_DATA_FILE: _sorted_by_order,
+    Config.PHOTOS_DATA_FILE: _sorted_by_order,
+    Config.SLIDER_DATA_FILE: _sorted_by_order,
+    Config.OBJECTIVES_DATA_FILE: _sorted_by_order,
+    Config.VIDEOS_DROPDOWN_DATA_FILE: _prepare_videos_dropdown_data,
+    Config.NAVBAR_DROPDOWNS_DATA_FILE: _prepare_navbar_dropdowns_data,
+}
+
+# The content collections (every data file the getters above serve)
+CONTENT_FILES = tuple(_DATA_PREPARERS)
+
 # Objectives Management
 def get_all_objectives():
-    """Get all objectives, sorted by order"""
-    objectives = load_json_data(Config.OBJECTIVES_DATA_FILE, default=[])
-    # Sort by order field (default to 0 if not set)
-    objectives.sort(key=lambda x: x.get('order', 0))
-    return objectives
+    """Get all objectives, sorted by order (sorted when loaded)"""
+    return load_json_data(Config.OBJECTIVES_DATA_FILE, default=[])
 
 def get_objective_by_id(objective_id):
     """Get a specific objective by ID"""
@@ -828,6 +1174,7 @@ def get_objective_by_id(objective_id):
             return objective
     return None
 
+@_writes(Config.OBJECTIVES_DATA_FILE)
 def add_objective(objective_data):
     """Add a new objective"""
     objectives = get_all_objectives()
@@ -848,6 +1195,7 @@ def add_objective(objective_data):
     objectives.append(objective_data)
     return save_json_data(Config.OBJECTIVES_DATA_FILE, objectives)
 
+@_writes(Config.OBJECTIVES_DATA_FILE)
 def update_objective(objective_id, objective_data):
     """Update an existing objective"""
     objectives = get_all_objectives()
@@ -861,12 +1209,14 @@ def update_objective(objective_id, objective_data):
             return save_json_data(Config.OBJECTIVES_DATA_FILE, objectives)
     return False
 
+@_writes(Config.OBJECTIVES_DATA_FILE)
 def delete_objective(objective_id):
     """Delete an objective"""
     objectives = get_all_objectives()
     objectives = [obj for obj in objectives if str(obj.get('id')) != str(objective_id)]
     return save_json_data(Config.OBJECTIVES_DATA_FILE, objectives)
 
+@_writes(Config.OBJECTIVES_DATA_FILE)
 def update_objective_order(objective_ids):
     """Update the order of objectives based on provided list of IDs"""
     objectives = load_json_data(Config.OBJECTIVES_DATA_FILE, default=[])
@@ -880,83 +1230,52 @@ def update_objective_order(objective_ids):
     
     return save_json_data(Config.OBJECTIVES_DATA_FILE, objectives)
 
-
-def get_latest_youtube_videos(limit=50):
-    """Fetch latest videos from YouTube RSS feed"""
-    CHANNEL_ID = "UC6xKFvHyM3KRmaq9grhYz3g"
-    RSS_URL = f"https://www.youtube.com/feeds/videos.xml?channel_id={CHANNEL_ID}"
-    CACHE_FILE = os.path.join(os.path.dirname(Config.BLOGS_DATA_FILE), 'youtube_cache.json')
-    
-    # Check cache
-    cached_data = load_json_data(CACHE_FILE, default=None)
-    if cached_data:
-        last_updated = cached_data.get('last_updated')
-        if last_updated:
+# Mutation helpers the bulk API may run: the public @_writes functions
+BULK_OPERATIONS = {name: func for name, func in list(globals().items())
+                   if not name.startswith('_') and callable(func) and hasattr(func, 'data_file')}
+
+class BulkOperationError(ValueError):
+    """An operation of apply_operations() was invalid or failed; nothing was saved"""
+    
+    def __init__(self, index, message):
+        super().__init__(f"operation {index}: {message}")
+        self.index = index
+
+def apply_operations(operations):
+    """
+    Run mutation helpers in one batch. If any operation is invalid, raises or
+    returns failure, nothing is saved. The changed files are then saved one by
+    one, so a failed save can still leave the others written (see batch()).
+    Args:
+        operations: List of {'op': helper name, 'args': [positional arguments]},
+                    e.g. {'op': 'update_event', 'args': ['12', {...}]}
+    Returns:
+        ([{'op', 'id'} per operation], Batch)
+    Raises:
+        BulkOperationError: An operation is unknown or malformed, raised or returned failure
+    """
+    calls = []
+    for index, operation in enumerate(operations):
+        name = operation.get('op') if isinstance(operation, dict) else None
+        if name not in BULK_OPERATIONS:
+            raise BulkOperationError(index, f"unknown operation {name!r}")
+        args = operation.get('args', [])
+        if not isinstance(args, list):
+            raise BulkOperationError(index, "args must be a list")
+        calls.append((BULK_OPERATIONS[name], args))
+    
+    results = []
+    with batch(*{func.data_file for func, _ in calls}) as current:
+        for index, (func, args) in enumerate(calls):
             try:
-                last_updated_time = datetime.fromisoformat(last_updated)
-                if datetime.now() - last_updated_time < timedelta(hours=1):
-                    return cached_data.get('videos', [])[:limit]
-            except ValueError:
-                pass # Invalid date format, ignore cache
-
-    try:
-        response = requests.get(RSS_URL, timeout=5)
-        if response.status_code == 200:
-            root = ET.fromstring(response.content)
-            ns = {'yt': 'http://www.youtube.com/xml/schemas/2015', 'media': 'http://search.yahoo.com/mrss/', 'atom': 'http://www.w3.org/2005/Atom'}
-            
-            videos = []
-            for entry in root.findall('atom:entry', ns):
-                video_id = entry.find('yt:videoId', ns).text
-                title = entry.find('atom:title', ns).text
-                published = entry.find('atom:published', ns).text
-                
-                # Parse published date
-                try:
-                    pub_date = datetime.fromisoformat(published.replace('Z', '+00:00'))
-                    days_ago = (datetime.now(pub_date.tzinfo) - pub_date).days
-                except:
-                    days_ago = 0
-                
-                if days_ago == 0:
-                    date_str = "Today"
-                elif days_ago == 1:
-                    date_str = "1 day ago"
-                else:
-                    date_str = f"{days_ago} days ago"
-                
-                media_group = entry.find('media:group', ns)
-                thumbnail = media_group.find('media:thumbnail', ns).attrib['url']
-                description = media_group.find('media:description', ns).text or ""
-                
-                # Determine category
-                category = 'video'
-                if 'LIVE' in title.upper() or 'STREAM' in title.upper():
-                    category = 'livestream'
-                
-                videos.append({
-                    'id': video_id,
-                    'title': title,
-                    'date': f"YouTube • {date_str}",
-                    'description': description[:150] + "..." if len(description) > 150 else description,
-                    'thumbnail': thumbnail,
-                    'url': f"https://www.youtube.com/embed/{video_id}",
-                    'watch_url': f"https://www.youtube.com/watch?v={video_id}",
-                    'category': category
-                })
-            
-            # Save to cache
-            cache_data = {
-                'last_updated': datetime.now().isoformat(),
-                'videos': videos
-            }
-            save_json_data(CACHE_FILE, cache_data)
-            
-            return videos[:limit]
-            
-    except Exception as e:
-        print(f"Error fetching YouTube videos: {e}")
-        if cached_data:
-            return cached_data.get('videos', [])[:limit]
-            
-    return []
+                result = func(*args)
+            except Exception as e:
+                raise BulkOperationError(index, f"{func.__name__}: {type(e).__name__}: {e}") from e
+            ok, record_id = result if isinstance(result, tuple) else (result, None)
+            if not ok:
+                raise BulkOperationError(index, f"{func.__name__} failed")
+            if record_id is None:
+                # add_*/update_* fill in the id (a new blog slug, say) on the record passed in
+                record_id = next((arg['id'] for arg in args if isinstance(arg, dict) and 'id' in arg), None)
+            results.append({'op': func.__name__, 'id': record_id})
+    return results, current
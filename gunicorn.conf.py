@@ -0,0 +1,33 @@
+"""
+gunicorn settings read automatically from the working directory (Procfile: gunicorn app:app).
+Command-line flags still override anything set here.
+
+PRELOAD_APP=true imports the app once in the master and preloads its content
+(see preload.py) so workers fork with warm caches instead of each loading them.
+Each worker starts its job scheduler (and, without preloading, its warm-up)
+in post_worker_init.
+"""
+import os
+
+preload_app = os.environ.get('PRELOAD_APP', 'false').lower() == 'true'
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded import, before the first worker is forked
+    if server.cfg.preload_app:
+        from app import app
+        from preload import preload_content
+        preload_content(app)
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from preload import after_fork
+        after_fork()
+
+
+def post_worker_init(worker):
+    # Runs in each worker once the app is loaded: importing app starts no threads itself
+    from app import app
+    from preload import start_serving
+    start_serving(app)
@@ -0,0 +1,360 @@
+"""
+Server-side page localization.
+The translation table in static/js/language.js is compiled into a Python dict
+on first use, and public pages for a known language (/hi/..., /en/... or the
+'lang' cookie) are rendered in that language only: the same substitutions
+applyLanguage() makes in the browser are applied once to the rendered HTML,
+the unused -en/-hi copies are dropped, and language.js is not shipped.
+Visitors who have not chosen a language yet get the bilingual page as before.
+"""
+import html
+import json
+import os
+import re
+import threading
+from html.parser import HTMLParser
+
+from flask import request
+
+from config import Config
+
+LANGUAGE_JS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'js', 'language.js')
+SUPPORTED_LANGUAGES = ('hi', 'en')
+LANGUAGE_COOKIE = 'lang'
+LANGUAGE_ENVIRON_KEY = 'i18n.language'
+
+# data-lang-<section>="key" attributes that applyLanguage() resolves from the table
+TRANSLATED_SECTIONS = ('nav', 'home', 'footer', 'popup', 'blog', 'photos', 'videos', 'donate', 'events')
+
+# Attribute pairs data-<name>-en / data-<name>-hi whose value replaces the element text
+TEXT_PAIRS = (
+    'column-title', 'column-heading', 'item-title',
+    'lang-blog-title', 'lang-blog-excerpt', 'lang-blog-date', 'lang-blog-category', 'lang-blog-content',
+    'title', 'location', 'gallery-title', 'gallery-date', 'gallery-description',
+    'objective-title', 'objective-desc',
+)
+# Pairs that fall back to the other language when the chosen one is empty
+FALLBACK_PAIRS = ('objective-title', 'objective-desc')
+
+# Label of the language toggle (it names the language you would switch to)
+TOGGLE_TEXT = {'en': 'हिंदी', 'hi': 'English'}
+TOGGLE_ARIA_LABEL = {'en': 'Switch to Hindi', 'hi': 'Switch to English'}
+
+MARQUEE_PADDING = '&nbsp;' * 8
+
+# Links that are not public pages keep their path under a /hi or /en prefix
+UNPREFIXED_LINK_ROOTS = ('static', 'admin', 'api') + SUPPORTED_LANGUAGES
+
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'source', 'track', 'wbr',
+}
+
+
+# Translation table
+class _ObjectLiteralParser:
+    """Parse the JS object literal holding the translations (keys, strings, nested objects)"""
+
+    _TOKEN = re.compile(r'''
+        \s+ | //[^\n]* | /\*.*?\*/                      # whitespace and comments
+        | (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+        | (?P<ident>[A-Za-z_$][\w$]*)
+        | (?P<number>-?\d+(?:\.\d+)?)
+        | (?P<punct>[{}:,\[\]])
+    ''', re.VERBOSE | re.DOTALL)
+
+    def __init__(self, source):
+        self.tokens = []
+        pos = 0
+        while pos < len(source):
+            match = self._TOKEN.match(source, pos)
+            if not match:
+                raise ValueError(f"Unexpected character {source[pos]!r} at offset {pos}")
+            pos = match.end()
+            for kind in ('string', 'ident', 'number', 'punct'):
+                if match.group(kind) is not None:
+                    self.tokens.append((kind, match.group(kind)))
+                    break
+        self.index = 0
+
+    def _next(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def _peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else (None, None)
+
+    def _expect(self, value):
+        kind, token = self._next()
+        if token != value:
+            raise ValueError(f"Expected {value!r}, got {token!r}")
+
+    def parse(self):
+        return self._value()
+
+    def _value(self):
+        kind, token = self._next()
+        if kind == 'string':
+            return self._string(token)
+        if kind == 'number':
+            return json.loads(token)
+        if kind == 'ident' and token in ('true', 'false', 'null'):
+            return json.loads(token)
+        if token == '{':
+            return self._object()
+        if token == '[':
+            return self._array()
+        raise ValueError(f"Unsupported value {token!r}")
+
+    def _object(self):
+        result = {}
+        while self._peek()[1] != '}':
+            kind, key = self._next()
+            self._expect(':')
+            result[self._string(key) if kind == 'string' else key] = self._value()
+            if self._peek()[1] == ',':
+                self._next()
+        self._next()
+        return result
+
+    def _array(self):
+        result = []
+        while self._peek()[1] != ']':
+            result.append(self._value())
+            if self._peek()[1] == ',':
+                self._next()
+        self._next()
+        return result
+
+    @staticmethod
+    def _string(token):
+        body = token[1:-1]
+        if token[0] == "'":
+            body = body.replace("\\'", "'").replace('"', '\\"')
+        return json.loads(f'"{body}"')
+
+
+def load_translations(path=LANGUAGE_JS_FILE):
+    """Compile the `const translations = {...};` table from language.js into a dict"""
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    match = re.search(r'const\s+translations\s*=\s*', source)
+    if not match:
+        raise ValueError('translations table not found')
+    parser = _ObjectLiteralParser(source[match.end():source.index('\n};', match.end()) + 2])
+    return parser.parse()
+
+
+_translations = None
+_translations_lock = threading.Lock()
+
+
+def get_translations():
+    """The compiled translation table, parsed from language.js on first use ({} if it cannot be)"""
+    global _translations
+    if _translations is None:
+        with _translations_lock:
+            if _translations is None:
+                try:
+                    _translations = load_translations()
+                except (OSError, ValueError, IndexError) as e:
+                    print(f"⚠ Could not compile translations from language.js ({e}), pages stay bilingual")
+                    _translations = {}
+    return _translations
+
+
+def translate(lang, section, key, default=None):
+    """Look up a UI string, e.g. translate('hi', 'nav', 'home')"""
+    return get_translations().get(lang, {}).get(section, {}).get(key, default)
+
+
+# Request language
+class LanguagePrefixMiddleware:
+    """Serve /hi/... and /en/... by stripping the prefix and recording the language in the environ"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        for lang in SUPPORTED_LANGUAGES:
+            prefix = '/' + lang
+            if path == prefix or path.startswith(prefix + '/'):
+                environ['PATH_INFO'] = path[len(prefix):] or '/'
+                environ[LANGUAGE_ENVIRON_KEY] = lang
+                break
+        return self.wsgi_app(environ, start_response)
+
+
+def get_prefix_language():
+    """Language from a /hi or /en URL prefix, or ''"""
+    return request.environ.get(LANGUAGE_ENVIRON_KEY, '')
+
+
+def get_page_language():
+    """Language a public page is rendered in ('' = both, switched client-side)"""
+    if not Config.SERVER_LANGUAGE_ENABLED or not get_translations():
+        return ''
+    lang = get_prefix_language() or request.cookies.get(LANGUAGE_COOKIE, '')
+    return lang if lang in SUPPORTED_LANGUAGES else ''
+
+
+# HTML localization
+def _pair_text(attrs, name, lang):
+    """Chosen text for a data-<name>-en/-hi pair, or None to leave the element alone"""
+    text = attrs.get(f'data-{name}-{lang}')
+    if not text and name in FALLBACK_PAIRS:
+        other = 'hi' if lang == 'en' else 'en'
+        text = attrs.get(f'data-{name}-{other}')
+    return text or None
+
+
+class _Localizer(HTMLParser):
+    """Re-emit an HTML document with one language's text substituted in"""
+
+    def __init__(self, lang, link_prefix=''):
+        super().__init__(convert_charrefs=False)
+        self.lang = lang
+        self.table = get_translations().get(lang, {})
+        self.link_prefix = link_prefix
+        self.out = []
+        # While > 0, the original children of a replaced element are being skipped
+        self.skip_depth = 0
+
+    def _emit(self, text):
+        if not self.skip_depth:
+            self.out.append(text)
+
+    def _localize_tag(self, tag, attrs):
+        """Return (attrs, replacement text or None, replacement html or None), or None if unchanged"""
+        values = dict(attrs)
+        changed = False
+        text = None
+        markup = None
+
+        for section in TRANSLATED_SECTIONS:
+            key = values.get(f'data-lang-{section}')
+            if key is None:
+                continue
+            value = self.table.get(section, {}).get(key)
+            if value:
+                if tag in ('input', 'textarea'):
+                    values['placeholder'] = value
+                    changed = True
+                else:
+                    text = value
+            break
+
+        read_less = values.get('data-lang-blog-read-less')
+        if read_less and self.table.get('blog', {}).get(read_less):
+            values['data-read-less-text'] = self.table['blog'][read_less]
+            changed = True
+
+        if 'data-lang-marquee' in values:
+            announcement = html.escape(self.table.get('marquee', {}).get('announcement', ''), quote=False)
+            if announcement:
+                markup = f"{MARQUEE_PADDING}{announcement}{'&nbsp;' * 4}{announcement}{MARQUEE_PADDING}"
+
+        for name in TEXT_PAIRS:
+            if f'data-{name}-en' in values or f'data-{name}-hi' in values:
+                pair_text = _pair_text(values, name, self.lang)
+                if pair_text is not None:
+                    text = pair_text
+                # The other language (and this copy) are no longer needed in the page
+                values.pop(f'data-{name}-en', None)
+                values.pop(f'data-{name}-hi', None)
+                changed = True
+
+        element_id = values.get('id')
+        if element_id in ('languageBtnText', 'languageBtnTextMobile'):
+            text = TOGGLE_TEXT[self.lang]
+        elif element_id == 'languageBtn':
+            values['aria-label'] = TOGGLE_ARIA_LABEL[self.lang]
+            changed = True
+
+        if self.link_prefix and tag == 'a':
+            href = values.get('href') or ''
+            if href.startswith('/') and not href.startswith('//') \
+                    and href.split('/')[1].split('?')[0] not in UNPREFIXED_LINK_ROOTS:
+                values['href'] = self.link_prefix + href if href != '/' else self.link_prefix
+                changed = True
+
+        if not changed and text is None and markup is None:
+            return None
+        return values, text, markup
+
+    @staticmethod
+    def _format_tag(tag, values, self_closing=False):
+        parts = [tag]
+        for name, value in values.items():
+            parts.append(name if value is None else f'{name}="{html.escape(value, quote=True)}"')
+        return f"<{' '.join(parts)}{' /' if self_closing else ''}>"
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_depth:
+            if tag not in VOID_ELEMENTS:
+                self.skip_depth += 1
+            return
+        result = self._localize_tag(tag, attrs)
+        if result is None:
+            self.out.append(self.get_starttag_text())
+            return
+        values, text, markup = result
+        self.out.append(self._format_tag(tag, values))
+        if (text is not None or markup is not None) and tag not in VOID_ELEMENTS:
+            self.out.append(markup if markup is not None else html.escape(text, quote=False))
+            self.skip_depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        if self.skip_depth:
+            return
+        result = self._localize_tag(tag, attrs)
+        if result is None:
+            self.out.append(self.get_starttag_text())
+        else:
+            self.out.append(self._format_tag(tag, result[0], self_closing=True))
+
+    def handle_endtag(self, tag):
+        if self.skip_depth:
+            self.skip_depth -= 1
+            if self.skip_depth:
+                return
+        self.out.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        self._emit(data)
+
+    def handle_entityref(self, name):
+        self._emit(f'&{name};')
+
+    def handle_charref(self, name):
+        self._emit(f'&#{name};')
+
+    def handle_comment(self, data):
+        self._emit(f'<!--{data}-->')
+
+    def handle_decl(self, decl):
+        self._emit(f'<!{decl}>')
+
+    def handle_pi(self, data):
+        self._emit(f'<?{data}>')
+
+    def unknown_decl(self, data):
+        self._emit(f'<![{data}]>')
+
+
+def localize_html(page, lang, link_prefix=''):
+    """
+    Render a bilingual page in a single language.
+    Args:
+        page: HTML as produced by the templates
+        lang: 'hi' or 'en'
+        link_prefix: '/hi' or '/en' to keep internal links under a language prefix
+    Returns:
+        Localized HTML string
+    """
+    localizer = _Localizer(lang, link_prefix)
+    localizer.feed(page)
+    localizer.close()
+    return ''.join(localizer.out)
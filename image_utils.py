@@ -2,7 +2,9 @@
 Image utility functions for responsive images and Cloudinary transformations
 """
 import re
+from functools import lru_cache
 from storage import storage_manager
+from timing import timed
 
 def is_cloudinary_url(url):
     """Check if URL is from Cloudinary"""
@@ -10,6 +12,7 @@ def is_cloudinary_url(url):
         return False
     return 'cloudinary.com' in url or 'res.cloudinary.com' in url
 
+@timed('images')
 def get_responsive_image_url(url, width=None, quality='auto', format='auto'):
     """
     Generate responsive image URL with Cloudinary transformations
@@ -68,6 +71,7 @@ def get_responsive_image_url(url, width=None, quality='auto', format='auto'):
     
     return url
 
+@timed('images')
 def generate_srcset(url, widths=None):
     """
     Generate srcset string for responsive images
@@ -90,6 +94,7 @@ def generate_srcset(url, widths=None):
     
     return ', '.join(srcset_parts)
 
+@timed('images')
 def generate_responsive_image_attrs(url, sizes=None, default_width=1200):
     """
     Generate complete responsive image attributes
@@ -98,11 +103,15 @@ def generate_responsive_image_attrs(url, sizes=None, default_width=1200):
         sizes: sizes attribute string (default: responsive sizes)
         default_width: Default width for src attribute
     Returns:
-        Dictionary with src, srcset, sizes attributes
+        Dictionary with src, srcset, sizes attributes (cached and shared: do not modify it)
     """
     if not url:
         return {'src': '', 'srcset': '', 'sizes': ''}
-    
+    return _responsive_image_attrs(url, sizes, default_width)
+
+# Every page render asks for the same images' attributes; the boot warm-up fills this cache
+@lru_cache(maxsize=4096)
+def _responsive_image_attrs(url, sizes, default_width):
     # Default sizes for responsive images
     if sizes is None:
         sizes = "(max-width: 640px) 100vw, (max-width: 1024px) 50vw, (max-width: 1440px) 33vw, 400px"
@@ -0,0 +1,126 @@
+"""
+Maintenance jobs run by the in-process scheduler (scheduler.py).
+Work that used to happen on the request path or in per-worker threads runs
+here instead, once per node (start_background_jobs() replaces
+start_feed_refresher() unless SCHEDULER_ENABLED=false):
+
+    youtube-refresh     fetch the feeds before the cached copy expires (replaces the per-worker refresher)
+    thumbnails          download missing video thumbnails, evict unlisted ones
+    migrations          blog slug / event order migrations (no longer checked on every home page view)
+    cloudinary-mirror   keep the local data files in step with Cloudinary, the fallback when it is unreachable
+    orphan-uploads      report (ORPHAN_CLEANUP_DELETE=true: delete) local uploads no content refers to
+    warm-data-cache     every worker: reload data files shortly before their cache entry expires
+"""
+import json
+import os
+import time
+
+from config import Config
+import data_manager
+from data_manager import CONTENT_FILES, get_cache_ttl, load_json_data, refresh_cached_data
+from storage import storage_manager
+from scheduler import scheduler
+from youtube_feed import CACHE_FILE, get_cache_age, refresh_feed, start_feed_refresher
+from thumbnail_cache import sync_thumbnails
+
+WARM_INTERVAL = 60  # seconds between warm-data-cache runs
+
+
+def refresh_youtube_feed():
+    # Runs every YOUTUBE_REFRESH_AHEAD; fetch once the stored copy (maybe refreshed by another node) is due
+    age = get_cache_age(load_json_data(CACHE_FILE, default=None, use_cache=False))
+    if age is not None and age < Config.YOUTUBE_CACHE_TTL - Config.YOUTUBE_REFRESH_AHEAD:
+        return None
+    videos = refresh_feed()
+    counts = sync_thumbnails(videos) if Config.THUMBNAIL_CACHE_ENABLED else None
+    result = f"{len(videos)} videos"
+    if counts:
+        result += f", {counts['downloaded']} thumbnails cached, {counts['evicted']} evicted"
+    return result
+
+
+def sync_video_thumbnails():
+    cached_data = load_json_data(CACHE_FILE, default=None, use_cache=False)
+    if not cached_data:
+        return 'no cached feed'
+    counts = sync_thumbnails(cached_data.get('videos', []))
+    return f"{counts['cached']} cached, {counts['downloaded']} downloaded, {counts['failed']} failed"
+
+
+def run_migrations():
+    data_manager.migrate_blog_ids_to_slugs()
+    data_manager.migrate_event_orders()
+
+
+def warm_data_cache():
+    """Reload this worker's cached content files before requests find them expired"""
+    refresh_cached_data(max_age=max(0, get_cache_ttl() - 2 * WARM_INTERVAL))
+
+
+def mirror_cloudinary_data():
+    changed = [os.path.basename(file_path) for file_path in CONTENT_FILES
+               if storage_manager.mirror_json_data(os.path.basename(file_path))]
+    return f"updated {', '.join(changed)}" if changed else None
+
+
+def find_orphan_uploads(grace_seconds, now=None):
+    """
+    Local uploads that no content file refers to and that are older than the grace period.
+    Returns:
+        List of file paths
+    """
+    if not os.path.isdir(Config.UPLOAD_FOLDER):
+        return []
+    # Uploads are referenced by URL (/static/uploads/<name>); any mention of the name keeps the file
+    content = '\n'.join(json.dumps(load_json_data(file_path, default=None), ensure_ascii=False)
+                        for file_path in CONTENT_FILES)
+    cutoff = (now or time.time()) - grace_seconds
+    orphans = []
+    for entry in os.scandir(Config.UPLOAD_FOLDER):
+        if entry.is_file() and not entry.name.startswith('.') and entry.name not in content \
+                and entry.stat().st_mtime < cutoff:
+            orphans.append(entry.path)
+    return orphans
+
+
+def clean_orphan_uploads():
+    orphans = find_orphan_uploads(Config.ORPHAN_UPLOAD_GRACE_HOURS * 3600)
+    if not orphans:
+        return None
+    size = sum(os.path.getsize(path) for path in orphans)
+    if not Config.ORPHAN_CLEANUP_DELETE:
+        return f"{len(orphans)} unreferenced uploads ({size / 1e6:.1f} MB), not deleted: " \
+               + ', '.join(os.path.basename(path) for path in orphans[:10])
+    for path in orphans:
+        os.remove(path)
+    return f"deleted {len(orphans)} unreferenced uploads ({size / 1e6:.1f} MB)"
+
+
+def register_jobs(scheduler):
+    """Add the maintenance jobs that apply to this configuration"""
+    if Config.YOUTUBE_REFRESH_ENABLED:
+        scheduler.add('youtube-refresh', refresh_youtube_feed,
+                      every=max(60, Config.YOUTUBE_REFRESH_AHEAD),
+                      description='Fetch the YouTube feeds and sync thumbnails')
+    if Config.THUMBNAIL_CACHE_ENABLED:
+        scheduler.add('thumbnails', sync_video_thumbnails, every=3600,
+                      description='Download missing thumbnails of the cached feed')
+    scheduler.add('migrations', run_migrations, every=3600,
+                  description='Blog id to slug and event order migrations')
+    if storage_manager.use_cloudinary:
+        scheduler.add('cloudinary-mirror', mirror_cloudinary_data, every=900,
+                      description='Copy the Cloudinary data files to the local fallback copies')
+    scheduler.add('orphan-uploads', clean_orphan_uploads, cron='30 3 * * *',
+                  description='Find (or delete) local uploads no content refers to')
+    scheduler.add('warm-data-cache', warm_data_cache, every=WARM_INTERVAL,
+                  leader_only=False, description="Reload this worker's cached data files before they expire")
+
+
+def start_background_jobs():
+    """Start this worker's scheduler (or, with SCHEDULER_ENABLED=false, just the feed refresher)"""
+    if not Config.SCHEDULER_ENABLED:
+        start_feed_refresher()
+        return
+    if not scheduler.jobs:
+        register_jobs(scheduler)
+    scheduler.start()
@@ -0,0 +1,301 @@
+"""
+Prometheus metrics for the node.
+Each process counts into an in-memory registry and a background thread
+writes a snapshot to METRICS_DIR/<master pid>/<pid>.json every few seconds.
+A scrape of /metrics merges the snapshots of all workers started by the same
+gunicorn master, so one scrape shows the whole node: counters and histograms
+are summed (including those of workers that have since exited), gauges are
+reported per live worker.
+Recording is a dict update under a lock; with METRICS_ENABLED off it is a no-op.
+"""
+import atexit
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+from config import Config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+JOB_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300)
+SIZE_BUCKETS = (10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 16_000_000)
+
+# name -> (type, help, histogram buckets)
+DEFINITIONS = {
+    'http_requests_total': ('counter', 'HTTP requests by endpoint, method and status', None),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency by endpoint', LATENCY_BUCKETS),
+    'page_cache_requests_total': ('counter', 'Rendered page cache lookups by result', None),
+    'data_cache_requests_total': ('counter', 'Data file loads by collection and cache result', None),
+    'data_cache_reloads_total': ('counter', 'Data files read from storage by collection', None),
+    'external_requests_total': ('counter', 'Calls to Cloudinary and YouTube by operation and outcome', None),
+    'external_request_duration_seconds': ('histogram', 'Latency of calls to Cloudinary and YouTube', LATENCY_BUCKETS),
+    'youtube_feed_fetches_total': ('counter', 'YouTube feed fetches by feed and result', None),
+    'slow_requests_total': ('counter', 'Requests that ran past SLOW_REQUEST_THRESHOLD by endpoint', None),
+    'scheduler_job_runs_total': ('counter', 'Scheduled job runs by job and status', None),
+    'scheduler_job_duration_seconds': ('histogram', 'Duration of scheduled job runs', JOB_BUCKETS),
+    'upload_size_bytes': ('histogram', 'Size of uploaded files', SIZE_BUCKETS),
+    'process_resident_memory_bytes': ('gauge', 'Resident memory of each worker', None),
+}
+
+
+def _key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Registry:
+    """Counters, histograms and gauges of this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._flusher = None
+
+    def _reset_if_forked(self):
+        # A forked worker starts from zero; its parent's counts are the parent's own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._group = str(os.getppid())
+            self.counters = {}
+            self.histograms = {}
+            self.gauges = {}
+            # Write one snapshot even if nothing is recorded, so the worker's memory is reported
+            self._dirty = True
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+            self._flusher.start()
+
+    def after_fork(self):
+        """Fresh lock in a forked child: the parent's flusher thread may have held it at fork time"""
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._reset_if_forked()
+            self.counters[key] = self.counters.get(key, 0) + amount
+            self._dirty = True
+
+    def observe(self, name, value, **labels):
+        buckets = DEFINITIONS[name][2]
+        key = _key(name, labels)
+        with self._lock:
+            self._reset_if_forked()
+            # [per-bucket counts..., +Inf count, sum]
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+            histogram[index] += 1
+            histogram[-1] += value
+            self._dirty = True
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._reset_if_forked()
+            self.gauges[_key(name, labels)] = value
+            self._dirty = True
+
+    def _path(self):
+        return os.path.join(Config.METRICS_DIR, self._group, f"{self._pid}.json")
+
+    def flush(self):
+        """Write this process's snapshot for the scraping worker to merge (only if something was recorded)"""
+        with self._lock:
+            self._reset_if_forked()
+            if not self._dirty:
+                return
+            # Memory is sampled when a snapshot is written; it does not make an idle worker write one
+            gauges = dict(self.gauges)
+            gauges[_key('process_resident_memory_bytes', {'pid': str(self._pid)})] = resident_memory_bytes()
+            snapshot = {'counters': dict(self.counters),
+                        'histograms': {key: list(value) for key, value in self.histograms.items()},
+                        'gauges': gauges}
+            self._dirty = False
+        path = self._path()
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠ Could not write metrics snapshot: {e}")
+
+    def flush_at_exit(self):
+        # A process that recorded nothing (a script that only imported the app) leaves no snapshot
+        if self._pid == os.getpid():
+            self.flush()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(Config.METRICS_FLUSH_SECONDS)
+            self.flush()
+
+
+registry = Registry()
+
+
+def inc(name, amount=1, **labels):
+    """Increment a counter (no-op when metrics are disabled)"""
+    if Config.METRICS_ENABLED:
+        registry.inc(name, amount, **labels)
+
+
+def observe(name, value, **labels):
+    """Record a histogram observation (no-op when metrics are disabled)"""
+    if Config.METRICS_ENABLED:
+        registry.observe(name, value, **labels)
+
+
+@contextmanager
+def track_call(service, operation):
+    """Count and time a call to an external service; exceptions count as failures"""
+    start = time.perf_counter()
+    outcome = 'failure'
+    try:
+        yield
+        outcome = 'success'
+    finally:
+        observe('external_request_duration_seconds', time.perf_counter() - start,
+                service=service, operation=operation)
+        inc('external_requests_total', service=service, operation=operation, outcome=outcome)
+
+
+def resident_memory_bytes():
+    """Current RSS from /proc on Linux, peak RSS elsewhere"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+def _read_snapshots(group_dir):
+    try:
+        filenames = os.listdir(group_dir)
+    except FileNotFoundError:
+        return
+    for filename in filenames:
+        if not filename.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(group_dir, filename), 'r', encoding='utf-8') as f:
+                yield filename[:-len('.json')], json.load(f)
+        except (OSError, ValueError):
+            continue
+
+
+def collect():
+    """Merge the snapshots of every worker of this node: (counters, histograms, gauges)"""
+    registry.flush()
+    counters, histograms, gauges = {}, {}, {}
+    root = Config.METRICS_DIR
+    group = registry._group
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        # Scraped before any snapshot was written
+        return counters, histograms, gauges
+    for name in names:
+        # Directories left behind by a previous master process
+        if name != group and not _pid_alive(name):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    for pid, snapshot in _read_snapshots(os.path.join(root, group)):
+        for key, value in snapshot.get('counters', {}).items():
+            counters[key] = counters.get(key, 0) + value
+        for key, value in snapshot.get('histograms', {}).items():
+            if key in histograms:
+                histograms[key] = [a + b for a, b in zip(histograms[key], value)]
+            else:
+                histograms[key] = list(value)
+        if _pid_alive(pid):
+            gauges.update(snapshot.get('gauges', {}))
+    return counters, histograms, gauges
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def render_metrics():
+    """The node's metrics in the Prometheus text exposition format"""
+    counters, histograms, gauges = collect()
+    series = {}
+    for values in (counters, gauges):
+        for key, value in values.items():
+            name, labels = json.loads(key)
+            series.setdefault(name, []).append((labels, value))
+    for key, value in histograms.items():
+        name, labels = json.loads(key)
+        series.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in DEFINITIONS.items():
+        if name not in series:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(series[name], key=lambda item: item[0]):
+            if kind != 'histogram':
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value[-1]}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+def _start_request():
+    g.metrics_start = time.perf_counter()
+
+
+def _finish_request(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    endpoint = request.endpoint or 'none'
+    inc('http_requests_total', endpoint=endpoint, method=request.method, status=str(response.status_code))
+    observe('http_request_duration_seconds', time.perf_counter() - start, endpoint=endpoint)
+    if 'X-Page-Cache' in response.headers:
+        inc('page_cache_requests_total', result=response.headers['X-Page-Cache'].lower())
+    return response
+
+
+def init_metrics(app):
+    """Register the request hooks and a final flush at exit"""
+    if not Config.METRICS_ENABLED:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    atexit.register(registry.flush_at_exit)
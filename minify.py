@@ -0,0 +1,188 @@
+"""
+Conservative CSS and JavaScript minifiers (pure Python, no Node required).
+Both strip comments and redundant whitespace while leaving string, template
+and regex literals untouched. The JS minifier keeps line breaks so automatic
+semicolon insertion behaves exactly as in the source.
+"""
+import re
+
+# Characters that never need whitespace around them in CSS (outside strings)
+_CSS_TIGHT = re.compile(r'\s*([{};,>])\s*')
+_CSS_SPACE = re.compile(r'\s+')
+
+# JS punctuation that can safely touch its neighbours without a space.
+# '+', '-', '/' and '.' are deliberately absent ("a + +b", "a / /re/", "1 .x").
+_JS_TIGHT = set('{}()[];,:=<>?!&|*%^~')
+_JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+    'void', 'throw', 'instanceof', 'yield', 'await',
+}
+
+
+def _is_ident(ch):
+    return ch.isalnum() or ch in '_$' or ord(ch) > 127
+
+
+def _read_quoted(source, i, quote):
+    """Return index just past the closing quote of a string starting at i"""
+    n = len(source)
+    j = i + 1
+    while j < n:
+        ch = source[j]
+        if ch == '\\':
+            j += 2
+            continue
+        if ch == quote or ch == '\n':
+            return j + 1
+        j += 1
+    return n
+
+
+def minify_css(source):
+    """Minify a stylesheet"""
+    parts = []
+    strings = []
+    i = 0
+    n = len(source)
+    buf = []
+    while i < n:
+        ch = source[i]
+        if ch in '"\'':
+            end = _read_quoted(source, i, ch)
+            strings.append(source[i:end])
+            buf.append(f'\x00{len(strings) - 1}\x00')
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            buf.append(' ')
+        else:
+            buf.append(ch)
+            i += 1
+    parts = ''.join(buf)
+
+    parts = _CSS_SPACE.sub(' ', parts)
+    parts = _CSS_TIGHT.sub(r'\1', parts)
+    parts = re.sub(r':\s+', ':', parts)
+    parts = parts.replace(';}', '}').strip()
+    return re.sub('\x00(\\d+)\x00', lambda m: strings[int(m.group(1))], parts)
+
+
+def minify_js(source):
+    """Minify a script: drop comments, indentation, blank lines and redundant spaces"""
+    out = []
+    i = 0
+    n = len(source)
+    # Stack of open template literals; each entry is the brace depth of its ${ }
+    templates = []
+    brace_depth = 0
+
+    def last_char():
+        for chunk in reversed(out):
+            stripped = chunk.rstrip(' \n')
+            if stripped:
+                return stripped[-1]
+        return ''
+
+    def last_word():
+        text = ''.join(out[-8:]).rstrip()
+        match = re.search(r'[A-Za-z_$][\w$]*$', text)
+        return match.group(0) if match else ''
+
+    def read_template(j):
+        """Copy template text from j until the closing backtick or a ${"""
+        while j < n:
+            ch = source[j]
+            if ch == '\\':
+                j += 2
+                continue
+            if ch == '`':
+                return j + 1, False
+            if source.startswith('${', j):
+                return j + 2, True
+            j += 1
+        return n, False
+
+    while i < n:
+        ch = source[i]
+
+        if ch in '"\'':
+            end = _read_quoted(source, i, ch)
+            out.append(source[i:end])
+            i = end
+        elif ch == '`':
+            end, opened = read_template(i + 1)
+            out.append(source[i:end])
+            i = end
+            if opened:
+                templates.append(brace_depth)
+                brace_depth += 1
+        elif ch == '}' and templates and brace_depth - 1 == templates[-1]:
+            # End of a ${ } expression: continue the enclosing template literal
+            brace_depth -= 1
+            templates.pop()
+            end, opened = read_template(i + 1)
+            out.append(source[i:end])
+            i = end
+            if opened:
+                templates.append(brace_depth)
+                brace_depth += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            comment = source[i:end]
+            if comment.startswith('/*!'):
+                out.append(comment)
+            elif '\n' in comment:
+                out.append('\n')
+            else:
+                out.append(' ')
+            i = end
+        elif ch == '/' and (last_char() in _JS_REGEX_PRECEDERS or last_char() == '' or last_word() in _JS_REGEX_KEYWORDS):
+            # Regex literal: copy through the closing slash (ignoring slashes in [...]) and flags
+            j = i + 1
+            in_class = False
+            while j < n and source[j] != '\n':
+                c = source[j]
+                if c == '\\':
+                    j += 2
+                    continue
+                if c == '[':
+                    in_class = True
+                elif c == ']':
+                    in_class = False
+                elif c == '/' and not in_class:
+                    j += 1
+                    break
+                j += 1
+            while j < n and (source[j].isalnum() or source[j] == '$' or source[j] == '_'):
+                j += 1
+            out.append(source[i:j])
+            i = j
+        elif ch in ' \t\r\n':
+            j = i
+            has_newline = False
+            while j < n and source[j] in ' \t\r\n':
+                has_newline = has_newline or source[j] == '\n'
+                j += 1
+            prev = out[-1][-1] if out and out[-1] else ''
+            nxt = source[j] if j < n else ''
+            if has_newline:
+                if out and prev != '\n':
+                    out.append('\n')
+            elif prev and nxt and prev != '\n' and prev not in _JS_TIGHT and nxt not in _JS_TIGHT:
+                out.append(' ')
+            i = j
+        else:
+            if ch == '{':
+                brace_depth += 1
+            elif ch == '}':
+                brace_depth -= 1
+            out.append(ch)
+            i += 1
+
+    return ''.join(out).strip() + '\n'
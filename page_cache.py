@@ -0,0 +1,244 @@
+"""
+Rendered-response cache for public pages.
+Pages are keyed by path, language and date, and each entry remembers the
+content version of the data files it was rendered from. A data_manager write
+changes that version, so only the pages built from the edited collection are
+re-rendered. Pages for a known language are localized (i18n.localize_html)
+before they are stored, so that work is also done once per version.
+Optionally persists rendered pages to disk so a restarted worker does not
+have to render them again.
+The same version yields a strong ETag, so conditional GETs are answered with
+304 before the view runs.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+
+from flask import Response, g, request
+
+from assets import get_asset_manifest
+from config import Config
+from data_manager import get_content_version, saves_skipped
+from i18n import get_page_language, get_prefix_language, localize_html
+from timing import timer
+
+# Data files rendered into every page by the context processor (navbar and videos dropdown)
+BASE_DATA_FILES = (Config.VIDEOS_DROPDOWN_DATA_FILE, Config.NAVBAR_DROPDOWNS_DATA_FILE)
+
+
+class PageCache:
+    """Memory-bounded LRU of rendered pages with optional on-disk persistence"""
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024, persist_dir=''):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.persist_dir = persist_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if self.persist_dir:
+            os.makedirs(self.persist_dir, exist_ok=True)
+
+    def get(self, key, version):
+        """Return (body, mimetype) for key if it was rendered at this version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    return entry[1], entry[2]
+                self._remove(key)
+        if self.persist_dir:
+            cached = self._read_disk(key, version)
+            if cached is not None:
+                self._store(key, version, *cached)
+                return cached
+        return None
+
+    def set(self, key, version, body, mimetype):
+        """Store a rendered body for key at the given content version"""
+        self._store(key, version, body, mimetype)
+        if self.persist_dir:
+            self._write_disk(key, version, body, mimetype)
+
+    def clear(self):
+        """Drop all in-memory entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, version, body, mimetype):
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (version, body, mimetype)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        """Remove an entry (caller holds the lock)"""
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry[1])
+
+    # Disk persistence
+    def _disk_prefix(self, key):
+        raw = '|'.join(str(part) for part in key) + '|' + get_build_id()
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _disk_path(self, key, version):
+        version_hash = hashlib.sha1(version.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.persist_dir, f"{self._disk_prefix(key)}-{version_hash}.page")
+
+    def _read_disk(self, key, version):
+        path = self._disk_path(key, version)
+        try:
+            with open(path, 'rb') as f:
+                mimetype = f.readline().decode('utf-8').strip()
+                return f.read(), mimetype
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Error reading cached page {path}: {e}")
+            return None
+
+    def _write_disk(self, key, version, body, mimetype):
+        prefix = self._disk_prefix(key)
+        path = self._disk_path(key, version)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(mimetype.encode('utf-8') + b'\n')
+                f.write(body)
+            os.replace(tmp_path, path)
+            # Remove renderings of the same page at older content versions
+            for name in os.listdir(self.persist_dir):
+                if name.startswith(prefix + '-') and name != os.path.basename(path) and name.endswith('.page'):
+                    os.remove(os.path.join(self.persist_dir, name))
+        except OSError as e:
+            print(f"Error persisting cached page {path}: {e}")
+
+
+_build_id = None
+
+def get_build_id():
+    """Fingerprint of templates and static files so cached pages and ETags don't outlive a deploy"""
+    global _build_id
+    if _build_id is None:
+        _build_id = _compute_build_id()
+    return _build_id
+
+def _compute_build_id():
+    # Content hashes only, so every node computes the same id (and the same ETags)
+    templates_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+    digest = hashlib.sha1(get_asset_manifest().digest.encode('utf-8'))
+    for dirpath, dirnames, filenames in os.walk(templates_folder):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            digest.update(os.path.relpath(path, templates_folder).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def page_etag(key, version):
+    """Strong ETag for a page rendered at a content version"""
+    raw = '|'.join(str(part) for part in key) + '|' + version + '|' + get_build_id()
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def get_cache_language():
+    """Language component of the cache key: '/hi' for a URL prefix, 'hi' from the cookie, '' if unset"""
+    lang = get_page_language()
+    if lang and get_prefix_language():
+        # Prefixed pages also differ in their links, which keep the prefix
+        return '/' + lang
+    return lang
+
+
+def render_page(view, *args, **kwargs):
+    """Run a public view and localize its HTML when the page language is known"""
+    response = view(*args, **kwargs)
+    if isinstance(response, str):
+        response = Response(response, mimetype='text/html')
+    lang = get_page_language()
+    if (lang and isinstance(response, Response) and response.status_code == 200
+            and response.mimetype == 'text/html' and not response.direct_passthrough):
+        prefix = '/' + lang if get_prefix_language() else ''
+        with timer('localize'):
+            response.set_data(localize_html(response.get_data(as_text=True), lang, link_prefix=prefix))
+    return response
+
+
+def _vary_language(response):
+    """Unprefixed pages depend on the 'lang' cookie"""
+    if isinstance(response, Response) and not get_prefix_language():
+        response.vary.add('Cookie')
+    return response
+
+
+page_cache = PageCache(
+    max_entries=Config.PAGE_CACHE_MAX_ENTRIES,
+    max_bytes=Config.PAGE_CACHE_MAX_BYTES,
+    persist_dir=Config.PAGE_CACHE_DIR,
+)
+
+
+def cached_page(*data_files):
+    """
+    Cache the rendered output of a public view.
+    Args:
+        data_files: Data file paths (Config.*_DATA_FILE) the view renders from.
+                    The navbar and videos dropdown files are always included.
+    """
+    dependencies = BASE_DATA_FILES + tuple(data_files)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            # g.skip_page_cache: render fresh without touching the cache (an admin profiling the page)
+            if not Config.PAGE_CACHE_ENABLED or request.method != 'GET' or g.get('skip_page_cache'):
+                return _vary_language(render_page(view, *args, **kwargs))
+
+            # Date is part of the key: upcoming events and the footer year roll over daily
+            key = (request.path, get_cache_language(), datetime.now().strftime('%Y-%m-%d'))
+            version = get_content_version(*dependencies)
+            etag = page_etag(key, version)
+
+            # Revalidation from a browser or proxy: answer before rendering anything.
+            # Weak comparison, as compressed responses carry W/"<etag>"
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return _vary_language(response)
+
+            cached = page_cache.get(key, version)
+            if cached is not None:
+                body, mimetype = cached
+                response = Response(body, mimetype=mimetype)
+                response.set_etag(etag)
+                response.headers['X-Page-Cache'] = 'HIT'
+                return _vary_language(response)
+
+            response = render_page(view, *args, **kwargs)
+            # A render whose save was skipped (warm-up) is not stored: the next request saves and caches it
+            if isinstance(response, Response) and response.status_code == 200 and not response.direct_passthrough \
+                    and not saves_skipped():
+                # The view may have written data (e.g. migrations), so re-read the version
+                version = get_content_version(*dependencies)
+                page_cache.set(key, version, response.get_data(), response.mimetype)
+                response.set_etag(page_etag(key, version))
+                response.headers['X-Page-Cache'] = 'MISS'
+            return _vary_language(response)
+        return wrapped
+    return decorator
@@ -0,0 +1,165 @@
+"""
+Boot-time warm-up, and content preloading for gunicorn --preload.
+
+warm_up() loads every data collection, the YouTube video index (fetching
+the feed if there is no cached copy) and thumbnail manifest, compiles all
+templates and renders WARMUP_PAGES, which fills the page cache and the
+responsive image attribute cache. Until it has finished, /healthz/ready
+answers 503, so the platform only routes visitors to warm instances.
+
+Pages are rendered under data_manager.read_only(): warm-up never saves, and
+a page whose view would have (a first-run migration) is not cached.
+
+With PRELOAD_APP=true (see gunicorn.conf.py) preload_content() does this
+once in the master before any worker is forked. Workers start warm and
+ready, and share the pages holding these caches copy-on-write; gc.freeze()
+moves the preloaded objects out of the collector's generations so worker
+collections do not touch (and copy) them. Otherwise every worker warms
+itself up in a background thread. Nothing starts when the app is imported:
+the server entry points (gunicorn.conf.py, asgi.py, python app.py) call
+start_serving().
+
+A worker that saves still invalidates its own cache; other workers pick the
+change up when their TTL expires, exactly as without preloading.
+"""
+import gc
+import threading
+import time
+from datetime import datetime
+
+from assets import get_asset_manifest
+from config import Config
+from data_manager import (
+    get_all_blogs, get_all_events, get_all_galleries, get_all_slider_images,
+    get_all_objectives, get_videos_dropdown_data, get_navbar_dropdowns_data, read_only
+)
+from jobs import start_background_jobs
+from i18n import get_translations
+from metrics import registry
+from storage import storage_manager
+from youtube_feed import preload_videos
+
+COLLECTION_LOADERS = (
+    get_all_blogs, get_all_events, get_all_galleries, get_all_slider_images,
+    get_all_objectives, get_videos_dropdown_data, get_navbar_dropdowns_data,
+)
+
+# Warm-up progress of this process, reported by /healthz/ready
+_warm_state = {'ready': False, 'started': None, 'finished': None, 'stats': None}
+_warm_lock = threading.Lock()
+
+
+def warm_up(app, pages=None, fetch_videos=None):
+    """
+    Load content, compile templates and render the warm-up pages, then mark this process ready.
+    A page that fails to render is reported but does not keep the process unready.
+    Args:
+        app: The Flask application
+        pages: Paths to render (default WARMUP_PAGES)
+        fetch_videos: Fetch the feed if there is no cached copy (default YOUTUBE_REFRESH_ENABLED)
+    Returns:
+        Dict with the number of collections, videos, templates and pages warmed, and page errors
+    """
+    start = time.perf_counter()
+    _warm_state['started'] = datetime.now().isoformat(timespec='seconds')
+    for loader in COLLECTION_LOADERS:
+        loader()
+    if fetch_videos is None:
+        fetch_videos = Config.YOUTUBE_REFRESH_ENABLED
+    videos = preload_videos(fetch_missing=fetch_videos)
+    # Built on first use; warm them before the first page (and, preloaded, before the fork)
+    get_asset_manifest()
+    get_translations()
+    templates = 0
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+        templates += 1
+    rendered, errors = render_pages(app, Config.WARMUP_PAGES if pages is None else pages)
+    stats = {'collections': len(COLLECTION_LOADERS), 'videos': videos, 'templates': templates,
+             'pages': rendered, 'errors': errors, 'seconds': round(time.perf_counter() - start, 3)}
+    _warm_state.update(ready=True, finished=datetime.now().isoformat(timespec='seconds'), stats=stats)
+    print(f"✓ Warmed up {stats['collections']} collections, {videos} videos, {templates} templates "
+          f"and {rendered} pages in {stats['seconds'] * 1000:.0f} ms")
+    for error in errors:
+        print(f"⚠ Warm-up: {error}")
+    return stats
+
+
+def render_pages(app, paths):
+    """
+    Request each page once, as a visitor would, so it is rendered and cached.
+    Saves are skipped; pages that tried to save are rendered but not cached.
+    Returns:
+        (number of pages rendered, list of error messages)
+    """
+    client = app.test_client()
+    rendered = 0
+    errors = []
+    for path in paths:
+        try:
+            with read_only() as skipped:
+                response = client.get(path)
+            if response.status_code == 200:
+                rendered += 1
+            else:
+                errors.append(f"{path} returned {response.status_code}")
+            response.close()
+            if skipped:
+                print(f"ℹ Warm-up: {path} not cached, it would save {', '.join(sorted(set(skipped)))}")
+        except Exception as e:
+            errors.append(f"{path} failed: {e}")
+    return rendered, errors
+
+
+def start_warm_up(app):
+    """Warm this worker up in a background thread (it answers /healthz/ready meanwhile)"""
+    with _warm_lock:
+        if _warm_state['started'] is not None:
+            return
+        if not Config.WARMUP_ENABLED:
+            _warm_state['ready'] = True
+            return
+        _warm_state['started'] = datetime.now().isoformat(timespec='seconds')
+
+    def run():
+        try:
+            warm_up(app)
+        except Exception as e:
+            # Serve cold rather than never becoming ready
+            print(f"⚠ Warm-up failed: {e}")
+            _warm_state.update(ready=True, finished=datetime.now().isoformat(timespec='seconds'),
+                               stats={'errors': [str(e)]})
+
+    threading.Thread(target=run, name='warm-up', daemon=True).start()
+
+
+def start_serving(app):
+    """Background threads of a serving process: the job scheduler, then the warm-up (a no-op once preloaded)"""
+    start_background_jobs()
+    start_warm_up(app)
+
+
+def readiness():
+    """Copy of this process's warm-up state: {'ready', 'started', 'finished', 'stats'}"""
+    return dict(_warm_state)
+
+
+def preload_content(app):
+    """
+    Warm everything up in the gunicorn master, then freeze the heap.
+    Args:
+        app: The Flask application
+    Returns:
+        warm_up() stats
+    """
+    # WARMUP_ENABLED=false still preloads content and templates, without rendering or fetching
+    stats = warm_up(app) if Config.WARMUP_ENABLED else warm_up(app, pages=(), fetch_videos=False)
+    gc.collect()
+    gc.freeze()
+    return stats
+
+
+def after_fork():
+    """Per-worker setup in a freshly forked worker: new locks and connections (threads start in start_serving)"""
+    registry.after_fork()
+    storage_manager.after_fork()
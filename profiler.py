@@ -0,0 +1,213 @@
+"""
+On-demand request profiling.
+A logged-in admin adds ?_profile=1 to any URL (or sends an "X-Profile: 1"
+header) and that request is profiled; the result is written to PROFILE_DIR:
+
+    20260101-120000-4242-GET-blog-812ms.prof     cProfile stats (pstats, snakeviz)
+    20260101-120000-4242-GET-blog-812ms.folded   collapsed stacks (flamegraph.pl, speedscope)
+
+?_profile=1 / cprofile uses cProfile (every call, some overhead);
+?_profile=sample uses a stack sampler thread (low overhead, flamegraph-ready).
+Admin-requested profiles bypass the rendered page cache.
+PROFILE_SAMPLE_RATE=N also samples 1 in N requests from any visitor; only
+admin-requested profiles name their file in the X-Profile response header.
+Only the newest PROFILE_MAX_FILES files are kept; admins list and download
+them at /admin/profiles.
+
+With PROFILER_ENABLED off no hooks are registered. When on, a request that
+is not profiled costs one query-string/header lookup (and a counter
+increment with sampling).
+"""
+import cProfile
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request, session
+
+from config import Config
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_EXTENSIONS = ('.prof', '.folded')
+SAMPLER_INTERVAL = 0.005  # seconds between stack samples
+APP_ROOT = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+_request_counter = itertools.count(1)
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval=SAMPLER_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def folded(self):
+        """flamegraph.pl input: one 'root;...;leaf count' line per distinct stack"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def collapse(frame):
+    """A frame's stack as 'outermost;...;innermost', one 'function (file)' entry per frame"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({_short_path(code.co_filename)})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def _short_path(path):
+    if path.startswith(APP_ROOT):
+        return os.path.relpath(path, APP_ROOT)
+    # Library frames: site-packages/flask/app.py -> flask/app.py, stdlib by file name
+    _, marker, rest = path.rpartition('site-packages' + os.sep)
+    return rest if marker else os.path.basename(path)
+
+
+def requested_mode():
+    """'cprofile', 'sample' or None for the current request"""
+    value = request.args.get(PROFILE_PARAM) or request.headers.get(PROFILE_HEADER)
+    if value:
+        if not _is_admin():
+            return None
+        # Profile the real render, not a page cache hit
+        g.skip_page_cache = True
+        g.profile_requested = True
+        return 'sample' if value == 'sample' else 'cprofile'
+    if Config.PROFILE_SAMPLE_RATE > 0 and next(_request_counter) % Config.PROFILE_SAMPLE_RATE == 0:
+        return 'sample'
+    return None
+
+
+def _is_admin():
+    if not session.get('admin_logged_in'):
+        return False
+    from auth import validate_session_security
+    is_valid, _ = validate_session_security()
+    return is_valid
+
+
+def _start_request():
+    mode = requested_mode()
+    if mode == 'cprofile':
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another request in this process is already being profiled (one tool at a time on 3.12+)
+            mode = 'sample'
+        else:
+            g.profile = profile
+    if mode == 'sample':
+        g.profile = StackSampler(threading.get_ident()).start()
+    if mode:
+        g.profile_start = time.perf_counter()
+
+
+def _stop(profile):
+    if isinstance(profile, cProfile.Profile):
+        profile.disable()
+    else:
+        profile.stop()
+
+
+def _finish_request(response):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    _stop(profile)
+    elapsed_ms = (time.perf_counter() - g.profile_start) * 1000
+    try:
+        filename = write_profile(profile, request.method, request.path, elapsed_ms)
+        # Sampled visitor requests are only listed at /admin/profiles
+        if g.get('profile_requested'):
+            response.headers[PROFILE_HEADER] = filename
+    except OSError as e:
+        print(f"⚠ Could not write profile: {e}")
+    return response
+
+
+def _teardown_request(exc):
+    # after_request did not run (unhandled error while building the response)
+    profile = g.pop('profile', None)
+    if profile is not None:
+        _stop(profile)
+
+
+def write_profile(profile, method, path, elapsed_ms):
+    """
+    Save a finished profile to PROFILE_DIR and drop the oldest files over PROFILE_MAX_FILES.
+    Returns:
+        The file name (as listed at /admin/profiles)
+    """
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', path).strip('-')[:60] or 'home'
+    stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{method}-{slug}-{elapsed_ms:.0f}ms"
+    if isinstance(profile, cProfile.Profile):
+        filename = f"{stem}.prof"
+        profile.dump_stats(os.path.join(Config.PROFILE_DIR, filename))
+    else:
+        filename = f"{stem}.folded"
+        with open(os.path.join(Config.PROFILE_DIR, filename), 'w', encoding='utf-8') as f:
+            f.write(profile.folded())
+    _rotate()
+    return filename
+
+
+def _rotate():
+    profiles = list_profiles()
+    for entry in profiles[Config.PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(Config.PROFILE_DIR, entry['name']))
+        except OSError:
+            pass
+
+
+def list_profiles():
+    """Saved profiles, newest first, as dicts with name, size and modified (datetime)"""
+    try:
+        names = [name for name in os.listdir(Config.PROFILE_DIR) if name.endswith(PROFILE_EXTENSIONS)]
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        try:
+            stat = os.stat(os.path.join(Config.PROFILE_DIR, name))
+        except OSError:
+            continue  # removed by another worker's rotation
+        profiles.append({'name': name, 'size': stat.st_size, 'modified': datetime.fromtimestamp(stat.st_mtime)})
+    profiles.sort(key=lambda entry: entry['modified'], reverse=True)
+    return profiles
+
+
+def init_profiler(app):
+    """Register the per-request hooks (nothing is registered with PROFILER_ENABLED off)"""
+    if not Config.PROFILER_ENABLED:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,338 @@
+"""
+In-process background job scheduler.
+Jobs run on interval (every=seconds) or cron-like (cron='m h dom mon dow')
+schedules in a daemon thread of each worker. Leader-only jobs (the default)
+run in one worker per node: the worker holding an exclusive file lock in
+SCHEDULER_DIR; when it exits the lock is released and another worker takes
+over at its next poll. Per-worker jobs (leader_only=False) run in every
+worker, e.g. to keep that worker's in-memory caches warm.
+
+Last run, duration, result and failures of every job are kept in a JSON
+state file next to the lock, so schedules survive restarts and any worker
+can show them at /admin/jobs (and queue a manual run for the leader).
+
+Jobs run at bounded priority: the thread is niced (Linux threads have their
+own nice value) and after each job the scheduler rests long enough that jobs
+use at most SCHEDULER_MAX_DUTY of wall time.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from config import Config
+from metrics import inc, observe
+
+try:
+    import fcntl
+except ImportError:  # Windows: every worker is its own leader
+    fcntl = None
+
+# State of a job that has not run yet
+JOB_STATE_DEFAULTS = {
+    'last_run': None, 'last_duration': None, 'last_status': None, 'last_result': '', 'last_error': '',
+    'failures': 0, 'total_failures': 0, 'runs': 0, 'next_run': None, 'run_requested': False,
+}
+
+CRON_FIELDS = (('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31), ('month', 1, 12), ('weekday', 0, 6))
+
+
+def parse_cron(expression):
+    """
+    Parse a five-field cron expression ('*/15 * * * *', '30 3 * * 1-5').
+    Each field accepts *, numbers, a-b ranges, /step and comma lists; weekday 0 is Sunday.
+    Returns:
+        Tuple of five sets of allowed values (None for an unrestricted '*')
+    """
+    fields = expression.split()
+    if len(fields) != len(CRON_FIELDS):
+        raise ValueError(f"Expected 5 cron fields, got {expression!r}")
+    parsed = []
+    for field, (name, low, high) in zip(fields, CRON_FIELDS):
+        if field == '*':
+            parsed.append(None)
+            continue
+        values = set()
+        for part in field.split(','):
+            spec, _, step = part.partition('/')
+            if spec == '*':
+                start, end = low, high
+            elif '-' in spec:
+                start, end = (int(value) for value in spec.split('-', 1))
+            else:
+                start = int(spec)
+                end = high if step else start
+            if not low <= start <= end <= high:
+                raise ValueError(f"Cron {name} out of range in {expression!r}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        parsed.append(values)
+    return tuple(parsed)
+
+
+def next_cron_time(cron, after):
+    """First minute strictly after `after` (datetime) matching a parse_cron() result"""
+    minutes, hours, days, months, weekdays = cron
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = moment + timedelta(days=366 * 5)
+    while moment < limit:
+        if months is not None and moment.month not in months:
+            moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            continue
+        # As in cron, a restricted day and weekday match if either does
+        day_ok = days is None or moment.day in days
+        weekday_ok = weekdays is None or (moment.weekday() + 1) % 7 in weekdays
+        if not ((day_ok or weekday_ok) if days is not None and weekdays is not None else (day_ok and weekday_ok)):
+            moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            continue
+        if hours is not None and moment.hour not in hours:
+            moment = moment.replace(minute=0) + timedelta(hours=1)
+            continue
+        if minutes is not None and moment.minute not in minutes:
+            moment += timedelta(minutes=1)
+            continue
+        return moment
+    raise ValueError("Cron expression never matches")
+
+
+class Job:
+    """A named function and its schedule"""
+
+    def __init__(self, name, fn, every=None, cron=None, leader_only=True, description=''):
+        if (every is None) == (cron is None):
+            raise ValueError(f"Job {name} needs exactly one of every= or cron=")
+        self.name = name
+        self.fn = fn
+        self.every = every
+        self.cron = cron
+        self._cron = parse_cron(cron) if cron else None
+        self.leader_only = leader_only
+        self.description = description
+
+    @property
+    def schedule(self):
+        if self.cron:
+            return f"cron {self.cron}"
+        return f"every {_format_seconds(self.every)}"
+
+    def next_run(self, after):
+        """Next run time (epoch seconds) after a run that ended at `after`"""
+        if self._cron is not None:
+            return next_cron_time(self._cron, datetime.fromtimestamp(after)).timestamp()
+        return after + self.every
+
+    def retry_at(self, now, failures):
+        """Earlier retry after consecutive failures: 1, 2, 4 ... minutes, never later than the schedule"""
+        return min(self.next_run(now), now + min(3600, 60 * 2 ** (failures - 1)))
+
+
+def _format_seconds(seconds):
+    for unit, size in (('d', 86400), ('h', 3600), ('min', 60)):
+        if seconds >= size and seconds % size == 0:
+            return f"{seconds // size:g} {unit}"
+    return f"{seconds:g} s"
+
+
+class Scheduler:
+    """Runs registered jobs from a daemon thread (one per worker process)"""
+
+    def __init__(self, state_dir=None):
+        self.state_dir = state_dir if state_dir is not None else Config.SCHEDULER_DIR
+        self.jobs = {}
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._leader_file = None
+        self._next_local = {}  # per-worker jobs: name -> next run (this process only)
+
+    @property
+    def state_path(self):
+        return os.path.join(self.state_dir, 'state.json')
+
+    def add(self, name, fn, every=None, cron=None, leader_only=True, description=''):
+        """Register a job (see Job); returns it"""
+        job = self.jobs[name] = Job(name, fn, every=every, cron=cron, leader_only=leader_only,
+                                    description=description)
+        return job
+
+    def start(self):
+        """Start this process's scheduler thread (again in a forked worker)"""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                # A lock inherited over fork would make every worker the leader
+                self._leader_file = None
+                self._next_local = {}
+                self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='job-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def is_leader(self):
+        return self._leader_file is not None and self._pid == os.getpid()
+
+    def request_run(self, name):
+        """Queue a run of a job for the scheduler that owns it (picked up at its next poll)"""
+        if name not in self.jobs:
+            raise KeyError(name)
+        with self._state() as state:
+            state['jobs'].setdefault(name, {})['run_requested'] = True
+
+    def status(self):
+        """Jobs with their state for the admin page, in registration order"""
+        state = self._read_state()
+        jobs = []
+        for job in self.jobs.values():
+            entry = {**JOB_STATE_DEFAULTS, **state['jobs'].get(job.name, {})}
+            entry.update(name=job.name, schedule=job.schedule, description=job.description,
+                         leader_only=job.leader_only)
+            for key in ('last_run', 'next_run'):
+                if entry.get(key):
+                    entry[key] = datetime.fromtimestamp(entry[key])
+            jobs.append(entry)
+        return {'jobs': jobs, 'leader': state.get('leader')}
+
+    def run_job(self, job):
+        """Run one job now in this thread and record the outcome; returns True on success"""
+        start = time.time()
+        try:
+            result = job.fn()
+            error = ''
+        except Exception as e:
+            result = None
+            error = f"{type(e).__name__}: {e}"
+        duration = time.time() - start
+        status = 'failed' if error else 'ok'
+        inc('scheduler_job_runs_total', job=job.name, status=status)
+        observe('scheduler_job_duration_seconds', duration, job=job.name)
+        if error:
+            print(f"⚠ Job {job.name} failed after {duration:.1f}s: {error}")
+        elif result:
+            print(f"✓ Job {job.name}: {result}")
+
+        with self._state() as state:
+            entry = state['jobs'].setdefault(job.name, {})
+            entry['runs'] = entry.get('runs', 0) + 1
+            entry['failures'] = entry.get('failures', 0) + 1 if error else 0
+            entry['total_failures'] = entry.get('total_failures', 0) + (1 if error else 0)
+            entry.update(last_run=start, last_duration=duration, last_status=status,
+                         last_result=str(result) if result else '', last_error=error, run_requested=False,
+                         pid=os.getpid())
+            end = time.time()
+            next_run = job.retry_at(end, entry['failures']) if error else job.next_run(end)
+            if job.leader_only:
+                entry['next_run'] = next_run
+            else:
+                self._next_local[job.name] = next_run
+        return not error
+
+    def _run(self):
+        _lower_thread_priority()
+        while not self._stop.is_set():
+            try:
+                self._try_lead()
+                for job in self._due_jobs():
+                    if self._stop.is_set():
+                        return
+                    started = time.time()
+                    self.run_job(job)
+                    self._rest(time.time() - started)
+            except Exception as e:
+                print(f"⚠ Scheduler error: {e}")
+            self._stop.wait(self._seconds_until_next())
+
+    def _rest(self, busy):
+        """Keep jobs within SCHEDULER_MAX_DUTY of wall time"""
+        duty = Config.SCHEDULER_MAX_DUTY
+        if 0 < duty < 1:
+            self._stop.wait(busy * (1 - duty) / duty)
+
+    def _due_jobs(self):
+        now = time.time()
+        state = self._read_state()
+        due = []
+        for job in self.jobs.values():
+            entry = state['jobs'].get(job.name, {})
+            if job.leader_only:
+                if not self.is_leader:
+                    continue
+                if 'next_run' not in entry:
+                    # Never run here before: interval jobs start now, cron jobs at their next slot
+                    entry['next_run'] = now if job.every else job.next_run(now)
+                    with self._state() as fresh:
+                        fresh['jobs'].setdefault(job.name, {}).setdefault('next_run', entry['next_run'])
+                next_run = entry['next_run']
+            else:
+                next_run = self._next_local.setdefault(job.name, now if job.every else job.next_run(now))
+            if next_run <= now or entry.get('run_requested'):
+                due.append(job)
+        return due
+
+    def _seconds_until_next(self):
+        now = time.time()
+        state = self._read_state()
+        upcoming = [entry['next_run'] for name, entry in state['jobs'].items()
+                    if self.is_leader and 'next_run' in entry and name in self.jobs]
+        upcoming.extend(self._next_local.values())
+        delay = min(upcoming, default=now + Config.SCHEDULER_POLL) - now
+        # Poll at least every SCHEDULER_POLL for leadership changes and manual runs
+        return min(max(delay, 1), Config.SCHEDULER_POLL)
+
+    def _try_lead(self):
+        if self.is_leader:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        lock_file = open(os.path.join(self.state_dir, 'leader.lock'), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return
+        self._leader_file = lock_file
+        with self._state() as state:
+            state['leader'] = {'pid': os.getpid(), 'since': datetime.now().isoformat(timespec='seconds')}
+        print(f"ℹ Worker {os.getpid()} runs the scheduled jobs")
+
+    def _read_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            state = {}
+        state.setdefault('jobs', {})
+        return state
+
+    @contextmanager
+    def _state(self):
+        """Read-modify-write the state file under a file lock (any worker may write it)"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(self.state_path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            state = self._read_state()
+            yield state
+            tmp_path = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.state_path)
+
+
+def _lower_thread_priority():
+    """Nice the current thread so request threads get the CPU first (Linux only: elsewhere it would nice the process)"""
+    if Config.SCHEDULER_NICE and sys.platform.startswith('linux'):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), Config.SCHEDULER_NICE)
+        except OSError:
+            pass
+
+
+scheduler = Scheduler()
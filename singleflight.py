@@ -0,0 +1,154 @@
+"""
+Single-flight request coalescing.
+When a cached value expires, only one caller recomputes a given key; the
+others wait for that result (or keep using the stale value they already have).
+
+Within a process this is a dict of in-flight calls guarded by a lock. Across
+gunicorn workers on the same node, do_shared() additionally holds a per-key
+file lock while computing and leaves the result in a small JSON file, so a
+worker that queued behind the lock reuses the result instead of fetching again.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays per-process
+    fcntl = None
+
+MISSING = object()
+
+
+class _Call:
+    """One in-flight computation that other threads can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent computations of the same key"""
+
+    def __init__(self, name, lock_dir=None):
+        self.name = name
+        self.lock_dir = lock_dir if lock_dir is not None else Config.SINGLEFLIGHT_LOCK_DIR
+        self._lock = threading.Lock()
+        self._calls = {}
+        # Counters for benchmarks: computations run vs. callers that shared one
+        self.computed = 0
+        self.shared = 0
+
+    def do(self, key, fn, stale=MISSING):
+        """
+        Return fn() for key, running it at most once at a time in this process.
+        Args:
+            key: Identifies the computation (e.g. a file name)
+            fn: Callable producing the value
+            stale: A previous value to return immediately if another thread is
+                   already recomputing the key (instead of waiting for it)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.computed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            if stale is not MISSING:
+                return stale
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def do_shared(self, key, fn, share_for=None, stale=MISSING):
+        """
+        Like do(), but also coalesced across worker processes on this node.
+        fn() must return a JSON-serialisable value; it is shared with workers
+        that were waiting on the lock for up to share_for seconds.
+        """
+        if share_for is None:
+            share_for = Config.SINGLEFLIGHT_SHARE_SECONDS
+        return self.do(key, lambda: self._across_workers(key, fn, share_for), stale=stale)
+
+    def forget(self, key):
+        """Drop a shared result (call after writing the underlying data)"""
+        try:
+            os.remove(self._path(key, '.json'))
+        except OSError:
+            pass
+
+    def _path(self, key, suffix):
+        digest = hashlib.sha1(f"{self.name}:{key}".encode('utf-8')).hexdigest()[:20]
+        return os.path.join(self.lock_dir, f"{self.name}-{digest}{suffix}")
+
+    def _across_workers(self, key, fn, share_for):
+        with self._file_lock(key):
+            result = self._read_shared(key, share_for)
+            if result is not MISSING:
+                with self._lock:
+                    self.computed -= 1
+                    self.shared += 1
+                return result
+            result = fn()
+            self._write_shared(key, result)
+            return result
+
+    @contextmanager
+    def _file_lock(self, key):
+        if fcntl is None or not self.lock_dir:
+            yield
+            return
+        os.makedirs(self.lock_dir, exist_ok=True)
+        with open(self._path(key, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_shared(self, key, share_for):
+        if fcntl is None or not self.lock_dir or share_for <= 0:
+            return MISSING
+        try:
+            with open(self._path(key, '.json'), 'r', encoding='utf-8') as f:
+                shared = json.load(f)
+        except (OSError, ValueError):
+            return MISSING
+        if time.time() - shared.get('time', 0) > share_for:
+            return MISSING
+        return shared.get('result')
+
+    def _write_shared(self, key, result):
+        if fcntl is None or not self.lock_dir:
+            return
+        path = self._path(key, '.json')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'time': time.time(), 'result': result}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠ Could not share {self.name} result for {key}: {e}")
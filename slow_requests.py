@@ -0,0 +1,117 @@
+"""
+Slow-request watchdog.
+Each worker process runs a daemon thread that looks at the requests in
+flight; one running longer than SLOW_REQUEST_THRESHOLD seconds has its
+thread's Python stack logged, and again every SLOW_REQUEST_INTERVAL seconds
+while it is still running (up to SLOW_REQUEST_MAX_DUMPS times):
+
+    ⚠ Slow request GET /videos (videos) running 5.0s in worker 4242, dump 1:
+      File ".../youtube_feed.py", line 140, in fetch_feed
+        response = requests.get(url, headers=headers, timeout=Config.YOUTUBE_FETCH_TIMEOUT)
+      ...
+
+and one line when it finishes. Repeated dumps of the same request show
+where it is stuck (a YouTube fetch, a Cloudinary upload, a lock). Slow
+requests are also counted in the slow_requests_total metric.
+The per-request cost is a dict insert/remove under a lock; with
+SLOW_REQUEST_THRESHOLD=0 no hooks are registered.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+
+from flask import g, request
+
+from config import Config
+from metrics import inc
+
+STACK_LIMIT = 40  # innermost frames per dump
+
+
+class Watchdog:
+    """Requests in flight in this process, checked by a background thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}  # thread id -> request state
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Started lazily in each worker: threads do not survive a fork
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._active = {}
+            threading.Thread(target=self._run, name='slow-request-watchdog', daemon=True).start()
+
+    def begin(self):
+        state = {
+            'start': time.monotonic(),
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint or 'none',
+            'dumps': 0,
+            'next_dump': Config.SLOW_REQUEST_THRESHOLD,
+        }
+        with self._lock:
+            self._ensure_thread()
+            self._active[threading.get_ident()] = state
+        return state
+
+    def end(self, state):
+        with self._lock:
+            if self._active.get(threading.get_ident()) is state:
+                del self._active[threading.get_ident()]
+        if state['dumps']:
+            elapsed = time.monotonic() - state['start']
+            print(f"⚠ Slow request {state['method']} {state['path']} finished after {elapsed:.1f}s "
+                  f"in worker {os.getpid()}")
+
+    def _run(self):
+        pid = os.getpid()
+        poll = min(1.0, Config.SLOW_REQUEST_THRESHOLD / 4, Config.SLOW_REQUEST_INTERVAL / 4)
+        while self._pid == pid:
+            time.sleep(poll)
+            now = time.monotonic()
+            with self._lock:
+                due = [(thread_id, state) for thread_id, state in self._active.items()
+                       if now - state['start'] >= state['next_dump']
+                       and state['dumps'] < Config.SLOW_REQUEST_MAX_DUMPS]
+                for _, state in due:
+                    state['dumps'] += 1
+                    state['next_dump'] += Config.SLOW_REQUEST_INTERVAL
+            if not due:
+                continue
+            frames = sys._current_frames()
+            for thread_id, state in due:
+                self._dump(state, frames.get(thread_id), now)
+
+    def _dump(self, state, frame, now):
+        if state['dumps'] == 1:
+            inc('slow_requests_total', endpoint=state['endpoint'])
+        stack = ''.join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame else '  (thread has exited)\n'
+        # One print per dump so lines from several workers do not interleave
+        print(f"⚠ Slow request {state['method']} {state['path']} ({state['endpoint']}) running "
+              f"{now - state['start']:.1f}s in worker {os.getpid()}, dump {state['dumps']}:\n{stack}", end='')
+
+
+watchdog = Watchdog()
+
+
+def _start_request():
+    g.watchdog_state = watchdog.begin()
+
+
+def _teardown_request(exc):
+    state = g.pop('watchdog_state', None)
+    if state is not None:
+        watchdog.end(state)
+
+
+def init_slow_requests(app):
+    """Register the request hooks (nothing is registered with SLOW_REQUEST_THRESHOLD=0)"""
+    if Config.SLOW_REQUEST_THRESHOLD <= 0:
+        return
+    app.before_request(_start_request)
+    app.teardown_request(_teardown_request)
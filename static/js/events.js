@@ -460,9 +460,10 @@ function renderEvents() {
     console.log('- First event:', upcomingEvents[0]);
 
     if (upcomingEvents.length === 0) {
+        const noUpcoming = lang === 'en' ? 'No upcoming events scheduled.' : 'कोई आगामी कार्यक्रम निर्धारित नहीं है।';
         grid.innerHTML = `
             <div class="no-events">
-                <p data-lang-events="noUpcomingEvents">No upcoming events scheduled.</p>
+                <p data-lang-events="noUpcomingEvents">${noUpcoming}</p>
             </div>
         `;
         return false;
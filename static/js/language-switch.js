@@ -0,0 +1,40 @@
+// Language toggle for pages rendered server-side in a single language.
+// The page already contains only the chosen language, so switching stores the
+// new choice and loads the page again in that language.
+(function () {
+    const currentLang = document.documentElement.lang === 'hi' ? 'hi' : 'en';
+
+    // Used by events.js and photos.js to pick event and photo text
+    window.getCurrentLanguage = function () {
+        return currentLang;
+    };
+
+    function switchLanguage(lang) {
+        localStorage.setItem('selectedLanguage', lang);
+        localStorage.setItem('languageSelected', 'true');
+        document.cookie = 'lang=' + lang + '; path=/; max-age=31536000; SameSite=Lax';
+
+        // /hi/... and /en/... URLs switch to the other prefix; other pages follow the cookie
+        const path = window.location.pathname;
+        if (/^\/(hi|en)(\/|$)/.test(path)) {
+            window.location.href = '/' + lang + path.slice(3) + window.location.search + window.location.hash;
+        } else {
+            window.location.reload();
+        }
+    }
+
+    function init() {
+        const langBtn = document.getElementById('languageBtn');
+        if (langBtn) {
+            langBtn.addEventListener('click', function () {
+                switchLanguage(currentLang === 'en' ? 'hi' : 'en');
+            });
+        }
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', init);
+    } else {
+        init();
+    }
+})();
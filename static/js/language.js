@@ -389,9 +389,15 @@ function getCurrentLanguage() {
     return localStorage.getItem('selectedLanguage') || 'en';
 }
 
+// Remember the language in a cookie so the server renders later pages in it
+function setLanguageCookie(lang) {
+    document.cookie = 'lang=' + lang + '; path=/; max-age=31536000; SameSite=Lax';
+}
+
 // Set language in localStorage
 function setLanguage(lang) {
     localStorage.setItem('selectedLanguage', lang);
+    setLanguageCookie(lang);
     applyLanguage(lang);
 }
 
@@ -765,6 +771,9 @@ function initLanguageSystem() {
 
     // Check if language was already selected
     const languageSelected = localStorage.getItem('languageSelected');
+    if (languageSelected && !/(^|;\s*)lang=/.test(document.cookie)) {
+        setLanguageCookie(currentLang);
+    }
 
     // Apply language with a small delay to ensure DOM is ready
     setTimeout(() => {
@@ -219,7 +219,7 @@ class PhotoGallery {
             const noPhotos = document.createElement('p');
             noPhotos.className = 'no-photos-message';
             noPhotos.setAttribute('data-lang-photos', 'noPhotos');
-            noPhotos.textContent = 'जल्द ही तस्वीरें जोड़ी जाएंगी।';
+            noPhotos.textContent = lang === 'en' ? 'Photos coming soon.' : 'जल्द ही तस्वीरें जोड़ी जाएंगी।';
             photosGrid.appendChild(noPhotos);
         } else {
             console.log('Loading photos:', this.currentPhotos.length, 'photos');
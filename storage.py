@@ -2,16 +2,24 @@
 Cloudinary integration for file uploads and JSON data storage
 Falls back to local filesystem if Cloudinary is not configured
 """
+import importlib.util
 import os
+import sys
+import threading
 import uuid
 import json
 from werkzeug.utils import secure_filename
 from config import Config
+from singleflight import SingleFlight
+from timing import timed
+from metrics import observe, track_call
 
 class StorageManager:
     """Manages file storage - uses Cloudinary if configured, otherwise local filesystem"""
     
     def __init__(self):
+        # One Cloudinary download per JSON file at a time on this node, shared by all workers
+        self._json_flight = SingleFlight('cloudinary-json')
         self.use_cloudinary = (
             Config.USE_CLOUDINARY and 
             Config.CLOUDINARY_CLOUD_NAME and 
@@ -19,27 +27,63 @@ class StorageManager:
             Config.CLOUDINARY_API_SECRET
         )
         
+        self._cloudinary_uploader = None
+        self._cloudinary_lock = threading.Lock()
+        self._http = None
+        
         if self.use_cloudinary:
-            try:
-                import cloudinary
-                import cloudinary.uploader
-                
-                cloudinary.config(
-                    cloud_name=Config.CLOUDINARY_CLOUD_NAME,
-                    api_key=Config.CLOUDINARY_API_KEY,
-                    api_secret=Config.CLOUDINARY_API_SECRET
-                )
-                self.cloudinary_uploader = cloudinary.uploader
-                print("✓ Cloudinary initialized successfully")
-            except ImportError:
+            # The SDK takes ~100 ms to import: check it is installed now, import it on first use
+            if importlib.util.find_spec('cloudinary') is None:
                 print("⚠ Cloudinary package not installed, falling back to local storage")
                 self.use_cloudinary = False
-            except Exception as e:
-                print(f"⚠ Error initializing Cloudinary: {e}")
-                self.use_cloudinary = False
+            else:
+                print("✓ Cloudinary configured (client loaded on first use)")
         else:
             print("ℹ Using local filesystem storage")
     
+    @property
+    def cloudinary_uploader(self):
+        """cloudinary.uploader, imported and configured on first use"""
+        if self._cloudinary_uploader is None:
+            with self._cloudinary_lock:
+                if self._cloudinary_uploader is None:
+                    import cloudinary
+                    import cloudinary.uploader
+                    
+                    cloudinary.config(
+                        cloud_name=Config.CLOUDINARY_CLOUD_NAME,
+                        api_key=Config.CLOUDINARY_API_KEY,
+                        api_secret=Config.CLOUDINARY_API_SECRET
+                    )
+                    self._cloudinary_uploader = cloudinary.uploader
+                    print("✓ Cloudinary initialized successfully")
+        return self._cloudinary_uploader
+    
+    @property
+    def http(self):
+        """Thread-safe pooled HTTP client (urllib3) for downloading stored files, created on first use"""
+        if self._http is None:
+            with self._cloudinary_lock:
+                if self._http is None:
+                    import urllib3
+                    self._http = urllib3.PoolManager(
+                        maxsize=Config.STORAGE_HTTP_POOL_SIZE,
+                        timeout=urllib3.Timeout(connect=5, read=30),
+                    )
+        return self._http
+    
+    def after_fork(self):
+        """Drop Cloudinary connections inherited from the parent: a socket must not be shared by workers"""
+        self._cloudinary_lock = threading.Lock()
+        self._http = None
+        if self._cloudinary_uploader is None:
+            return
+        for module_name in ('cloudinary.uploader', 'cloudinary.api_client.call_api'):
+            pool = getattr(sys.modules.get(module_name), '_http', None)
+            if pool is not None:
+                pool.clear()
+    
+    @timed('storage')
     def save_file(self, file, folder='uploads'):
         """
         Save uploaded file to Cloudinary or local filesystem
@@ -52,19 +96,24 @@ class StorageManager:
         if not file or not file.filename:
             return None
         
+        file.seek(0, os.SEEK_END)
+        observe('upload_size_bytes', file.tell(), storage='cloudinary' if self.use_cloudinary else 'local')
+        file.seek(0)
+        
         if self.use_cloudinary:
             try:
                 # Reset file pointer to beginning
                 file.seek(0)
                 
                 # Upload to Cloudinary
-                result = self.cloudinary_uploader.upload(
-                    file,
-                    folder=folder,
-                    resource_type="auto",  # auto-detect image/video/raw
-                    use_filename=True,
-                    unique_filename=True
-                )
+                with track_call('cloudinary', 'upload'):
+                    result = self.cloudinary_uploader.upload(
+                        file,
+                        folder=folder,
+                        resource_type="auto",  # auto-detect image/video/raw
+                        use_filename=True,
+                        unique_filename=True
+                    )
                 
                 # Return secure HTTPS URL
                 return result.get('secure_url') or result.get('url')
@@ -89,6 +138,7 @@ class StorageManager:
             print(f"Error saving file locally: {e}")
             return None
     
+    @timed('storage')
     def delete_file(self, file_url):
         """
         Delete file from Cloudinary or local filesystem
@@ -115,7 +165,8 @@ class StorageManager:
                     public_id = path_part.split('.')[0].split('?')[0]
                     
                     # Delete from Cloudinary
-                    result = self.cloudinary_uploader.destroy(public_id)
+                    with track_call('cloudinary', 'destroy'):
+                        result = self.cloudinary_uploader.destroy(public_id)
                     if result.get('result') == 'ok':
                         print(f"✓ Deleted from Cloudinary: {public_id}")
                     else:
@@ -138,6 +189,7 @@ class StorageManager:
             except Exception as e:
                 print(f"Error deleting local file: {e}")
     
+    @timed('storage')
     def save_json_data(self, filename, data, folder='data'):
         """
         Save JSON data to Cloudinary or local filesystem
@@ -158,80 +210,75 @@ class StorageManager:
                     json_file = io.BytesIO(json_string.encode('utf-8'))
                     
                     # Upload to Cloudinary as raw file
-                    result = self.cloudinary_uploader.upload(
-                        json_file,
-                        folder=folder,
-                        resource_type="raw",
-                        public_id=filename.replace('.json', ''),  # Remove .json extension
-                        overwrite=True
-                    )
+                    with track_call('cloudinary', 'save_json'):
+                        result = self.cloudinary_uploader.upload(
+                            json_file,
+                            folder=folder,
+                            resource_type="raw",
+                            public_id=filename.replace('.json', ''),  # Remove .json extension
+                            overwrite=True
+                        )
                     print(f"✓ Saved JSON to Cloudinary: {folder}/{filename}")
+                    self._json_flight.forget(f"{folder}/{filename}")
                     return True
                 except Exception as e:
                     print(f"Error saving JSON to Cloudinary: {e}")
                     # Fallback to local
-                    return self._save_json_local(filename, data)
+                    return self._save_json_local(filename, json_string)
             else:
-                return self._save_json_local(filename, data)
+                return self._save_json_local(filename, json_string)
         except Exception as e:
             print(f"Error saving JSON data: {e}")
             return False
     
-    def _save_json_local(self, filename, data):
-        """Save JSON to local filesystem"""
+    def _local_path(self, filename):
+        """Local path of a JSON data file (the configured path for known files)"""
+        data_files = (
+            Config.SLIDER_DATA_FILE, Config.BLOGS_DATA_FILE, Config.EVENTS_DATA_FILE,
+            Config.PHOTOS_DATA_FILE, Config.NAVBAR_DROPDOWNS_DATA_FILE, Config.VIDEOS_DROPDOWN_DATA_FILE,
+            Config.ADMIN_SESSION_DATA_FILE, Config.OBJECTIVES_DATA_FILE,
+        )
+        for file_path in data_files:
+            if os.path.basename(file_path) == filename:
+                return file_path
+        # Other files (e.g. youtube_cache.json) live next to the configured data files
+        return os.path.join(os.path.dirname(Config.BLOGS_DATA_FILE), filename)
+    
+    def _save_json_local(self, filename, json_string):
+        """Save encoded JSON to local filesystem (atomically: readers never see a half-written file)"""
         try:
-            # Determine file path based on filename
-            if 'slider' in filename.lower():
-                file_path = Config.SLIDER_DATA_FILE
-            elif 'blog' in filename.lower():
-                file_path = Config.BLOGS_DATA_FILE
-            elif 'event' in filename.lower():
-                file_path = Config.EVENTS_DATA_FILE
-            elif 'photo' in filename.lower():
-                file_path = Config.PHOTOS_DATA_FILE
-            elif 'navbar' in filename.lower():
-                file_path = Config.NAVBAR_DROPDOWNS_DATA_FILE
-            elif 'videos_dropdown' in filename.lower():
-                file_path = Config.VIDEOS_DROPDOWN_DATA_FILE
-            elif 'admin_session' in filename.lower():
-                file_path = Config.ADMIN_SESSION_DATA_FILE
-            else:
-                # Default to data directory
-                file_path = os.path.join(os.path.dirname(__file__), 'data', filename)
+            file_path = self._local_path(filename)
             
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json_string)
+            os.replace(tmp_path, file_path)
             return True
         except Exception as e:
             print(f"Error saving JSON locally: {e}")
             return False
     
-    def load_json_data(self, filename, default=[], folder='data'):
+    @timed('storage')
+    def load_json_data(self, filename, default=[], folder='data', coalesce=True):
         """
         Load JSON data from Cloudinary or local filesystem
         Args:
             filename: Name of the JSON file (e.g., 'slider_data.json')
             default: Default value if file doesn't exist
             folder: Folder name in Cloudinary (default: 'data')
+            coalesce: Share a concurrent download of the same file (writers pass False
+                      so they never get data from before the last save)
         Returns:
             Loaded data or default value
         """
         if self.use_cloudinary:
             try:
-                import cloudinary.api
-                # Get public_id (filename without extension)
-                public_id = f"{folder}/{filename.replace('.json', '')}"
-                
-                # Try to get the file from Cloudinary
-                result = cloudinary.api.resource(public_id, resource_type="raw")
-                if result and 'secure_url' in result:
-                    import urllib.request
-                    # Download and parse JSON
-                    with urllib.request.urlopen(result['secure_url']) as response:
-                        data = json.loads(response.read().decode('utf-8'))
-                    print(f"✓ Loaded JSON from Cloudinary: {folder}/{filename}")
-                    return data
+                if not coalesce:
+                    return self._load_json_cloudinary(filename, folder)
+                # Concurrent misses (threads and workers) share a single download
+                return self._json_flight.do_shared(
+                    f"{folder}/{filename}", lambda: self._load_json_cloudinary(filename, folder))
             except Exception as e:
                 # File doesn't exist in Cloudinary or other error, try local fallback
                 error_msg = str(e).lower()
@@ -243,27 +290,51 @@ class StorageManager:
         else:
             return self._load_json_local(filename, default)
     
+    def _load_json_cloudinary(self, filename, folder):
+        """Download a JSON file from Cloudinary (raises if it is missing)"""
+        self.cloudinary_uploader  # configures the SDK on first use
+        import cloudinary.api
+        # Get public_id (filename without extension)
+        public_id = f"{folder}/{filename.replace('.json', '')}"
+        
+        with track_call('cloudinary', 'load_json'):
+            # Try to get the file from Cloudinary
+            result = cloudinary.api.resource(public_id, resource_type="raw")
+            if result and 'secure_url' in result:
+                # Download and parse JSON
+                response = self.http.request('GET', result['secure_url'])
+                if response.status != 200:
+                    raise IOError(f"HTTP {response.status} downloading {result['secure_url']}")
+                data = json.loads(response.data.decode('utf-8'))
+                print(f"✓ Loaded JSON from Cloudinary: {folder}/{filename}")
+                return data
+        return None
+    
+    def mirror_json_data(self, filename, folder='data'):
+        """
+        Copy a JSON file from Cloudinary to its local path, the copy loads fall back to
+        Args:
+            filename: Name of the JSON file (e.g., 'slider_data.json')
+            folder: Folder name in Cloudinary (default: 'data')
+        Returns:
+            True if the local copy was changed
+        """
+        data = self._load_json_cloudinary(filename, folder)
+        if data is None:
+            return False
+        json_string = json.dumps(data, ensure_ascii=False, indent=2)
+        try:
+            with open(self._local_path(filename), 'r', encoding='utf-8') as f:
+                if f.read() == json_string:
+                    return False
+        except OSError:
+            pass
+        return self._save_json_local(filename, json_string)
+    
     def _load_json_local(self, filename, default):
         """Load JSON from local filesystem"""
         try:
-            # Determine file path based on filename
-            if 'slider' in filename.lower():
-                file_path = Config.SLIDER_DATA_FILE
-            elif 'blog' in filename.lower():
-                file_path = Config.BLOGS_DATA_FILE
-            elif 'event' in filename.lower():
-                file_path = Config.EVENTS_DATA_FILE
-            elif 'photo' in filename.lower():
-                file_path = Config.PHOTOS_DATA_FILE
-            elif 'navbar' in filename.lower():
-                file_path = Config.NAVBAR_DROPDOWNS_DATA_FILE
-            elif 'videos_dropdown' in filename.lower():
-                file_path = Config.VIDEOS_DROPDOWN_DATA_FILE
-            elif 'admin_session' in filename.lower():
-                file_path = Config.ADMIN_SESSION_DATA_FILE
-            else:
-                # Default to data directory
-                file_path = os.path.join(os.path.dirname(__file__), 'data', filename)
+            file_path = self._local_path(filename)
             
             if os.path.exists(file_path):
                 with open(file_path, 'r', encoding='utf-8') as f:
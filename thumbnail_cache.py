@@ -0,0 +1,214 @@
+"""
+Local cache of YouTube thumbnails for the videos page.
+After each feed refresh the thumbnail of every listed video is downloaded once
+(on the refresher thread, never on a request) and stored under
+THUMBNAIL_CACHE_DIR/<videoId>/. With Pillow installed it is cropped to the
+16:9 card shape and saved as right-sized WebP variants; without it the
+original JPEG is kept. File names carry a content hash, so they are served
+from our origin with immutable caching. Videos that drop out of the feed have
+their directory removed.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+
+from config import Config
+from metrics import track_call
+
+try:
+    from PIL import Image
+except ImportError:  # thumbnails are served as downloaded, without WebP variants
+    Image = None
+
+MANIFEST_FILE = 'manifest.json'
+URL_PREFIX = '/thumbnails/youtube'
+VIDEO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+MAX_THUMBNAIL_BYTES = 2 * 1024 * 1024
+CARD_ASPECT = 16 / 9
+
+# (manifest mtime, manifest) as last read by this process
+_manifest_cache = (None, {})
+
+
+def youtube_thumbnail_url(video_id):
+    """YouTube's own thumbnail URL (fallback while a video is not cached locally)"""
+    return f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+
+
+def _manifest_path():
+    return os.path.join(Config.THUMBNAIL_CACHE_DIR, MANIFEST_FILE)
+
+
+def load_manifest():
+    """{videoId: {'source', 'src', 'srcset'}} for the cached thumbnails, re-read when the file changes"""
+    global _manifest_cache
+    try:
+        mtime = os.stat(_manifest_path()).st_mtime_ns
+    except OSError:
+        return {}
+    cached_mtime, manifest = _manifest_cache
+    if cached_mtime != mtime:
+        try:
+            with open(_manifest_path(), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        _manifest_cache = (mtime, manifest)
+    return manifest
+
+
+def _save_manifest(manifest):
+    path = _manifest_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _write_file(video_id, filename, data):
+    directory = os.path.join(Config.THUMBNAIL_CACHE_DIR, video_id)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _crop_to_card(image):
+    """Crop the letterbox bars YouTube adds to 4:3 thumbnails of 16:9 videos"""
+    width, height = image.size
+    card_height = round(width / CARD_ASPECT)
+    if card_height >= height:
+        return image
+    top = (height - card_height) // 2
+    return image.crop((0, top, width, top + card_height))
+
+
+def make_variants(video_id, data):
+    """
+    Store a downloaded thumbnail and return its manifest entry.
+    Args:
+        video_id: YouTube videoId (the directory name)
+        data: Downloaded image bytes
+    Returns:
+        {'src': filename, 'srcset': [[filename, width], ...]}
+    """
+    digest = hashlib.sha1(data).hexdigest()[:10]
+    if Image is None:
+        filename = f"{digest}.jpg"
+        _write_file(video_id, filename, data)
+        return {'src': filename, 'srcset': []}
+
+    with Image.open(io.BytesIO(data)) as original:
+        image = _crop_to_card(original.convert('RGB'))
+    widths = [width for width in Config.THUMBNAIL_WIDTHS if width <= image.width] or [image.width]
+    srcset = []
+    for width in widths:
+        variant = image.resize((width, round(width / image.width * image.height)), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        variant.save(buffer, 'WEBP', quality=Config.THUMBNAIL_QUALITY, method=6)
+        filename = f"{digest}-{width}.webp"
+        _write_file(video_id, filename, buffer.getvalue())
+        srcset.append([filename, width])
+    # Default src: the smallest variant at least as wide as a card
+    src = next((name for name, width in srcset if width >= Config.THUMBNAIL_CARD_WIDTH), srcset[-1][0])
+    return {'src': src, 'srcset': srcset}
+
+
+def _download(url):
+    import requests  # deferred to the first download (refresher thread)
+
+    with track_call('youtube', 'thumbnail'):
+        response = requests.get(url, timeout=Config.YOUTUBE_FETCH_TIMEOUT)
+        response.raise_for_status()
+    if len(response.content) > MAX_THUMBNAIL_BYTES:
+        raise ValueError(f"thumbnail too large ({len(response.content)} bytes)")
+    return response.content
+
+
+def _cache_thumbnail(video):
+    entry = make_variants(video['id'], _download(video['thumbnail']))
+    entry['source'] = video['thumbnail']
+    return entry
+
+
+def _safe_cache_thumbnail(video):
+    try:
+        return _cache_thumbnail(video)
+    except Exception as e:
+        print(f"⚠ Could not cache thumbnail for {video['id']}: {e}")
+        return None
+
+
+def _is_cached(video, entry):
+    if not entry or entry.get('source') != video['thumbnail']:
+        return False
+    return os.path.exists(os.path.join(Config.THUMBNAIL_CACHE_DIR, video['id'], entry['src']))
+
+
+def sync_thumbnails(videos):
+    """
+    Download thumbnails for videos that are not cached yet and evict the
+    ones no longer listed. Runs on the feed refresher thread.
+    Returns:
+        Counts of {'cached', 'downloaded', 'evicted', 'failed'} thumbnails
+    """
+    os.makedirs(Config.THUMBNAIL_CACHE_DIR, exist_ok=True)
+    previous = load_manifest()
+    listed = {video['id']: video for video in videos
+              if video.get('thumbnail') and VIDEO_ID_PATTERN.match(video.get('id', ''))}
+
+    manifest = {video_id: previous[video_id] for video_id, video in listed.items()
+                if _is_cached(video, previous.get(video_id))}
+    missing = [video for video_id, video in listed.items() if video_id not in manifest]
+
+    failed = 0
+    if missing:
+        with ThreadPoolExecutor(max_workers=Config.YOUTUBE_FETCH_WORKERS) as pool:
+            for video, result in zip(missing, pool.map(_safe_cache_thumbnail, missing)):
+                if result is None:
+                    failed += 1
+                else:
+                    manifest[video['id']] = result
+
+    evicted = 0
+    for name in os.listdir(Config.THUMBNAIL_CACHE_DIR):
+        path = os.path.join(Config.THUMBNAIL_CACHE_DIR, name)
+        if not os.path.isdir(path):
+            continue
+        if name not in manifest:
+            shutil.rmtree(path, ignore_errors=True)
+            evicted += 1
+            continue
+        # Files from an earlier version of a thumbnail that YouTube replaced
+        entry = manifest[name]
+        keep = {entry['src']} | {filename for filename, _ in entry['srcset']}
+        for filename in os.listdir(path):
+            if filename not in keep:
+                os.remove(os.path.join(path, filename))
+
+    if manifest != previous:
+        _save_manifest(manifest)
+    return {'cached': len(manifest), 'downloaded': len(missing) - failed, 'evicted': evicted, 'failed': failed}
+
+
+def local_thumbnail(video, manifest=None):
+    """
+    Locally served thumbnail fields for a video, or None if it is not cached
+    (the YouTube URL in the video dict is used until it is).
+    Pass load_manifest() when looking up many videos, so it is checked once.
+    """
+    entry = (load_manifest() if manifest is None else manifest).get(video.get('id'))
+    if not entry or entry.get('source') != video.get('thumbnail'):
+        return None
+    base = f"{URL_PREFIX}/{video['id']}"
+    return {
+        'thumbnail': f"{base}/{entry['src']}",
+        'thumbnail_srcset': ', '.join(f"{base}/{filename} {width}w" for filename, width in entry['srcset']),
+    }
@@ -0,0 +1,145 @@
+"""
+Per-request timing of the data, storage, image and render phases.
+Instrumented code is wrapped with @timed('phase') or `with timer('phase'):`;
+durations are summed per phase for the current request and sent back as a
+Server-Timing header (visible in the browser's network panel) plus one JSON
+log line per request:
+
+    ⏱ {"method": "GET", "path": "/blog", "status": 200, "total_ms": 8.4,
+       "phases": {"data-load": {"ms": 0.9, "count": 6}, "render": {"ms": 5.1, "count": 1}}, ...}
+
+With SERVER_TIMING_ENABLED off (the default) @timed returns the function
+unchanged and timer() is a shared no-op context, so there is no per-call cost.
+Work outside a request (the feed refresher thread) is not recorded.
+"""
+import functools
+import json
+import time
+from contextlib import nullcontext
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+
+from config import Config
+
+_NO_TIMER = nullcontext()
+
+
+class _Timer:
+    """Adds the time spent in the block to the current request's phase total"""
+
+    __slots__ = ('name', 'start', 'outermost')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        active = _active_phases()
+        # Nested calls of the same phase (e.g. srcset -> image URL) are counted once
+        self.outermost = active is not None and self.name not in active
+        if self.outermost:
+            active.add(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.outermost:
+            g._timing_active.discard(self.name)
+            record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+def _active_phases():
+    if not has_request_context() or 'timing_phases' not in g:
+        return None
+    return g._timing_active
+
+
+def timer(name):
+    """Context manager timing a block as phase `name` (no-op when disabled)"""
+    if not Config.SERVER_TIMING_ENABLED:
+        return _NO_TIMER
+    return _Timer(name)
+
+
+def timed(name):
+    """Decorator timing every call of a function as phase `name`"""
+    def decorator(fn):
+        if not Config.SERVER_TIMING_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record(name, duration_ms):
+    """Add a measured duration to phase `name` of the current request"""
+    if not has_request_context() or 'timing_phases' not in g:
+        return
+    phase = g.timing_phases.setdefault(name, [0.0, 0])
+    phase[0] += duration_ms
+    phase[1] += 1
+
+
+def _start_request():
+    g.timing_start = time.perf_counter()
+    g.timing_phases = {}
+    g._timing_active = set()
+
+
+def _before_render(sender, template, context, **extra):
+    if has_request_context() and 'timing_phases' in g:
+        g._timing_render_start = time.perf_counter()
+
+
+def _after_render(sender, template, context, **extra):
+    start = g.pop('_timing_render_start', None) if has_request_context() else None
+    if start is not None:
+        record('render', (time.perf_counter() - start) * 1000)
+
+
+def server_timing_header(phases, total_ms):
+    """Server-Timing value: one metric per phase plus the total"""
+    metrics = [
+        f'{name};dur={ms:.1f};desc="{count} call{"s" if count != 1 else ""}"'
+        for name, (ms, count) in phases.items()
+    ]
+    metrics.append(f'total;dur={total_ms:.1f}')
+    return ', '.join(metrics)
+
+
+def _finish_request(response):
+    if 'timing_phases' not in g:
+        return response
+    total_ms = (time.perf_counter() - g.timing_start) * 1000
+    phases = g.timing_phases
+    response.headers['Server-Timing'] = server_timing_header(phases, total_ms)
+    if request.endpoint != 'static':
+        line = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'phases': {name: {'ms': round(ms, 2), 'count': count} for name, (ms, count) in phases.items()},
+        }
+        if 'X-Page-Cache' in response.headers:
+            line['page_cache'] = response.headers['X-Page-Cache']
+        print(f"⏱ {json.dumps(line)}")
+    return response
+
+
+def init_timing(app):
+    """
+    Register the per-request hooks. Call this before other after_request
+    handlers are registered so the total includes them (Flask runs
+    after_request handlers in reverse order of registration).
+    """
+    if not Config.SERVER_TIMING_ENABLED:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    template_rendered.connect(_after_render, app)
+    before_render_template.connect(_before_render, app)
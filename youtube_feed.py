@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+YouTube channel and playlist feeds for the videos page.
+Requests are served from the cached copy in data/youtube_cache.json and never
+wait on YouTube. A background thread in each worker re-fetches the RSS feeds
+(concurrently, on a small thread pool) shortly before the cache expires; the
+entries are merged, deduplicated by videoId and sorted newest first. When a
+fetch fails, the last good copy of that feed keeps being served and the fetch
+is retried with jittered exponential backoff.
+Fetches are conditional (ETag/If-Modified-Since); a changed feed replaces the
+cached entries it covers, older entries are kept up to YOUTUBE_MAX_VIDEOS, and
+"N days ago" labels are computed when serving.
+After each refresh the thumbnails are cached locally (see thumbnail_cache.py).
+
+Refresh the cache once from the command line:
+    python youtube_feed.py
+"""
+import os
+import random
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+
+from config import Config
+from data_manager import load_json_data, save_json_data
+from singleflight import SingleFlight
+from thumbnail_cache import load_manifest, local_thumbnail, sync_thumbnails
+from timing import timed
+from metrics import inc, track_call
+
+CACHE_FILE = os.path.join(os.path.dirname(Config.BLOGS_DATA_FILE), 'youtube_cache.json')
+
+# Workers on a node share one fetch when their refreshes coincide
+_feed_flight = SingleFlight('youtube-feed')
+_thumbnail_flight = SingleFlight('youtube-thumbnails')
+
+FEED_NAMESPACES = {
+    'yt': 'http://www.youtube.com/xml/schemas/2015',
+    'media': 'http://search.yahoo.com/mrss/',
+    'atom': 'http://www.w3.org/2005/Atom',
+}
+
+
+# YOUTUBE_FEEDS entry kinds -> RSS URL
+FEED_URLS = {
+    'channel': 'https://www.youtube.com/feeds/videos.xml?channel_id={}',
+    'playlist': 'https://www.youtube.com/feeds/videos.xml?playlist_id={}',
+    'url': '{}',
+}
+
+Feed = namedtuple('Feed', 'name url')
+
+
+def get_feeds():
+    """
+    Feeds to aggregate, from YOUTUBE_FEEDS:
+        bhajans=playlist:PL...,live=channel:UC...,stub=url:http://127.0.0.1:8000/feed.xml
+    Without it, the single channel in YOUTUBE_CHANNEL_ID (or YOUTUBE_FEED_URL) is used.
+    """
+    feeds = []
+    for item in Config.YOUTUBE_FEEDS.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, spec = item.partition('=')
+        kind, _, value = spec.partition(':')
+        if not name.strip() or kind not in FEED_URLS or not value.strip():
+            print(f"⚠ Ignoring invalid YOUTUBE_FEEDS entry: {item}")
+            continue
+        feeds.append(Feed(name.strip(), FEED_URLS[kind].format(value.strip())))
+    if not feeds:
+        feeds.append(Feed('main', Config.YOUTUBE_FEED_URL or FEED_URLS['channel'].format(Config.YOUTUBE_CHANNEL_ID)))
+    return feeds
+
+
+def _tag(prefix, name):
+    return f"{{{FEED_NAMESPACES[prefix]}}}{name}"
+
+
+def _entry_to_video(entry):
+    """Build a cached video dict from an Atom <entry> element"""
+    ns = FEED_NAMESPACES
+    video_id = entry.find('yt:videoId', ns).text
+    title = entry.find('atom:title', ns).text
+
+    media_group = entry.find('media:group', ns)
+    thumbnail = media_group.find('media:thumbnail', ns).attrib['url']
+    description = media_group.find('media:description', ns).text or ""
+
+    # Determine category
+    category = 'video'
+    if 'LIVE' in title.upper() or 'STREAM' in title.upper():
+        category = 'livestream'
+
+    return {
+        'id': video_id,
+        'title': title,
+        # The "N days ago" label is derived from this when serving
+        'published': entry.find('atom:published', ns).text,
+        'description': description[:150] + "..." if len(description) > 150 else description,
+        'thumbnail': thumbnail,
+        'url': f"https://www.youtube.com/embed/{video_id}",
+        'watch_url': f"https://www.youtube.com/watch?v={video_id}",
+        'category': category
+    }
+
+
+def parse_entries(stream):
+    """Stream-parse the feed and return its entries as video dicts"""
+    from xml.etree.ElementTree import iterparse  # deferred: only the refresher thread parses feeds
+
+    entry_tag = _tag('atom', 'entry')
+    videos = []
+    for _, element in iterparse(stream, events=('end',)):
+        if element.tag != entry_tag:
+            continue
+        videos.append(_entry_to_video(element))
+        element.clear()
+    return videos
+
+
+def merge_feed_entries(feed_videos, cached_videos):
+    """
+    Merge a freshly fetched feed into its cached list.
+    The feed only lists the latest videos. Within that window it is authoritative:
+    its entries replace the cached ones (picking up title and thumbnail edits) and
+    cached entries missing from it (deleted or made private) are dropped. Older
+    cached entries are kept, newest first, up to YOUTUBE_MAX_VIDEOS.
+    """
+    if not feed_videos:
+        return cached_videos[:Config.YOUTUBE_MAX_VIDEOS]
+    feed_ids = {video['id'] for video in feed_videos}
+    window_start = min(_published_sort_key(video) for video in feed_videos)
+    older = [video for video in cached_videos
+             if video['id'] not in feed_ids and _published_sort_key(video) < window_start]
+    videos = sorted(feed_videos + older, key=_published_sort_key, reverse=True)
+    return videos[:Config.YOUTUBE_MAX_VIDEOS]
+
+
+def fetch_feed(feed, cached_data=None):
+    """
+    Fetch one feed and merge its entries into its cached list.
+    Sends the stored ETag/Last-Modified so an unchanged feed costs a 304.
+    Returns the feed's new cache dict (raises on network, HTTP or XML errors).
+    """
+    cached_data = cached_data or {}
+    headers = {}
+    if cached_data.get('etag'):
+        headers['If-None-Match'] = cached_data['etag']
+    if cached_data.get('last_modified'):
+        headers['If-Modified-Since'] = cached_data['last_modified']
+
+    import requests  # deferred: ~35 ms to import, and only the refresher thread fetches
+
+    cached_videos = cached_data.get('videos', [])
+    # Caches written before timestamps were stored are re-parsed in full
+    if any('published' not in video for video in cached_videos):
+        cached_videos = []
+        headers = {}
+
+    with track_call('youtube', 'feed'), \
+            requests.get(feed.url, headers=headers, timeout=Config.YOUTUBE_FETCH_TIMEOUT, stream=True) as response:
+        if response.status_code == 304:
+            videos = cached_videos
+            inc('youtube_feed_fetches_total', feed=feed.name, result='not_modified')
+        else:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            videos = merge_feed_entries(parse_entries(response.raw), cached_videos)
+            inc('youtube_feed_fetches_total', feed=feed.name, result='updated')
+
+        return {
+            'last_updated': datetime.now().isoformat(),
+            'etag': response.headers.get('ETag', cached_data.get('etag', '')),
+            'last_modified': response.headers.get('Last-Modified', cached_data.get('last_modified', '')),
+            'videos': videos
+        }
+
+
+def _published_sort_key(video):
+    try:
+        return datetime.fromisoformat(video['published'].replace('Z', '+00:00')).timestamp()
+    except (KeyError, AttributeError, ValueError):
+        return 0
+
+
+def merge_feeds(feeds, feed_data):
+    """Merge per-feed video lists, deduplicated by videoId and newest first"""
+    merged = {}
+    for feed in feeds:
+        for video in feed_data.get(feed.name, {}).get('videos', []):
+            if video['id'] in merged:
+                merged[video['id']]['sources'].append(feed.name)
+            else:
+                merged[video['id']] = dict(video, sources=[feed.name])
+    return sorted(merged.values(), key=_published_sort_key, reverse=True)
+
+
+def refresh_feed():
+    """
+    Fetch every feed concurrently and replace the cached copy; return the merged videos.
+    A feed that fails keeps its previous entries; only if all fail is an error raised.
+    """
+    cached_data = load_json_data(CACHE_FILE, default=None, use_cache=False) or {}
+    previous = cached_data.get('feeds', {})
+    feeds = get_feeds()
+
+    feed_data = {}
+    errors = []
+    with ThreadPoolExecutor(max_workers=min(Config.YOUTUBE_FETCH_WORKERS, len(feeds))) as pool:
+        futures = {pool.submit(fetch_feed, feed, previous.get(feed.name)): feed for feed in feeds}
+        for future in as_completed(futures):
+            feed = futures[future]
+            try:
+                feed_data[feed.name] = future.result()
+            except Exception as e:
+                inc('youtube_feed_fetches_total', feed=feed.name, result='error')
+                errors.append(f"{feed.name}: {e}")
+                if feed.name in previous:
+                    feed_data[feed.name] = previous[feed.name]
+
+    if len(errors) == len(feeds):
+        raise RuntimeError('; '.join(errors))
+    for error in errors:
+        print(f"⚠ YouTube feed {error}")
+
+    cache_data = {
+        'last_updated': datetime.now().isoformat(),
+        'feeds': feed_data,
+        'videos': merge_feeds(feeds, feed_data)
+    }
+    save_json_data(CACHE_FILE, cache_data)
+    return cache_data['videos']
+
+
+def format_video_date(published, now=None):
+    """'YouTube • N days ago' label for an ISO timestamp, relative to now"""
+    try:
+        pub_date = datetime.fromisoformat(published.replace('Z', '+00:00'))
+        days_ago = ((now or datetime.now(pub_date.tzinfo)) - pub_date).days
+    except (AttributeError, TypeError, ValueError):
+        days_ago = 0
+
+    if days_ago <= 0:
+        date_str = "Today"
+    elif days_ago == 1:
+        date_str = "1 day ago"
+    else:
+        date_str = f"{days_ago} days ago"
+    return f"YouTube • {date_str}"
+
+
+def get_cache_age(cached_data):
+    """Seconds since the cached copy was fetched, or None if there is no usable copy"""
+    if not cached_data or not cached_data.get('last_updated'):
+        return None
+    try:
+        last_updated = datetime.fromisoformat(cached_data['last_updated'])
+    except ValueError:
+        return None
+    return (datetime.now() - last_updated).total_seconds()
+
+
+class FeedRefresher:
+    """Daemon thread that keeps the cached feed fresh"""
+
+    def __init__(self, ttl, refresh_ahead, retry_min, retry_max):
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.retry_min = retry_min
+        self.retry_max = retry_max
+        self.failures = 0
+        self._thread = None
+        self._wake = threading.Event()
+        self._stopped = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the thread (once per process)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='youtube-feed-refresher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def wake(self):
+        """Ask for a refresh now (e.g. a request found no cached copy at all)"""
+        self._wake.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def seconds_until_refresh(self):
+        # Read the stored copy rather than the in-process cache: another worker may have refreshed it
+        age = get_cache_age(load_json_data(CACHE_FILE, default=None, use_cache=False))
+        if age is None:
+            return 0
+        delay = self.ttl - self.refresh_ahead - age
+        if delay <= 0:
+            return 0
+        # Spread workers sharing the cache over a few seconds so one of them usually refreshes first
+        return delay + random.uniform(0, 5)
+
+    def backoff_delay(self):
+        """Exponential backoff with jitter, so workers that failed together retry apart"""
+        ceiling = min(self.retry_max, self.retry_min * 2 ** (self.failures - 1))
+        return random.uniform(self.retry_min / 2, ceiling)
+
+    def _run(self):
+        # Thumbnails missing on this node (e.g. a fresh deploy with a fresh feed cache)
+        cached_data = load_json_data(CACHE_FILE, default=None, use_cache=False)
+        if cached_data:
+            self._sync_thumbnails(cached_data.get('videos', []))
+        while not self._stopped:
+            delay = self.backoff_delay() if self.failures else self.seconds_until_refresh()
+            if delay > 0:
+                woken = self._wake.wait(delay)
+                if self._stopped:
+                    return
+                if not woken and not self.failures:
+                    # Re-check the schedule before fetching
+                    continue
+            # Wake-ups that arrive while this fetch runs are satisfied by it
+            self._wake.clear()
+            self._refresh()
+
+    def _refresh(self):
+        try:
+            # A worker that queued behind another's fetch reuses its result
+            videos = _feed_flight.do_shared('feeds', refresh_feed, share_for=self.refresh_ahead)
+            self.failures = 0
+            print(f"✓ YouTube feed refreshed ({len(videos)} videos)")
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠ YouTube feed refresh failed (attempt {self.failures}): {e}")
+            return
+        self._sync_thumbnails(videos)
+
+    def _sync_thumbnails(self, videos):
+        if not Config.THUMBNAIL_CACHE_ENABLED:
+            return
+        try:
+            counts = _thumbnail_flight.do_shared('sync', lambda: sync_thumbnails(videos), share_for=self.refresh_ahead)
+            if counts['downloaded'] or counts['evicted']:
+                print(f"✓ YouTube thumbnails: {counts['downloaded']} cached, {counts['evicted']} evicted")
+        except Exception as e:
+            print(f"⚠ YouTube thumbnail sync failed: {e}")
+
+
+feed_refresher = FeedRefresher(
+    ttl=Config.YOUTUBE_CACHE_TTL,
+    refresh_ahead=Config.YOUTUBE_REFRESH_AHEAD,
+    retry_min=Config.YOUTUBE_RETRY_MIN,
+    retry_max=Config.YOUTUBE_RETRY_MAX,
+)
+
+
+def start_feed_refresher():
+    if Config.YOUTUBE_REFRESH_ENABLED:
+        feed_refresher.start()
+
+
+def preload_videos(fetch_missing=False):
+    """
+    Load the cached feed, its category/source index and the thumbnail manifest.
+    Args:
+        fetch_missing: Fetch the feeds now if there is no cached copy yet
+    Returns:
+        Number of videos
+    """
+    # Check without caching: a miss cached now would hide the feed another worker fetches
+    if fetch_missing and not load_json_data(CACHE_FILE, default=None, use_cache=False):
+        try:
+            # Workers booting together share one fetch
+            _feed_flight.do_shared('feeds', refresh_feed, share_for=Config.YOUTUBE_REFRESH_AHEAD)
+        except Exception as e:
+            print(f"⚠ YouTube feed fetch failed: {e}")
+    cached_data = load_json_data(CACHE_FILE, default=None)
+    if not cached_data:
+        return 0
+    _get_video_index(cached_data)
+    if Config.THUMBNAIL_CACHE_ENABLED:
+        load_manifest()
+    return len(cached_data.get('videos', []))
+
+
+# (cached data the index was built from, index)
+_video_index = (None, {})
+
+
+def build_video_index(videos):
+    """Map ('category', name) and ('source', name) to the matching videos, newest first"""
+    index = {}
+    for video in videos:
+        index.setdefault(('category', video.get('category')), []).append(video)
+        for source in video.get('sources', []):
+            index.setdefault(('source', source), []).append(video)
+    return index
+
+
+def _get_video_index(cached_data):
+    global _video_index
+    indexed_data, index = _video_index
+    if indexed_data is not cached_data:
+        # The data cache hands out the same object until the file is reloaded
+        index = build_video_index(cached_data.get('videos', []))
+        _video_index = (cached_data, index)
+    return index
+
+
+@timed('youtube')
+def get_latest_youtube_videos(limit=50, category=None, source=None):
+    """
+    Latest videos from the cached feeds (never fetches on the request path).
+    Args:
+        limit: Maximum number of videos
+        category: Only videos of this category ('video' or 'livestream')
+        source: Only videos from this feed (a YOUTUBE_FEEDS name)
+    """
+    cached_data = load_json_data(CACHE_FILE, default=None)
+    if not cached_data:
+        # Cold start: the refresher fills the cache shortly
+        feed_refresher.wake()
+        return []
+
+    matches = cached_data.get('videos', [])
+    if category or source:
+        index = _get_video_index(cached_data)
+        if category:
+            matches = index.get(('category', category), [])
+        if source:
+            by_source = index.get(('source', source), [])
+            if category:
+                category_ids = {video['id'] for video in matches}
+                matches = [video for video in by_source if video['id'] in category_ids]
+            else:
+                matches = by_source
+
+    now = datetime.now(timezone.utc)
+    # One stat of the manifest per request, not one per video
+    manifest = load_manifest() if Config.THUMBNAIL_CACHE_ENABLED else None
+    videos = []
+    for video in matches[:limit]:
+        extra = (manifest is not None and local_thumbnail(video, manifest)) or {}
+        if 'published' in video:
+            extra['date'] = format_video_date(video['published'], now)
+        videos.append(dict(video, **extra) if extra else video)
+    return videos
+
+
+if __name__ == '__main__':
+    videos = refresh_feed()
+    print(f"✓ Cached {len(videos)} videos from {len(get_feeds())} feed(s)")